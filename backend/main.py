@@ -1,9 +1,14 @@
 import os
+import sys
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 from db import make_engine, db_ping
 
+# Routers import the backend package, so the project root must be importable when run from backend/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from backend.routes import extraction
+
 app = FastAPI(title="AI Civilization Observer API", version="0.1.0")
 
 allowed = os.environ.get("ALLOWED_ORIGINS", "")
@@ -19,6 +24,9 @@ app.add_middleware(
 
 engine = make_engine()
 
+# Bulk backlog extraction and LLM telemetry: /api/extraction/...
+app.include_router(extraction.router, prefix="/api")
+
 @app.get("/health")
 def health():
     db_ping(engine)
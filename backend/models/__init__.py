@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, CheckConstraint, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, String, Text, Float, DateTime, Boolean, ForeignKey, CheckConstraint, TIMESTAMP
 from sqlalchemy.dialects.postgresql import JSONB, ARRAY
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -15,11 +15,27 @@ class Source(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
     raw_items = relationship("RawItem", back_populates="source")
+    fetch_state = relationship("SourceFetchState", back_populates="source", uselist=False)
 
     __table_args__ = (
         CheckConstraint("source_type IN ('rss', 'api', 'web', 'official')", name='chk_source_type'),
     )
 
+class SourceFetchState(Base):
+    __tablename__ = "source_fetch_state"
+
+    source_id = Column(Integer, ForeignKey("sources.source_id"), primary_key=True)
+    etag = Column(Text)
+    last_modified = Column(Text)
+    body_digest = Column(String(64))
+    last_status = Column(Integer)
+    last_fetched_at = Column(TIMESTAMP(timezone=True))
+    last_changed_at = Column(TIMESTAMP(timezone=True))
+    poll_interval_seconds = Column(Integer)
+    next_poll_at = Column(TIMESTAMP(timezone=True), index=True)
+
+    source = relationship("Source", back_populates="fetch_state")
+
 class RawItem(Base):
     __tablename__ = "raw_items"
 
@@ -33,10 +49,47 @@ class RawItem(Base):
     content_type = Column(String(50), default='text/html')
     published_at = Column(TIMESTAMP(timezone=True))
     fetched_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    simhash = Column(BigInteger)
+    duplicate_of_item_id = Column(Integer, ForeignKey("raw_items.item_id"))
 
     source = relationship("Source", back_populates="raw_items")
     evidence = relationship("Evidence", back_populates="raw_item")
 
+class ExtractionQueueItem(Base):
+    __tablename__ = "extraction_queue"
+
+    item_id = Column(Integer, ForeignKey("raw_items.item_id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(20), nullable=False, default='pending')  # pending, processing, done, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    claimed_at = Column(TIMESTAMP(timezone=True))
+    claimed_by = Column(String(100))
+    last_error = Column(Text)
+    enqueued_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    finished_at = Column(TIMESTAMP(timezone=True))
+
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'processing', 'done', 'dead')", name='chk_extraction_queue_status'),
+    )
+
+class UrlResolution(Base):
+    __tablename__ = "url_resolutions"
+
+    url = Column(Text, primary_key=True)
+    canonical_url = Column(Text, nullable=False)
+    resolved_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+class LlmAnalysisCache(Base):
+    __tablename__ = "llm_analysis_cache"
+
+    content_hash = Column(String(64), primary_key=True)
+    prompt_version = Column(String(50), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    result = Column(JSONB, nullable=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    last_hit_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    hit_count = Column(Integer, default=0)
+
 class EventCluster(Base):
     __tablename__ = "event_clusters"
 
@@ -49,6 +102,7 @@ class EventCluster(Base):
     corrected_flag = Column(Boolean, default=False)
     retraction_flag = Column(Boolean, default=False)
     supersedes_cluster_id = Column(Integer, ForeignKey("event_clusters.cluster_id"))
+    minhash_signature = Column(ARRAY(BigInteger))  # MinHash of the title (minhash cluster engine)
 
     evidence = relationship("Evidence", back_populates="cluster")
     observations = relationship("Observation", back_populates="cluster")
@@ -62,6 +116,47 @@ class EventCluster(Base):
         CheckConstraint("cluster_state IN ('Emerging', 'Active', 'Stabilizing', 'Disputed', 'Retracted')", name='chk_cluster_state'),
     )
 
+class ClusterCentroid(Base):
+    __tablename__ = "cluster_centroids"
+
+    cluster_id = Column(Integer, ForeignKey("event_clusters.cluster_id", ondelete="CASCADE"), primary_key=True)
+    term_counts = Column(JSONB, nullable=False)  # {term: count}, top CENTROID_MAX_TERMS terms
+    evidence_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+class ClusterCompactionState(Base):
+    __tablename__ = "cluster_compaction_state"
+
+    job = Column(String(50), primary_key=True)
+    last_cluster_id = Column(Integer, nullable=False, default=0)  # clusters up to here have been probed
+    merged_total = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+class ClusterEvidenceStats(Base):
+    __tablename__ = "cluster_evidence_stats"
+
+    # Maintained by statement-level triggers on evidence (patch_cluster_evidence_stats.sql); read-only here
+    cluster_id = Column(Integer, ForeignKey("event_clusters.cluster_id", ondelete="CASCADE"), primary_key=True)
+    l5_count = Column(Integer, nullable=False, default=0)
+    l4_count = Column(Integer, nullable=False, default=0)
+    l3_count = Column(Integer, nullable=False, default=0)
+    l2_count = Column(Integer, nullable=False, default=0)
+    l1_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    last_evidence_at = Column(TIMESTAMP(timezone=True))
+
+class DirtyCluster(Base):
+    __tablename__ = "dirty_clusters"
+
+    cluster_id = Column(Integer, ForeignKey("event_clusters.cluster_id", ondelete="CASCADE"), primary_key=True)
+    # Evidence gained per level since the heartbeat last claimed this cluster (maintained by triggers)
+    added_l5 = Column(Integer, nullable=False, default=0)
+    added_l4 = Column(Integer, nullable=False, default=0)
+    added_l3 = Column(Integer, nullable=False, default=0)
+    added_l2 = Column(Integer, nullable=False, default=0)
+    added_l1 = Column(Integer, nullable=False, default=0)
+    first_dirtied_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
 class Evidence(Base):
     __tablename__ = "evidence"
 
@@ -74,6 +169,7 @@ class Evidence(Base):
     reliability_score = Column(Float)
     extracted_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
     evidence_kind = Column(String(30), default='fact')
+    minhash_signature = Column(ARRAY(BigInteger))  # MinHash of the extract (minhash cluster engine)
 
     raw_item = relationship("RawItem", back_populates="evidence")
     cluster = relationship("EventCluster", back_populates="evidence")
@@ -36,8 +36,8 @@ def get_clusters(domain: Optional[str] = None):
     cluster_ids = [c['cluster_id'] for c in clusters]
     
     # 2. Fetch Aggregates (Batch)
-    # Evidence Counts
-    evidence_data = supa.table("evidence").select("cluster_id, level").in_("cluster_id", cluster_ids).execute().data
+    # Evidence Counts (trigger-maintained counters, one row per cluster)
+    stats_data = supa.table("cluster_evidence_stats").select("cluster_id, l5_count, l4_count, l3_count, l2_count, l1_count").in_("cluster_id", cluster_ids).execute().data
     
     # Scores (Latest) - Ideally we use a view, but here we construct map
     scores_data = supa.table("cluster_scores").select("cluster_id, consistency, risk, mechanism_uncertainty, contradiction_ratio, computed_at").in_("cluster_id", cluster_ids).order("computed_at", desc=True).execute().data
@@ -47,11 +47,10 @@ def get_clusters(domain: Optional[str] = None):
     
     # 3. Process Aggregates
     ev_map = {}
-    for e in evidence_data:
-        cid = e['cluster_id']
-        lvl = f"L{e['level']}"
-        if cid not in ev_map: ev_map[cid] = {'L5':0,'L4':0,'L3':0,'L2':0,'L1':0}
-        ev_map[cid][lvl] += 1
+    for st in stats_data:
+        ev_map[st['cluster_id']] = {
+            'L5': st['l5_count'], 'L4': st['l4_count'], 'L3': st['l3_count'], 'L2': st['l2_count'], 'L1': st['l1_count']
+        }
         
     score_map = {}
     for s in scores_data:
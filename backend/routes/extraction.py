@@ -0,0 +1,50 @@
+from fastapi import APIRouter, BackgroundTasks, HTTPException
+from typing import Optional
+from datetime import datetime, timezone
+import threading
+from backend.database import SessionLocal
+from backend.services.bulk_extractor import BulkExtractor
+from backend.services.llm_engine import get_extraction_engine
+
+router = APIRouter()
+
+# One backlog job at a time per API process
+_job = {"running": False, "started_at": None, "finished_at": None, "stats": None, "error": None}
+_job_lock = threading.Lock()
+
+
+def _run_bulk_extraction(workers: Optional[int], limit: Optional[int]):
+    db = SessionLocal()
+    try:
+        _job["stats"] = BulkExtractor(db, workers=workers).run(limit=limit)
+    except Exception as e:
+        db.rollback()
+        _job["error"] = str(e)
+    finally:
+        db.close()
+        _job["finished_at"] = datetime.now(timezone.utc)
+        _job["running"] = False
+
+
+@router.post("/extraction/bulk", status_code=202)
+def start_bulk_extraction(background_tasks: BackgroundTasks, workers: Optional[int] = None, limit: Optional[int] = None):
+    with _job_lock:
+        if _job["running"]:
+            raise HTTPException(status_code=409, detail="Bulk extraction already running")
+        _job.update(running=True, started_at=datetime.now(timezone.utc), finished_at=None, stats=None, error=None)
+    background_tasks.add_task(_run_bulk_extraction, workers, limit)
+    return dict(_job)
+
+
+@router.get("/extraction/bulk")
+def get_bulk_extraction():
+    return dict(_job)
+
+
+@router.get("/extraction/llm")
+def get_llm_telemetry():
+    """Circuit breaker state, call latency histogram and error counts for the LLM client."""
+    engine = get_extraction_engine()
+    if not engine:
+        return {"configured": False}
+    return {"configured": True, "model": engine.model_name, **engine.breaker.snapshot()}
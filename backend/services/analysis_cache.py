@@ -0,0 +1,109 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models import LlmAnalysisCache
+from .llm_engine import MODEL_NAME, PROMPT_VERSION
+from datetime import datetime, timedelta, timezone
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_MAX_ROWS = int(os.getenv("ANALYSIS_CACHE_MAX_ROWS", "200000"))
+ANALYSIS_CACHE_TTL_DAYS = int(os.getenv("ANALYSIS_CACHE_TTL_DAYS", "90"))
+# Run eviction after this many new entries have been written by this process
+ANALYSIS_CACHE_EVICT_EVERY = int(os.getenv("ANALYSIS_CACHE_EVICT_EVERY", "1000"))
+
+# Process-wide counters (exposed via get_cache_stats)
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+_writes_since_evict = 0
+
+
+def get_cache_stats() -> dict:
+    total = _stats["hits"] + _stats["misses"]
+    return dict(_stats, hit_ratio=round(_stats["hits"] / total, 3) if total else 0.0)
+
+
+class AnalysisCache:
+    """
+    Persistent LLM result cache keyed by (content_hash, prompt_version, model).
+    Bumping PROMPT_VERSION or switching models naturally misses, so re-extraction
+    under a new prompt is a deliberate choice rather than an accident.
+    """
+
+    def __init__(self, db: Session, prompt_version: str = PROMPT_VERSION, model: str = MODEL_NAME):
+        self.db = db
+        self.prompt_version = prompt_version
+        self.model = model
+
+    def get_many(self, content_hashes):
+        """{content_hash: result} for cached hashes; hits are touched in one UPDATE."""
+        content_hashes = list(set(content_hashes))
+        if not content_hashes:
+            return {}
+        rows = (
+            self.db.query(LlmAnalysisCache.content_hash, LlmAnalysisCache.result)
+            .filter(
+                LlmAnalysisCache.content_hash.in_(content_hashes),
+                LlmAnalysisCache.prompt_version == self.prompt_version,
+                LlmAnalysisCache.model == self.model,
+            )
+            .all()
+        )
+        hits = dict(rows)
+        _stats["hits"] += len(hits)
+        _stats["misses"] += len(content_hashes) - len(hits)
+
+        if hits:
+            self.db.query(LlmAnalysisCache).filter(
+                LlmAnalysisCache.content_hash.in_(list(hits)),
+                LlmAnalysisCache.prompt_version == self.prompt_version,
+                LlmAnalysisCache.model == self.model,
+            ).update(
+                {LlmAnalysisCache.last_hit_at: datetime.now(timezone.utc),
+                 LlmAnalysisCache.hit_count: LlmAnalysisCache.hit_count + 1},
+                synchronize_session=False,
+            )
+        return hits
+
+    def put_many(self, results):
+        """Upsert {content_hash: result}. Does not commit."""
+        global _writes_since_evict
+        if not results:
+            return
+        now = datetime.now(timezone.utc)
+        stmt = pg_insert(LlmAnalysisCache).values([
+            {"content_hash": h, "prompt_version": self.prompt_version, "model": self.model,
+             "result": result, "created_at": now, "last_hit_at": now, "hit_count": 0}
+            for h, result in results.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LlmAnalysisCache.content_hash, LlmAnalysisCache.prompt_version, LlmAnalysisCache.model],
+            set_={"result": stmt.excluded.result, "last_hit_at": stmt.excluded.last_hit_at},
+        )
+        self.db.execute(stmt)
+        _stats["writes"] += len(results)
+        _writes_since_evict += len(results)
+        if _writes_since_evict >= ANALYSIS_CACHE_EVICT_EVERY:
+            self.evict()
+
+    def evict(self):
+        """Drop entries idle past the TTL, then the least recently hit beyond ANALYSIS_CACHE_MAX_ROWS."""
+        global _writes_since_evict
+        cutoff = datetime.now(timezone.utc) - timedelta(days=ANALYSIS_CACHE_TTL_DAYS)
+        expired = self.db.query(LlmAnalysisCache).filter(LlmAnalysisCache.last_hit_at < cutoff).delete(
+            synchronize_session=False
+        )
+        overflow = self.db.execute(text("""
+            delete from llm_analysis_cache
+            where (content_hash, prompt_version, model) in (
+              select content_hash, prompt_version, model
+              from llm_analysis_cache
+              order by last_hit_at desc
+              offset :max_rows
+            )
+        """), {"max_rows": ANALYSIS_CACHE_MAX_ROWS}).rowcount
+        _stats["evictions"] += expired + overflow
+        _writes_since_evict = 0
+        if expired or overflow:
+            logger.info(f"Analysis cache evicted {expired} expired and {overflow} overflow entries")
@@ -0,0 +1,126 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from .bulk_writer import BulkWriter
+from .evidence_extractor import keyword_evidence_rows
+from .extraction_queue import ExtractionQueue, default_worker_id
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+BULK_EXTRACT_WORKERS = int(os.getenv("BULK_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+# Raw items handed to a worker per task
+BULK_EXTRACT_SHARD_SIZE = int(os.getenv("BULK_EXTRACT_SHARD_SIZE", "500"))
+# Evidence rows buffered before a write + commit
+BULK_EXTRACT_WRITE_BATCH = int(os.getenv("BULK_EXTRACT_WRITE_BATCH", "5000"))
+
+# Originals inserted outside the ingestor (imports, restores) that never reached the queue
+BACKLOG_SQL = text("""
+    insert into extraction_queue (item_id)
+    select r.item_id
+    from raw_items r
+    where r.duplicate_of_item_id is null
+      and not exists (select 1 from evidence e where e.raw_item_id = r.item_id)
+      and not exists (select 1 from extraction_queue q where q.item_id = r.item_id)
+    on conflict (item_id) do nothing
+""")
+
+SHARD_SQL = text("""
+    select r.item_id, r.content, r.url, r.canonical_url, r.content_hash, r.fetched_at, s.source_type
+    from raw_items r
+    left join sources s on s.source_id = r.source_id
+    where r.item_id = any(:ids)
+""")
+
+
+def _classify_shard(rows):
+    """Worker entry point: keyword-classify a shard of raw item tuples into evidence rows."""
+    evidence = []
+    for row in rows:
+        evidence.extend(keyword_evidence_rows(*row))
+    return [row[0] for row in rows], evidence
+
+
+class BulkExtractor:
+    """
+    Backlog extraction with the keyword rules. The parent process claims
+    extraction_queue rows shard by shard and hands them to a process pool;
+    workers only classify (no DB access) and the parent is the single writer,
+    committing every BULK_EXTRACT_WRITE_BATCH rows so progress survives an
+    interruption. Every claimed item is marked done in the same commit as its
+    evidence, including items the rules find nothing in, so none is picked up twice.
+    """
+
+    def __init__(self, db: Session, workers: int = None, shard_size: int = None):
+        self.db = db
+        self.workers = workers or BULK_EXTRACT_WORKERS
+        self.shard_size = shard_size or BULK_EXTRACT_SHARD_SIZE
+        # Own worker id, so a heartbeat in the same process never settles this run's claims
+        self.queue = ExtractionQueue(db, worker_id=f"{default_worker_id()}:bulk")
+
+    def iter_shards(self, limit: int = None):
+        """Claim due queue rows shard by shard and yield their raw item tuples."""
+        seen = 0
+        while limit is None or seen < limit:
+            page = self.shard_size if limit is None else min(self.shard_size, limit - seen)
+            ids = self.queue.claim(page)
+            if not ids:
+                return
+            seen += len(ids)
+            yield [tuple(r) for r in self.db.execute(SHARD_SQL, {"ids": ids})]
+
+    def run(self, limit: int = None) -> dict:
+        """Extract evidence for up to `limit` pending items. Returns run stats."""
+        started = time.monotonic()
+        writer = BulkWriter(self.db)
+        stats = {"items": 0, "evidence": 0, "workers": self.workers}
+        buffer, done_ids, claimed = [], [], set()
+        self.db.execute(BACKLOG_SQL)
+        self.db.commit()
+
+        def collect(future):
+            item_ids, rows = future.result()
+            stats["items"] += len(item_ids)
+            done_ids.extend(item_ids)
+            buffer.extend(rows)
+
+        def flush():
+            if buffer:
+                writer.insert_evidence(buffer)
+            # Settle the extraction queue entries in the same commit, so nothing is extracted twice
+            self.queue.complete(done_ids)
+            self.db.commit()
+            claimed.difference_update(done_ids)
+            stats["evidence"] += len(buffer)
+            buffer.clear()
+            done_ids.clear()
+
+        shards = self.iter_shards(limit)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                # Keep a couple of shards queued per worker; the parent claims lazily behind them
+                in_flight = set()
+                for shard in shards:
+                    claimed.update(row[0] for row in shard)
+                    in_flight.add(pool.submit(_classify_shard, shard))
+                    if len(in_flight) < self.workers * 2:
+                        continue
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                    if len(buffer) >= BULK_EXTRACT_WRITE_BATCH:
+                        flush()
+                for future in in_flight:
+                    collect(future)
+                flush()
+        except Exception as e:
+            # Hand unsettled claims back to the queue rather than waiting out their lease
+            self.db.rollback()
+            self.queue.fail(claimed, f"bulk extraction failed: {e}")
+            raise
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
+        logger.info(f"Bulk extraction: {stats['items']} items -> {stats['evidence']} evidence in {stats['seconds']}s")
+        return stats
@@ -0,0 +1,120 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models import RawItem, Evidence, EventCluster
+import os
+
+# Rows per multi-row INSERT statement
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+EVIDENCE_COLUMNS = ("raw_item_id", "cluster_id", "level", "extract", "pointer", "reliability_score", "evidence_kind")
+
+
+def _chunks(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class SequenceAllocator:
+    """
+    Hands out primary keys drawn from a serial column's sequence, fetched in
+    blocks with one round trip each, so rows can be referenced before they are
+    inserted. Ids drawn in a rolled-back transaction are simply skipped.
+    """
+
+    def __init__(self, db: Session, table: str, column: str, block: int = 64):
+        self.db = db
+        self.table = table
+        self.column = column
+        self.block = block
+        self._ids = []
+
+    def next_id(self) -> int:
+        if not self._ids:
+            self._ids = list(self.db.execute(
+                text("select nextval(pg_get_serial_sequence(:table, :column)) from generate_series(1, :n)"),
+                {"table": self.table, "column": self.column, "n": self.block},
+            ).scalars())
+            self._ids.reverse()
+        return self._ids.pop()
+
+
+def evidence_row(evidence: Evidence) -> dict:
+    """Column dict for an (unsaved) Evidence object."""
+    return {col: getattr(evidence, col) for col in EVIDENCE_COLUMNS}
+
+
+class BulkWriter:
+    """
+    Multi-row INSERT paths for the hot tables, bypassing per-object ORM flushes.
+    Does not commit; callers own the transaction.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = None):
+        self.db = db
+        self.chunk_size = chunk_size or BULK_CHUNK_SIZE
+
+    def insert_raw_items(self, rows):
+        """
+        Insert raw_items rows (dicts with identical keys).
+        Conflicts on content_hash are skipped (another worker got there first).
+        Returns {content_hash: item_id} for the rows actually inserted.
+        """
+        inserted = {}
+        for chunk in _chunks(list(rows), self.chunk_size):
+            stmt = (
+                pg_insert(RawItem)
+                .values(chunk)
+                .on_conflict_do_nothing(index_elements=[RawItem.content_hash])
+                .returning(RawItem.content_hash, RawItem.item_id)
+            )
+            for content_hash, item_id in self.db.execute(stmt):
+                inserted[content_hash] = item_id
+        return inserted
+
+    def mark_duplicates(self, duplicates):
+        """Set raw_items.duplicate_of_item_id from {item_id: original_item_id} (bulk UPDATE by primary key)."""
+        self.db.execute(
+            update(RawItem),
+            [{"item_id": item_id, "duplicate_of_item_id": original} for item_id, original in duplicates.items()]
+        )
+
+    def set_canonical_urls(self, canonicals):
+        """Set raw_items.canonical_url from {item_id: canonical_url} (bulk UPDATE by primary key)."""
+        self.db.execute(
+            update(RawItem),
+            [{"item_id": item_id, "canonical_url": url} for item_id, url in canonicals.items()]
+        )
+
+    def insert_evidence(self, rows):
+        """Insert evidence rows (dicts). Returns evidence_ids in input order."""
+        ids = []
+        for chunk in _chunks(list(rows), self.chunk_size):
+            # insertmanyvalues renders this as multi-row VALUES; sort_by_parameter_order keeps ids aligned
+            stmt = insert(Evidence).returning(Evidence.evidence_id, sort_by_parameter_order=True)
+            ids.extend(self.db.execute(stmt, chunk).scalars().all())
+        return ids
+
+    def insert_clusters(self, rows):
+        """Insert event_clusters rows (dicts with identical keys, ids preallocated). No RETURNING needed."""
+        for chunk in _chunks(list(rows), self.chunk_size):
+            self.db.execute(insert(EventCluster), chunk)
+
+    def assign_evidence(self, assignments):
+        """Apply {evidence_id: cluster_id} as a single UPDATE ... FROM unnest(...)."""
+        if not assignments:
+            return
+        self.db.execute(text("""
+            update evidence e
+            set cluster_id = v.cluster_id
+            from unnest(cast(:evidence_ids as int[]), cast(:cluster_ids as int[])) as v(evidence_id, cluster_id)
+            where e.evidence_id = v.evidence_id
+        """), {"evidence_ids": list(assignments.keys()), "cluster_ids": list(assignments.values())})
+
+    def touch_clusters(self, cluster_ids):
+        """Bump last_updated_at (via the event_clusters update trigger) in one statement."""
+        if cluster_ids:
+            self.db.execute(
+                text("update event_clusters set last_updated_at = now() where cluster_id = any(:ids)"),
+                {"ids": list(cluster_ids)},
+            )
@@ -0,0 +1,253 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models import ClusterCentroid, EventCluster, Evidence
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+import math
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Terms kept per persisted centroid (highest counts first)
+CENTROID_MAX_TERMS = int(os.getenv("CENTROID_MAX_TERMS", "200"))
+
+# Function words carry no topical signal and would dominate raw term counts
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have he her his in is it its of on or
+said says she that the their they this to was were which will with would after over
+""".split())
+
+
+def term_counts(text: str) -> Counter:
+    return Counter(t for t in (text or "").lower().split() if t not in STOPWORDS)
+
+
+class CentroidStore:
+    """
+    Hot in-memory cluster representation: a term-count centroid per active
+    cluster, an inverted index over centroid terms and each centroid's squared
+    norm. Absorbing an evidence row touches only its own terms, so updates are
+    O(tokens) regardless of cluster size. Matching is cosine similarity against
+    the centroids. Dirty centroids are written back (top CENTROID_MAX_TERMS
+    terms) to cluster_centroids and reloaded from there on startup, and again
+    whenever another process rewrites or deletes a cluster's row.
+
+    Implements the cluster index interface (signature / add / best_match) plus
+    absorb, so ClustererService can use it as the 'centroid' engine.
+    """
+
+    name = "centroid"
+
+    def __init__(self):
+        self.centroids = {}                 # cluster_id -> Counter
+        self.evidence_counts = {}           # cluster_id -> absorbed evidence rows
+        self.norm2 = {}                     # cluster_id -> sum of squared counts
+        self.postings = defaultdict(set)    # term -> {cluster_id}
+        self.loaded_at = {}                 # cluster_id -> updated_at of the stored row in memory
+        self.dirty = set()
+        self.loaded = False
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.centroids)
+
+    def signature(self, text: str) -> Counter:
+        return term_counts(text)
+
+    # --- in-memory model -------------------------------------------------
+
+    def add(self, cluster_id: int, counts, evidence_count: int = 1):
+        """Start tracking a cluster with an initial centroid."""
+        with self._lock:
+            if cluster_id in self.centroids:
+                return
+            self.centroids[cluster_id] = Counter()
+            self.norm2[cluster_id] = 0
+            self.evidence_counts[cluster_id] = 0
+            self._merge(cluster_id, counts)
+            self.evidence_counts[cluster_id] = evidence_count
+            self.dirty.add(cluster_id)
+
+    def absorb(self, cluster_id: int, counts):
+        """Fold one assigned evidence row into its cluster's centroid."""
+        with self._lock:
+            if cluster_id not in self.centroids:
+                self.add(cluster_id, counts)
+                return
+            self._merge(cluster_id, counts)
+            self.evidence_counts[cluster_id] += 1
+            self.dirty.add(cluster_id)
+
+    def _merge(self, cluster_id, counts):
+        centroid = self.centroids[cluster_id]
+        norm2 = self.norm2[cluster_id]
+        for term, n in counts.items():
+            old = centroid[term]
+            if not old:
+                self.postings[term].add(cluster_id)
+            centroid[term] = old + n
+            norm2 += (old + n) ** 2 - old ** 2
+        self.norm2[cluster_id] = norm2
+
+    def remove(self, cluster_id: int):
+        with self._lock:
+            centroid = self.centroids.pop(cluster_id, None)
+            if centroid is None:
+                return
+            for term in centroid:
+                members = self.postings.get(term)
+                if members is not None:
+                    members.discard(cluster_id)
+                    if not members:
+                        del self.postings[term]
+            self.norm2.pop(cluster_id, None)
+            self.evidence_counts.pop(cluster_id, None)
+            self.loaded_at.pop(cluster_id, None)
+            self.dirty.discard(cluster_id)
+
+    def best_match(self, counts, threshold: float):
+        """(cluster_id, cosine) of the closest centroid strictly above threshold, else (None, threshold)."""
+        query_norm = math.sqrt(sum(n * n for n in counts.values()))
+        if not query_norm:
+            return None, threshold
+        with self._lock:
+            dots = defaultdict(int)
+            for term, n in counts.items():
+                for cluster_id in self.postings.get(term, ()):
+                    dots[cluster_id] += n * self.centroids[cluster_id][term]
+            best_id, best_score = None, threshold
+            for cluster_id, dot in dots.items():
+                score = dot / (query_norm * math.sqrt(self.norm2[cluster_id]))
+                if score > best_score or (score == best_score and best_id is not None and cluster_id < best_id):
+                    best_id, best_score = cluster_id, score
+            return best_id, best_score
+
+    # --- persistence -----------------------------------------------------
+
+    def sync(self, db: Session):
+        """
+        Align the model with the currently active clusters: load centroids for
+        clusters not yet in memory (persisted rows first, else rebuilt from their
+        evidence or title), reload clusters whose stored row another process has
+        rewritten or deleted since (e.g. a compaction merge), and drop clusters
+        that are no longer active.
+        """
+        with self._lock:
+            stored = dict(
+                db.query(EventCluster.cluster_id, ClusterCentroid.updated_at)
+                .outerjoin(ClusterCentroid, ClusterCentroid.cluster_id == EventCluster.cluster_id)
+                .filter(EventCluster.cluster_state.in_(['Emerging', 'Active']))
+                .all()
+            )
+            for cluster_id in set(self.centroids) - set(stored):
+                self.remove(cluster_id)
+            stale = {
+                cluster_id for cluster_id, updated_at in stored.items()
+                if cluster_id in self.centroids and cluster_id not in self.dirty
+                and (updated_at is None or self.loaded_at.get(cluster_id) is None
+                     or updated_at > self.loaded_at[cluster_id])
+            }
+            for cluster_id in stale:
+                self.remove(cluster_id)
+            missing = set(stored) - set(self.centroids)
+            if missing:
+                self._load(db, missing)
+            if stale:
+                logger.info(f"Centroid store: reloaded {len(stale)} centroids changed by another process")
+            self.loaded = True
+
+    def _load(self, db: Session, cluster_ids):
+        rows = (
+            db.query(ClusterCentroid.cluster_id, ClusterCentroid.term_counts, ClusterCentroid.evidence_count,
+                     ClusterCentroid.updated_at)
+            .filter(ClusterCentroid.cluster_id.in_(list(cluster_ids)))
+            .all()
+        )
+        for cluster_id, counts, evidence_count, updated_at in rows:
+            self.add(cluster_id, Counter(counts or {}), evidence_count or 0)
+            self.loaded_at[cluster_id] = updated_at
+            self.dirty.discard(cluster_id)
+
+        # Clusters that predate the store: rebuild from their evidence (or title) once
+        remaining = set(cluster_ids) - {row[0] for row in rows}
+        if not remaining:
+            return
+        rebuilt = defaultdict(Counter)
+        sizes = Counter()
+        for cluster_id, extract in (
+            db.query(Evidence.cluster_id, Evidence.extract).filter(Evidence.cluster_id.in_(list(remaining))).all()
+        ):
+            rebuilt[cluster_id].update(term_counts(extract))
+            sizes[cluster_id] += 1
+        for cluster_id, title in (
+            db.query(EventCluster.cluster_id, EventCluster.title).filter(EventCluster.cluster_id.in_(list(remaining))).all()
+        ):
+            self.add(cluster_id, rebuilt.get(cluster_id) or term_counts(title), sizes.get(cluster_id, 0))
+        logger.info(f"Centroid store: loaded {len(rows)} persisted, rebuilt {len(remaining)} centroids")
+
+    def persist(self, db: Session):
+        """Upsert dirty centroids (top CENTROID_MAX_TERMS terms). Does not commit."""
+        with self._lock:
+            if not self.dirty:
+                return
+            now = datetime.now(timezone.utc)
+            rows = []
+            for cluster_id in self.dirty:
+                centroid = self.centroids.get(cluster_id)
+                if centroid is None:
+                    continue
+                if len(centroid) > CENTROID_MAX_TERMS:
+                    # Keep memory and the stored row identical, so a reload matches the same way
+                    for term, _ in centroid.most_common()[CENTROID_MAX_TERMS:]:
+                        n = centroid.pop(term)
+                        self.norm2[cluster_id] -= n * n
+                        members = self.postings.get(term)
+                        if members is not None:
+                            members.discard(cluster_id)
+                            if not members:
+                                del self.postings[term]
+                rows.append({
+                    "cluster_id": cluster_id,
+                    "term_counts": dict(centroid),
+                    "evidence_count": self.evidence_counts[cluster_id],
+                    "updated_at": now,
+                })
+                self.loaded_at[cluster_id] = now
+            if rows:
+                stmt = pg_insert(ClusterCentroid).values(rows)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[ClusterCentroid.cluster_id],
+                    set_={
+                        "term_counts": stmt.excluded.term_counts,
+                        "evidence_count": stmt.excluded.evidence_count,
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+                db.execute(stmt)
+            self.dirty.clear()
+
+    def reset(self):
+        """Forget everything (e.g. after a rollback); the next sync reloads from the database."""
+        with self._lock:
+            self.centroids.clear()
+            self.evidence_counts.clear()
+            self.norm2.clear()
+            self.postings.clear()
+            self.loaded_at.clear()
+            self.dirty.clear()
+            self.loaded = False
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_centroid_store() -> CentroidStore:
+    """Process-wide centroid model (loaded lazily by the first sync)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = CentroidStore()
+        return _store
@@ -0,0 +1,158 @@
+from bisect import bisect_left
+from collections import deque
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Open after this many consecutive failures...
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+# ...or when this share of the last LLM_BREAKER_WINDOW calls failed (once LLM_BREAKER_MIN_CALLS were seen)
+LLM_BREAKER_FAILURE_RATIO = float(os.getenv("LLM_BREAKER_FAILURE_RATIO", "0.5"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+# Successful calls slower than this count as failures for the breaker
+LLM_BREAKER_SLOW_SECONDS = float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "30"))
+# Time spent open before a single half-open probe is let through
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "60"))
+
+LATENCY_BUCKETS = (0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the breaker is open."""
+
+
+class LatencyHistogram:
+    """Cumulative-style latency histogram (upper-bound buckets in seconds, plus +Inf)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.n += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{b}" for b in self.buckets] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.n,
+            "sum_seconds": round(self.total, 3),
+            "mean_seconds": round(self.total / self.n, 3) if self.n else None,
+        }
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after repeated failures or slow calls; open -> half-open after
+    a cooldown, letting one probe through; the probe closes or re-opens it.
+    Thread-safe. Also keeps call telemetry (latency histogram, outcomes) both
+    cumulatively and since the last take_interval() so callers can report per tick.
+    """
+
+    def __init__(self, name: str = "llm", failures: int = None, failure_ratio: float = None,
+                 window: int = None, min_calls: int = None, slow_seconds: float = None,
+                 cooldown_seconds: float = None):
+        self.name = name
+        self.failures = failures or LLM_BREAKER_FAILURES
+        self.failure_ratio = failure_ratio or LLM_BREAKER_FAILURE_RATIO
+        self.min_calls = min_calls or LLM_BREAKER_MIN_CALLS
+        self.slow_seconds = slow_seconds or LLM_BREAKER_SLOW_SECONDS
+        self.cooldown_seconds = cooldown_seconds or LLM_BREAKER_COOLDOWN_SECONDS
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window or LLM_BREAKER_WINDOW)
+        self._consecutive_failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._totals = self._new_counters()
+        self._interval = self._new_counters()
+
+    @staticmethod
+    def _new_counters():
+        return {"calls": 0, "errors": 0, "slow": 0, "rejected": 0, "opened": 0, "latency": LatencyHistogram()}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow(self) -> bool:
+        """True if a call may go out now (in half-open, only the single probe)."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            for counters in (self._totals, self._interval):
+                counters["rejected"] += 1
+            return False
+
+    def record(self, seconds: float, ok: bool):
+        """Report one finished call (ok=False for an exception)."""
+        slow = ok and seconds > self.slow_seconds
+        failed = not ok or slow
+        with self._lock:
+            for counters in (self._totals, self._interval):
+                counters["calls"] += 1
+                counters["errors"] += 0 if ok else 1
+                counters["slow"] += 1 if slow else 0
+                counters["latency"].observe(seconds)
+
+            self._outcomes.append(failed)
+            self._consecutive_failures = self._consecutive_failures + 1 if failed else 0
+            state = self._current_state()
+
+            if state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open("half-open probe failed")
+                else:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info(f"Circuit '{self.name}' closed after successful probe")
+            elif state == CLOSED and failed:
+                ratio = sum(self._outcomes) / len(self._outcomes)
+                if self._consecutive_failures >= self.failures:
+                    self._open(f"{self._consecutive_failures} consecutive failures")
+                elif len(self._outcomes) >= self.min_calls and ratio >= self.failure_ratio:
+                    self._open(f"{ratio:.0%} of last {len(self._outcomes)} calls failed")
+
+    def _open(self, reason: str):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        for counters in (self._totals, self._interval):
+            counters["opened"] += 1
+        logger.warning(f"Circuit '{self.name}' opened: {reason}; retry in {self.cooldown_seconds:.0f}s")
+
+    @staticmethod
+    def _export(counters) -> dict:
+        return dict(counters, latency=counters["latency"].snapshot())
+
+    def snapshot(self) -> dict:
+        """Breaker state plus cumulative telemetry since process start."""
+        with self._lock:
+            return {"name": self.name, "state": self._current_state(), **self._export(self._totals)}
+
+    def take_interval(self) -> dict:
+        """Telemetry since the previous take_interval() call (e.g. one heartbeat tick), then reset it."""
+        with self._lock:
+            interval, self._interval = self._interval, self._new_counters()
+            return {"name": self.name, "state": self._current_state(), **self._export(interval)}
@@ -1,12 +1,316 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text, update
 from ..models import Evidence, EventCluster, RawItem
+from .cluster_index import make_cluster_index
+from . import tfidf_batch
+from .centroid_store import CentroidStore, get_centroid_store, term_counts
+from .bulk_writer import BulkWriter, SequenceAllocator
+from collections import Counter, defaultdict
 from datetime import datetime
+import atexit
 import math
+import multiprocessing
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Matching backend: 'centroid' (cosine against incrementally maintained term centroids),
+# 'naive' (exact title Jaccard over an inverted token index), 'minhash' (MinHash-LSH on titles)
+# or 'tfidf' (vectorized batch assignment; needs numpy + scipy)
+CLUSTER_ENGINE = os.getenv("CLUSTER_ENGINE", "centroid")
+if CLUSTER_ENGINE == "tfidf" and not tfidf_batch.available():
+    # Fail at startup rather than silently clustering with another engine
+    raise RuntimeError("CLUSTER_ENGINE=tfidf needs numpy and scipy (pip install -r requirements.txt)")
+CLUSTER_SIMILARITY_THRESHOLD = float(os.getenv("CLUSTER_SIMILARITY_THRESHOLD", "0.3"))
+# Cosine needed to join a centroid (centroid engine)
+CENTROID_SIMILARITY_THRESHOLD = float(os.getenv("CENTROID_SIMILARITY_THRESHOLD", "0.35"))
+# MinHash-LSH shape: LSH_NUM_PERM hashes split into LSH_BANDS bands (must divide evenly)
+LSH_NUM_PERM = int(os.getenv("LSH_NUM_PERM", "120"))
+LSH_BANDS = int(os.getenv("LSH_BANDS", "40"))
+# Worker processes for domain-sharded clustering (index engines only); 0 or 1 keeps it in-process
+CLUSTER_SHARD_WORKERS = int(os.getenv("CLUSTER_SHARD_WORKERS", "0"))
+
+DOMAINS = ('Universe', 'Earth', 'Human', 'Power', 'Tech', 'Culture')
+_UNSENT = object()
+
+# Existing clusters a run joins are share-locked until it commits, so a compaction
+# merge cannot retract one of them between planning and the evidence UPDATE
+LOCK_JOINED_SQL = text("""
+    select cluster_id, cluster_state, supersedes_cluster_id
+    from event_clusters
+    where cluster_id = any(:ids)
+    order by cluster_id
+    for share
+""")
+
+
+def match_rows(index, rows, new_cluster):
+    """
+    Match (evidence_id, extract) rows against an index in order, creating a
+    cluster via new_cluster(extract, minhash_signature) -> cluster_id whenever
+    nothing is close enough. New clusters are added to the index, so later rows
+    can join them. Returns ({evidence_id: cluster_id}, evidence signature rows).
+    """
+    keep_signatures = index.name == "minhash"
+    threshold = CENTROID_SIMILARITY_THRESHOLD if index.name == "centroid" else CLUSTER_SIMILARITY_THRESHOLD
+    assignments, signatures = {}, []
+
+    for evidence_id, extract in rows:
+        signature = index.signature(extract)
+        if keep_signatures:
+            signatures.append({"evidence_id": evidence_id, "minhash_signature": list(signature)})
+        best_cluster_id, _ = index.best_match(signature, threshold)
+
+        if best_cluster_id is not None:
+            # Add to existing cluster
+            assignments[evidence_id] = best_cluster_id
+            index.absorb(best_cluster_id, signature)
+        else:
+            # Centroids start from the full extract; title-based engines index the title
+            title_signature = signature if index.name == "centroid" else index.signature(extract[:100] + "...")
+            new_id = new_cluster(extract, list(title_signature) if keep_signatures else None)
+            assignments[evidence_id] = new_id
+            # Later evidence in this run can join the new cluster
+            index.add(new_id, title_signature)
+    return assignments, signatures
+
+
+def _new_shard_index(engine):
+    return CentroidStore() if engine == "centroid" else make_cluster_index(engine, num_perm=LSH_NUM_PERM, bands=LSH_BANDS)
+
+
+def _serve_shard(indexes, engine, domain, reset, renames, removals, upserts, rows):
+    """
+    Bring one domain's resident index up to date with the parent's deltas, then
+    cluster the domain's new evidence rows against it. Upserts are
+    (cluster_id, title, stored signature or centroid, evidence_count); renames map
+    last run's shard-local new cluster ids (-1, -2, ...) to their real ids. New
+    clusters are numbered -1, -2, ... again and returned as (leader evidence_id,
+    minhash signature).
+    """
+    if reset or domain not in indexes:
+        indexes[domain] = _new_shard_index(engine)
+    index = indexes[domain]
+    for local_id, cluster_id in renames.items():
+        if index.name == "centroid":
+            counts, count = index.centroids[local_id], index.evidence_counts[local_id]
+            index.remove(local_id)
+            index.add(cluster_id, counts, count)
+        else:
+            signature = index.signatures[local_id] if index.name == "minhash" else index.tokens[local_id]
+            index.remove(local_id)
+            index.add(cluster_id, signature)
+    for cluster_id in removals:
+        index.remove(cluster_id)
+
+    backfill = []
+    for cluster_id, title, stored, evidence_count in upserts:
+        index.remove(cluster_id)
+        if index.name == "centroid":
+            index.add(cluster_id, Counter(stored) if stored is not None else term_counts(title), evidence_count)
+        elif index.name == "minhash" and stored and len(stored) == index.num_perm:
+            index.add(cluster_id, stored)
+        else:
+            signature = index.signature(title)
+            index.add(cluster_id, signature)
+            if index.name == "minhash":
+                backfill.append({"cluster_id": cluster_id, "minhash_signature": list(signature)})
+    if index.name == "centroid":
+        index.dirty.clear()
+
+    new_clusters = []
+
+    def new_cluster(extract, minhash_signature):
+        new_clusters.append(minhash_signature)
+        return -len(new_clusters)
+
+    assignments, signatures = match_rows(index, rows, new_cluster)
+    # First row assigned to each new cluster is its leader (title and domain come from it)
+    first = {}
+    for evidence_id, cluster_id in assignments.items():
+        if cluster_id < 0:
+            first.setdefault(cluster_id, evidence_id)
+    new_clusters = [(first[-(k + 1)], sig) for k, sig in enumerate(new_clusters)]
+    centroids = {}
+    if index.name == "centroid":
+        centroids = {cluster_id: (dict(index.centroids[cluster_id]), index.evidence_counts[cluster_id]) for cluster_id in index.dirty}
+    return assignments, new_clusters, signatures, centroids, backfill
+
+
+def _shard_worker(conn, engine):
+    """
+    Shard worker process: keeps one index per domain it serves for its whole
+    life and answers {domain: task} requests on conn until it gets None.
+    """
+    indexes = {}
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        try:
+            conn.send((True, {domain: _serve_shard(indexes, engine, domain, *task) for domain, task in request.items()}))
+        except Exception as e:
+            # The parent rebuilds every domain this worker serves after an error
+            indexes.clear()
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class ShardPool:
+    """
+    Long-lived domain-sharded clustering workers. Each domain is pinned to one
+    worker process, which keeps that domain's index resident between runs. A
+    run sends a worker only what changed since its last request: clusters that
+    became or stopped being active, clusters whose centroid changed outside
+    the worker (a reload after compaction), the real ids of the clusters it
+    created last time, and the new evidence. Nothing is pickled per run in
+    proportion to the number of clusters.
+
+    The parent tracks what each worker holds as {cluster_id: fingerprint}; any
+    failure, in a worker or in the caller's transaction, drops that record with
+    reset(), so the next request rebuilds the indexes from scratch.
+    """
+
+    def __init__(self, engine: str, workers: int):
+        self.engine = engine
+        self.size = max(1, min(workers, len(DOMAINS)))
+        self.workers = [None] * self.size   # (process, connection) per slot, started lazily
+        self.sent = defaultdict(dict)       # domain -> {cluster_id: fingerprint} held by its worker
+        self.renames = defaultdict(dict)    # domain -> {shard-local id: cluster_id} not yet sent
+        self.stale = set()                  # domains whose worker index must be rebuilt
+        self._lock = threading.Lock()
+
+    def _slot(self, domain) -> int:
+        return (DOMAINS.index(domain) if domain in DOMAINS else len(DOMAINS)) % self.size
+
+    def _worker(self, slot):
+        if self.workers[slot] is None or not self.workers[slot][0].is_alive():
+            parent_conn, child_conn = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_shard_worker, args=(child_conn, self.engine), daemon=True)
+            process.start()
+            child_conn.close()
+            self.workers[slot] = (process, parent_conn)
+            # A fresh process holds nothing
+            for domain in list(self.sent) + list(DOMAINS):
+                if self._slot(domain) == slot:
+                    self._forget(domain)
+        return self.workers[slot][1]
+
+    def _forget(self, domain):
+        self.sent.pop(domain, None)
+        self.renames.pop(domain, None)
+        self.stale.add(domain)
+
+    def match(self, active, evidence, describe):
+        """
+        Cluster evidence {domain: [(evidence_id, extract)]} in the workers.
+        active is {domain: {cluster_id: fingerprint}} for every active cluster;
+        describe(cluster_ids) -> {cluster_id: (title, stored, evidence_count)} is
+        only called for clusters a worker does not hold yet (or holds outdated).
+        Returns {domain: (assignments, new_clusters, signatures, centroids, backfill)}.
+        """
+        with self._lock:
+            tasks, upserts = {}, {}
+            for domain, rows in evidence.items():
+                self._worker(self._slot(domain))
+                current, held = active.get(domain, {}), self.sent[domain]
+                upserts[domain] = [cluster_id for cluster_id, fp in current.items() if held.get(cluster_id, _UNSENT) != fp]
+                removals = [cluster_id for cluster_id in held if cluster_id not in current]
+                tasks[domain] = (domain in self.stale, dict(self.renames[domain]), removals, rows)
+            described = describe([cluster_id for ids in upserts.values() for cluster_id in ids])
+
+            requests = defaultdict(dict)
+            for domain, (reset, renames, removals, rows) in tasks.items():
+                clusters = [(cluster_id, *described[cluster_id]) for cluster_id in upserts[domain]]
+                requests[self._slot(domain)][domain] = (reset, renames, removals, clusters, rows)
+            # Every worker gets its request before any reply is read, so domains run in parallel
+            for slot, request in requests.items():
+                self.workers[slot][1].send(request)
+            results, errors = {}, []
+            for slot, request in requests.items():
+                try:
+                    ok, reply = self.workers[slot][1].recv()
+                except (EOFError, OSError) as e:
+                    ok, reply = False, f"worker exited: {e}"
+                    self.workers[slot] = None
+                if not ok:
+                    errors.append(reply)
+                    for domain in request:
+                        self._forget(domain)
+                    continue
+                results.update(reply)
+                for domain in request:
+                    held = self.sent[domain]
+                    for cluster_id in tasks[domain][2]:
+                        held.pop(cluster_id, None)
+                    for cluster_id in upserts[domain]:
+                        held[cluster_id] = active[domain][cluster_id]
+                    self.renames.pop(domain, None)
+                    self.stale.discard(domain)
+            if errors:
+                raise RuntimeError(f"Shard worker failed: {'; '.join(errors)}")
+            return results
+
+    def created(self, domain, real_ids, fingerprints):
+        """
+        Record what a domain's worker now holds after a run: the real ids of its new
+        clusters (sent with the next request) and {cluster_id: fingerprint} for every
+        cluster it created or changed.
+        """
+        with self._lock:
+            self.renames[domain].update(real_ids)
+            self.sent[domain].update(fingerprints)
+
+    def reset(self):
+        """Forget what the workers hold (e.g. after a rollback); the next request rebuilds their indexes."""
+        with self._lock:
+            for domain in set(self.sent) | set(DOMAINS):
+                self._forget(domain)
+
+    def close(self):
+        with self._lock:
+            for slot, worker in enumerate(self.workers):
+                if worker is None:
+                    continue
+                process, conn = worker
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                self.workers[slot] = None
+
+
+_shard_pool = None
+_shard_pool_lock = threading.Lock()
+
+
+def get_shard_pool(engine: str, workers: int) -> ShardPool:
+    """Process-wide shard workers; replaced when the engine or worker count changes."""
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is not None and (_shard_pool.engine, _shard_pool.size) != (engine, max(1, min(workers, len(DOMAINS)))):
+            _shard_pool.close()
+            _shard_pool = None
+        if _shard_pool is None:
+            _shard_pool = ShardPool(engine, workers)
+            atexit.register(_shard_pool.close)
+        return _shard_pool
+
 
 class ClustererService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, engine: str = None, shard_workers: int = None):
         self.db = db
+        self.engine = engine or CLUSTER_ENGINE
+        if self.engine == "tfidf" and not tfidf_batch.available():
+            raise RuntimeError("The tfidf cluster engine needs numpy and scipy (pip install -r requirements.txt)")
+        self.shard_workers = CLUSTER_SHARD_WORKERS if shard_workers is None else shard_workers
 
     def calculate_similarity(self, text1: str, text2: str) -> float:
         """Naive Jaccard similarity for MVP."""
@@ -26,44 +330,258 @@ class ClustererService:
         if 'art' in text or 'culture' in text or 'movie' in text: return 'Culture'
         return 'Human' # Default
 
+    def build_index(self):
+        """Candidate index over Emerging/Active clusters (one query per run)."""
+        if self.engine == "centroid":
+            # Long-lived in-memory model; only clusters new to this process are read
+            store = get_centroid_store()
+            store.sync(self.db)
+            return store
+        index = make_cluster_index(self.engine, num_perm=LSH_NUM_PERM, bands=LSH_BANDS)
+        active_clusters = (
+            self.db.query(EventCluster.cluster_id, EventCluster.title, EventCluster.minhash_signature)
+            .filter(EventCluster.cluster_state.in_(['Emerging', 'Active']))
+            .all()
+        )
+        missing = []
+        for cluster_id, title, stored in active_clusters:
+            if index.name == "minhash" and stored and len(stored) == index.num_perm:
+                index.add(cluster_id, stored)
+                continue
+            signature = index.signature(title)
+            index.add(cluster_id, signature)
+            if index.name == "minhash":
+                missing.append({"cluster_id": cluster_id, "minhash_signature": list(signature)})
+        if missing:
+            # Clusters that predate the minhash engine (or a num_perm change) are signed once
+            self.db.execute(update(EventCluster), missing)
+        return index
+
     def cluster_evidence(self):
-        """Group unclustered evidence into clusters."""
-        # Get unclustered evidence
-        unclustered = self.db.query(Evidence).filter(Evidence.cluster_id == None).all()
-        
-        for ev in unclustered:
-            # 1. Try to find existing cluster
-            # Look for active clusters updated recently
-            active_clusters = self.db.query(EventCluster).filter(
-                EventCluster.cluster_state.in_(['Emerging', 'Active'])
-            ).all()
-
-            best_cluster = None
-            best_score = 0.3 # Threshold
-
-            for cluster in active_clusters:
-                sim = self.calculate_similarity(ev.extract, cluster.title)
-                if sim > best_score:
-                    best_score = sim
-                    best_cluster = cluster
-            
-            if best_cluster:
-                # Add to existing cluster
-                ev.cluster_id = best_cluster.cluster_id
-                # Touch cluster (Trigger will handle last_updated_at, but we might want explicit logic here too)
-                # But we rely on patch trigger.
+        """
+        Group unclustered evidence into clusters, as one transaction: new cluster
+        ids are drawn from the sequence up front, then the clusters are inserted,
+        evidence is assigned with a single bulk UPDATE, and everything commits
+        together (or rolls back together).
+        """
+        # Get unclustered evidence (plain rows; nothing is tracked by the session)
+        unclustered = (
+            self.db.query(Evidence.evidence_id, Evidence.extract)
+            .filter(Evidence.cluster_id == None)
+            .order_by(Evidence.evidence_id)
+            .all()
+        )
+        if not unclustered:
+            return
+
+        index = None
+        sharded = self.engine != "tfidf" and self.shard_workers > 1
+        try:
+            plan = ClusterPlan(SequenceAllocator(self.db, "event_clusters", "cluster_id"))
+            if self.engine == "tfidf":
+                self._plan_batch(plan, unclustered)
+            elif sharded:
+                if self.engine == "centroid":
+                    index = get_centroid_store()
+                self._plan_sharded(plan, unclustered)
             else:
-                # Create new cluster
-                domain = self.guess_domain(ev.extract)
-                new_cluster = EventCluster(
-                    title=ev.extract[:100] + "...", # Simplified title from extract
-                    domain=domain,
-                    cluster_state='Emerging'
-                )
-                self.db.add(new_cluster)
-                self.db.commit() # Commit to get ID
-                self.db.refresh(new_cluster)
-                
-                ev.cluster_id = new_cluster.cluster_id
-        
-        self.db.commit()
+                # Candidates come from the engine's index (inverted tokens, LSH buckets or
+                # centroid postings), so each extract is only scored against plausible clusters
+                index = self.build_index()
+                self._plan(plan, index, unclustered)
+            redirected = self._apply(plan)
+            if index is not None and index.name == "centroid":
+                # Centroids of merged clusters are rebuilt from the database on the next sync
+                for cluster_id in redirected:
+                    index.remove(cluster_id)
+                index.persist(self.db)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            if index is not None and index.name == "centroid":
+                # Memory is ahead of the rolled-back transaction; reload on the next run
+                index.reset()
+            if sharded:
+                # So are the workers' resident indexes
+                get_shard_pool(self.engine, self.shard_workers).reset()
+            raise
+
+        logger.info(
+            f"Clustered {len(unclustered)} evidence: {len(plan.joined)} existing clusters joined, "
+            f"{len(plan.new_clusters)} new clusters"
+        )
+
+    def _new_cluster(self, plan, extract, minhash_signature=None) -> int:
+        cluster_id = plan.allocator.next_id()
+        plan.new_clusters.append({
+            "cluster_id": cluster_id,
+            "title": extract[:100] + "...", # Simplified title from extract
+            "domain": self.guess_domain(extract),
+            "cluster_state": 'Emerging',
+            "minhash_signature": minhash_signature,
+        })
+        return cluster_id
+
+    def _plan(self, plan, index, unclustered):
+        assignments, signatures = match_rows(index, unclustered, lambda extract, sig: self._new_cluster(plan, extract, sig))
+        plan.assignments.update(assignments)
+        plan.evidence_signatures.extend(signatures)
+
+    def _plan_sharded(self, plan, unclustered):
+        """
+        Domain-sharded mode: evidence is routed by guess_domain to the persistent
+        worker holding that domain's index (see ShardPool), so a domain only ever
+        matches against its own active clusters and each run ships just the new
+        evidence and the index deltas. Shard results come back here and new
+        clusters get their real ids in domain order, so the single writer path
+        is unchanged. Evidence never joins a cluster of another domain.
+        """
+        store = None
+        if self.engine == "centroid":
+            store = get_centroid_store()
+            store.sync(self.db)
+
+        def fingerprint(cluster_id):
+            # Title signatures never change; a centroid is resent when the store's copy differs
+            if store is None:
+                return None
+            return store.evidence_counts.get(cluster_id), store.norm2.get(cluster_id)
+
+        active = defaultdict(dict)
+        for cluster_id, domain in (
+            self.db.query(EventCluster.cluster_id, EventCluster.domain)
+            .filter(EventCluster.cluster_state.in_(['Emerging', 'Active']))
+            .all()
+        ):
+            active[domain][cluster_id] = fingerprint(cluster_id)
+        evidence = defaultdict(list)
+        for evidence_id, extract in unclustered:
+            evidence[self.guess_domain(extract)].append((evidence_id, extract))
+
+        def describe(cluster_ids):
+            """(title, stored signature or centroid, evidence_count) for clusters a worker lacks."""
+            described = {}
+            if not cluster_ids:
+                return described
+            for cluster_id, title, stored in (
+                self.db.query(EventCluster.cluster_id, EventCluster.title, EventCluster.minhash_signature)
+                .filter(EventCluster.cluster_id.in_(cluster_ids))
+                .all()
+            ):
+                if store is not None:
+                    centroid = store.centroids.get(cluster_id)
+                    stored = dict(centroid) if centroid is not None else None
+                described[cluster_id] = (title, stored, store.evidence_counts.get(cluster_id, 0) if store is not None else 0)
+            return described
+
+        pool = get_shard_pool(self.engine, self.shard_workers)
+        results = pool.match(active, evidence, describe)
+
+        signed = []
+        for domain in sorted(results):
+            assignments, new_clusters, signatures, centroids, backfill = results[domain]
+            rows = dict(evidence[domain])
+            # Shard-local new clusters are numbered -1, -2, ...; swap in sequence ids
+            real_ids = {
+                -(k + 1): self._new_cluster(plan, rows[leader_id], sig)
+                for k, (leader_id, sig) in enumerate(new_clusters)
+            }
+            for evidence_id, cluster_id in assignments.items():
+                plan.assignments[evidence_id] = real_ids.get(cluster_id, cluster_id)
+            plan.evidence_signatures.extend(signatures)
+            signed.extend(backfill)
+            changed = set(real_ids.values())
+            if store is not None:
+                # Shards return the centroids they changed; the process-wide store persists them
+                for cluster_id, (counts, count) in centroids.items():
+                    cluster_id = real_ids.get(cluster_id, cluster_id)
+                    store.remove(cluster_id)
+                    store.add(cluster_id, Counter(counts), count)
+                    changed.add(cluster_id)
+            pool.created(domain, real_ids, {cluster_id: fingerprint(cluster_id) for cluster_id in changed})
+        if signed:
+            self.db.execute(update(EventCluster), signed)
+        logger.info(f"Sharded clustering: {len(unclustered)} evidence over {len(results)} domains")
+
+    def _plan_batch(self, plan, unclustered):
+        """
+        TF-IDF batch mode: the whole batch is matched against every active cluster
+        with sparse matrix products, and evidence that matches nothing is grouped
+        into new clusters together (one per group, titled after its first row).
+        """
+        active_clusters = (
+            self.db.query(EventCluster.cluster_id, EventCluster.title)
+            .filter(EventCluster.cluster_state.in_(['Emerging', 'Active']))
+            .all()
+        )
+        cluster_ids = [cluster_id for cluster_id, _ in active_clusters]
+        assigned, groups = tfidf_batch.assign_batch(
+            [extract for _, extract in unclustered], [title or "" for _, title in active_clusters]
+        )
+
+        for (evidence_id, _), col in zip(unclustered, assigned):
+            if col >= 0:
+                plan.assignments[evidence_id] = cluster_ids[col]
+        for group in groups:
+            new_id = self._new_cluster(plan, unclustered[group[0]][1])
+            for idx in group:
+                plan.assignments[unclustered[idx][0]] = new_id
+
+    def _redirect_merged(self, plan):
+        """
+        Lock the existing clusters the plan joins and point evidence aimed at one
+        the compactor absorbed since planning at its survivor instead. Returns the
+        absorbed and surviving cluster ids involved.
+        """
+        redirects = {}
+        ids = plan.joined
+        locked = set(ids)
+        while ids:
+            merged = {
+                cluster_id: survivor_id
+                for cluster_id, state, survivor_id in self.db.execute(LOCK_JOINED_SQL, {"ids": ids})
+                if state == 'Retracted' and survivor_id is not None
+            }
+            redirects.update(merged)
+            # A survivor may itself have been merged by a later run
+            ids = sorted(set(merged.values()) - locked)
+            locked.update(ids)
+        if not redirects:
+            return set()
+
+        def survivor(cluster_id):
+            while cluster_id in redirects:
+                cluster_id = redirects[cluster_id]
+            return cluster_id
+
+        plan.assignments = {evidence_id: survivor(cluster_id) for evidence_id, cluster_id in plan.assignments.items()}
+        logger.info(f"Clustering: {len(redirects)} joined clusters were merged meanwhile; evidence sent to their survivors")
+        return set(redirects) | {survivor(cluster_id) for cluster_id in redirects}
+
+    def _apply(self, plan):
+        """Write the plan. Returns the clusters whose evidence had to be redirected (see _redirect_merged)."""
+        redirected = self._redirect_merged(plan)
+        writer = BulkWriter(self.db)
+        writer.insert_clusters(plan.new_clusters)
+        writer.assign_evidence(plan.assignments)
+        if plan.evidence_signatures:
+            self.db.execute(update(Evidence), plan.evidence_signatures)
+        # Assigning by UPDATE does not fire the evidence insert trigger, so touch joined clusters here
+        writer.touch_clusters(plan.joined)
+        return redirected
+
+
+class ClusterPlan:
+    """Everything one clustering run will write, applied in a single transaction."""
+
+    def __init__(self, allocator: SequenceAllocator):
+        self.allocator = allocator
+        self.new_clusters = []          # event_clusters rows with preallocated ids
+        self.assignments = {}           # evidence_id -> cluster_id
+        self.evidence_signatures = []   # minhash engine only
+
+    @property
+    def joined(self):
+        """Existing clusters that received evidence this run."""
+        new_ids = {row["cluster_id"] for row in self.new_clusters}
+        return sorted(set(self.assignments.values()) - new_ids)
@@ -0,0 +1,178 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert, update, text
+from ..models import ClusterActivityLog, ClusterCentroid, ClusterCompactionState, EventCluster
+from .bulk_writer import BulkWriter
+from .centroid_store import get_centroid_store
+from .cluster_index import make_cluster_index
+from datetime import datetime, timezone
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Index used to find merge targets: 'naive' (exact title Jaccard) or 'minhash'
+COMPACTION_ENGINE = os.getenv("COMPACTION_ENGINE", "naive")
+# Title similarity needed to merge; stricter than joining, since a merge is not undone
+COMPACTION_SIMILARITY_THRESHOLD = float(os.getenv("COMPACTION_SIMILARITY_THRESHOLD", "0.6"))
+# Wall-clock budget per run; unprobed clusters wait for the next run
+COMPACTION_TIME_BUDGET_SECONDS = float(os.getenv("COMPACTION_TIME_BUDGET_SECONDS", "30"))
+# Merges applied (and committed) per batch
+COMPACTION_BATCH_SIZE = int(os.getenv("COMPACTION_BATCH_SIZE", "200"))
+
+LEVEL_COUNTS_SQL = text("""
+    select cluster_id, level, count(*)
+    from evidence
+    where cluster_id = any(:ids)
+    group by cluster_id, level
+""")
+
+MOVE_EVIDENCE_SQL = text("""
+    update evidence e
+    set cluster_id = v.survivor_id
+    from unnest(cast(:absorbed_ids as int[]), cast(:survivor_ids as int[])) as v(absorbed_id, survivor_id)
+    where e.cluster_id = v.absorbed_id
+""")
+
+
+class ClusterCompactor:
+    """
+    Offline merge of near-duplicate clusters left behind by greedy one-pass
+    assignment. Active clusters are walked in cluster_id order through one
+    similarity index per domain; a cluster that matches an older one above
+    COMPACTION_SIMILARITY_THRESHOLD is absorbed into it:
+
+      - its evidence moves to the surviving cluster (one bulk UPDATE per batch)
+      - it is marked Retracted + corrected_flag, with supersedes_cluster_id
+        pointing at the cluster that absorbed it
+      - a 'correction' activity log records the merge
+
+    Progress (the last probed cluster_id) is kept in cluster_compaction_state,
+    so each run only probes clusters created since and stops when its time
+    budget is spent.
+    """
+
+    job = "merge"
+
+    def __init__(self, db: Session, budget_seconds: float = None, threshold: float = None,
+                 engine: str = None, batch_size: int = None):
+        self.db = db
+        self.budget_seconds = COMPACTION_TIME_BUDGET_SECONDS if budget_seconds is None else budget_seconds
+        self.threshold = threshold or COMPACTION_SIMILARITY_THRESHOLD
+        self.engine = engine or COMPACTION_ENGINE
+        self.batch_size = batch_size or COMPACTION_BATCH_SIZE
+
+    def _state(self) -> ClusterCompactionState:
+        state = self.db.get(ClusterCompactionState, self.job)
+        if state is None:
+            state = ClusterCompactionState(job=self.job, last_cluster_id=0, merged_total=0)
+            self.db.add(state)
+        return state
+
+    def run(self) -> dict:
+        """Probe clusters past the saved cursor until done or out of budget. Returns run stats."""
+        started = time.monotonic()
+        stats = {"probed": 0, "merged": 0, "evidence_moved": 0, "complete": True}
+        try:
+            state = self._state()
+            cursor = state.last_cluster_id
+            clusters = (
+                self.db.query(EventCluster.cluster_id, EventCluster.domain, EventCluster.title)
+                .filter(EventCluster.cluster_state.in_(['Emerging', 'Active']))
+                .order_by(EventCluster.cluster_id)
+                .all()
+            )
+            indexes = {}
+            merges = []
+            for cluster_id, domain, title in clusters:
+                if domain not in indexes:
+                    indexes[domain] = make_cluster_index(self.engine)
+                index = indexes[domain]
+                signature = index.signature(title)
+                if cluster_id > cursor:
+                    if time.monotonic() - started > self.budget_seconds:
+                        stats["complete"] = False
+                        break
+                    stats["probed"] += 1
+                    cursor = cluster_id
+                    # Older clusters only, so the survivor is always the earlier cluster
+                    target_id, score = index.best_match(signature, self.threshold)
+                    if target_id is not None:
+                        merges.append((cluster_id, target_id, round(score, 4)))
+                        if len(merges) >= self.batch_size:
+                            self._apply(merges, state, cursor, stats)
+                            merges = []
+                        # Absorbed clusters never become merge targets
+                        continue
+                index.add(cluster_id, signature)
+            self._apply(merges, state, cursor, stats)
+        except Exception:
+            self.db.rollback()
+            raise
+
+        stats["seconds"] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"Compaction: probed {stats['probed']}, merged {stats['merged']} clusters "
+            f"({stats['evidence_moved']} evidence) in {stats['seconds']}s"
+        )
+        return stats
+
+    def _apply(self, merges, state: ClusterCompactionState, cursor: int, stats: dict):
+        """Apply a batch of (absorbed_id, survivor_id, similarity) merges and advance the cursor, in one commit."""
+        if merges:
+            absorbed_ids = [absorbed_id for absorbed_id, _, _ in merges]
+            survivor_ids = [survivor_id for _, survivor_id, _ in merges]
+
+            # Retract first: the row locks make a clustering run that is joining an absorbed
+            # cluster finish before the evidence is counted and moved (or, if it starts later,
+            # wait for this commit and follow supersedes_cluster_id to the survivor)
+            self.db.execute(update(EventCluster), [
+                {
+                    "cluster_id": absorbed_id,
+                    "cluster_state": 'Retracted',
+                    "corrected_flag": True,
+                    "supersedes_cluster_id": survivor_id,
+                }
+                for absorbed_id, survivor_id, _ in merges
+            ])
+
+            moved = {
+                cluster_id: {"L5": 0, "L4": 0, "L3": 0, "L2": 0, "L1": 0}
+                for cluster_id in absorbed_ids
+            }
+            for cluster_id, level, n in self.db.execute(LEVEL_COUNTS_SQL, {"ids": absorbed_ids}):
+                moved[cluster_id][f"L{level}"] = n
+
+            self.db.execute(MOVE_EVIDENCE_SQL, {"absorbed_ids": absorbed_ids, "survivor_ids": survivor_ids})
+            BulkWriter(self.db).touch_clusters(set(survivor_ids))
+            self.db.execute(insert(ClusterActivityLog), [
+                {
+                    "cluster_id": absorbed_id,
+                    "log_type": 'correction',
+                    "log_data": {
+                        "method_version": "governance_1.0",
+                        "reason": "merged",
+                        "merged_into_cluster_id": survivor_id,
+                        "similarity": similarity,
+                        # Evidence the surviving cluster gained from this one
+                        "added_evidence_by_level": moved[absorbed_id],
+                    },
+                }
+                for absorbed_id, survivor_id, similarity in merges
+            ])
+
+            # Without a stored row, every process's centroid store rebuilds the survivor from its
+            # (now larger) evidence on its next sync, and drops the Retracted cluster
+            touched = absorbed_ids + survivor_ids
+            self.db.execute(delete(ClusterCentroid).where(ClusterCentroid.cluster_id.in_(touched)))
+            store = get_centroid_store()
+            for cluster_id in touched:
+                store.remove(cluster_id)
+
+            stats["merged"] += len(merges)
+            stats["evidence_moved"] += sum(sum(levels.values()) for levels in moved.values())
+
+        state.last_cluster_id = cursor
+        state.merged_total = (state.merged_total or 0) + len(merges)
+        state.updated_at = datetime.now(timezone.utc)
+        self.db.commit()
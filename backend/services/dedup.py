@@ -0,0 +1,89 @@
+from sqlalchemy.orm import Session
+from ..models import RawItem
+import hashlib
+import math
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Bloom sizing: capacity grows with raw_items, false positives only cost a DB lookup
+BLOOM_ERROR_RATE = float(os.getenv("DEDUP_BLOOM_ERROR_RATE", "0.01"))
+BLOOM_MIN_CAPACITY = int(os.getenv("DEDUP_BLOOM_MIN_CAPACITY", "100000"))
+
+
+class BloomFilter:
+    """Plain bit-array Bloom filter with double hashing."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.num_bits = max(8, int(math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class ContentHashFilter:
+    """
+    In-process membership filter for raw_items.content_hash.
+    A Bloom miss means "definitely new"; only Bloom hits are confirmed against
+    the DB, in one IN (...) query per feed.
+    """
+
+    def __init__(self):
+        self.bloom = None
+
+    @property
+    def warmed(self) -> bool:
+        # Past capacity the false positive rate climbs, so rebuild from the table
+        return self.bloom is not None and self.bloom.count <= self.bloom.capacity
+
+    def warm(self, db: Session):
+        """(Re)build the filter from every content_hash in raw_items."""
+        total = db.query(RawItem.content_hash).count()
+        bloom = BloomFilter(max(BLOOM_MIN_CAPACITY, total * 2))
+        for (content_hash,) in db.query(RawItem.content_hash).yield_per(10000):
+            bloom.add(content_hash)
+        self.bloom = bloom
+        logger.info(f"Content hash filter warmed with {bloom.count} hashes ({len(bloom.bits) // 1024} KiB)")
+
+    def add(self, content_hash: str):
+        if self.bloom is not None:
+            self.bloom.add(content_hash)
+
+    def filter_new(self, db: Session, hashes):
+        """Return the subset of `hashes` not yet present in raw_items."""
+        if not self.warmed:
+            self.warm(db)
+
+        hashes = set(hashes)
+        maybe_seen = [h for h in hashes if h in self.bloom]
+        if not maybe_seen:
+            return hashes
+
+        known = {
+            row[0] for row in db.query(RawItem.content_hash).filter(RawItem.content_hash.in_(maybe_seen)).all()
+        }
+        return hashes - known
+
+
+# Process-wide filter, warmed on first use (i.e. at worker startup)
+_content_hash_filter = ContentHashFilter()
+
+
+def get_content_hash_filter() -> ContentHashFilter:
+    return _content_hash_filter
@@ -0,0 +1,47 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Dirty clusters claimed per tick; the rest wait for the next one
+DIRTY_CLAIM_BATCH = int(os.getenv("DIRTY_CLAIM_BATCH", "5000"))
+
+CLAIM_SQL = text("""
+    with claimed as (
+      select cluster_id
+      from dirty_clusters
+      order by first_dirtied_at
+      limit :limit
+      for update skip locked
+    )
+    delete from dirty_clusters d
+    using claimed
+    where d.cluster_id = claimed.cluster_id
+    returning d.cluster_id, d.added_l5, d.added_l4, d.added_l3, d.added_l2, d.added_l1
+""")
+
+
+class DirtyClusterTracker:
+    """
+    Reads the dirty_clusters set kept by the evidence triggers (patch_dirty_clusters.sql):
+    every cluster that gained evidence, on insert or on later assignment, with
+    per-level counts of what it gained since it was last claimed.
+    """
+
+    def __init__(self, db: Session, batch_size: int = None):
+        self.db = db
+        self.batch_size = batch_size or DIRTY_CLAIM_BATCH
+
+    def claim(self) -> dict:
+        """
+        Remove up to batch_size dirty clusters (oldest first) and return
+        {cluster_id: {"L5": n, ..., "L1": n}}. Does not commit: the claim is
+        committed with the caller's scores/logs, so a failed tick rolls it back.
+        """
+        rows = self.db.execute(CLAIM_SQL, {"limit": self.batch_size}).all()
+        return {
+            cluster_id: {"L5": l5, "L4": l4, "L3": l3, "L2": l2, "L1": l1}
+            for cluster_id, l5, l4, l3, l2, l1 in rows
+        }
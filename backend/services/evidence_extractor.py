@@ -1,8 +1,68 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from ..models import RawItem, Evidence, Source
-import json
-import re
-import os
+from .bulk_writer import BulkWriter, evidence_row
+from .llm_engine import get_extraction_engine
+from .circuit_breaker import CircuitOpenError
+from .analysis_cache import AnalysisCache
+from .keyword_rules import get_keyword_classifier
+
+def keyword_evidence_rows(item_id, content, url, canonical_url, content_hash, fetched_at, source_type):
+    """Keyword rules -> evidence row dicts. Pure CPU, safe to run in worker processes."""
+    pointer_base = {
+        "url": canonical_url or url,
+        "source_hash": content_hash,
+        "captured_at": fetched_at.isoformat() if fetched_at else None
+    }
+    return [
+        {
+            "raw_item_id": item_id,
+            "cluster_id": None,
+            "level": level,
+            "extract": sent,
+            "pointer": dict(pointer_base, match_text=sent[:50] + "..."),
+            "reliability_score": 0.9 if level >= 4 else 0.6,
+            "evidence_kind": kind
+        }
+        for sent, level, kind in get_keyword_classifier().classify(content, url, source_type)
+    ]
+
+EVIDENCE_KINDS = ('fact', 'quote', 'data', 'inference')
+
+
+def validate_llm_result(data):
+    """
+    Normalise one parsed LLM result to the evidence table's constraints, or
+    None if it cannot be stored (the item then falls back to keywords alone,
+    instead of one bad row aborting the whole batch INSERT). level must be an
+    integer 1-5 and extract non-empty text; an unknown kind becomes 'inference'
+    and reliability_score is clamped to [0, 1].
+    """
+    if not isinstance(data, dict):
+        return None
+    level = data.get('level', 3)
+    if isinstance(level, str) and level.strip().isdigit():
+        level = int(level)
+    elif isinstance(level, float) and level.is_integer():
+        level = int(level)
+    if isinstance(level, bool) or not isinstance(level, int) or not 1 <= level <= 5:
+        return None
+    extract = data.get('extract')
+    if not isinstance(extract, str) or not extract.strip():
+        return None
+    kind = data.get('kind')
+    kind = kind.lower() if isinstance(kind, str) else None
+    try:
+        reliability = min(1.0, max(0.0, float(data.get('reliability_score', 0.5))))
+    except (TypeError, ValueError):
+        reliability = 0.5
+    return dict(
+        data,
+        level=level,
+        extract=extract.strip(),
+        kind=kind if kind in EVIDENCE_KINDS else 'inference',
+        reliability_score=reliability,
+    )
+
 
 class EvidenceExtractor:
     def __init__(self, db: Session):
@@ -10,131 +70,110 @@ class EvidenceExtractor:
 
     def process_item(self, raw_item_id: int):
         """Extract evidence from a raw item using Gemini AI (with keyword fallback)."""
-        item = self.db.query(RawItem).filter(RawItem.item_id == raw_item_id).first()
-        if not item:
-            return []
+        return self.process_items([raw_item_id])
 
-        # Check for Gemini Key
-        gemini_key = os.getenv("GEMINI_API_KEY")
-        
-        if gemini_key:
-            return self._analyze_with_gemini(item, gemini_key)
-        else:
-            return self._analyze_with_keywords(item)
-
-    def _analyze_with_gemini(self, item, api_key):
-        """Use Google Gemini 1.5 Flash to analyze text."""
-        import google.generativeai as genai
-        
-        print(f"🧠 AI-ANALYSIS: Processing Item {item.item_id} with Gemini...")
-        genai.configure(api_key=api_key)
-        # Using 2.5 Flash (Standard 2026 Model)
-        model = genai.GenerativeModel('gemini-2.5-flash')
-
-        prompt = f"""
-        Analyze the following news item for an "AI Civilization Observer" system.
-        
-        SOURCE URL: {item.url}
-        CONTENT:
-        {item.content[:2000]}... (truncated)
-
-        Task:
-        1. Identify the single most critical claim or event.
-        2. Classify its 'Civilization Impact Level' (L1-L5):
-           - L5: Official Fact (Gov reports, Financial statements, Court rulings)
-           - L4: Strong Evidence (Direct quotes, Data tables, Verifiable photos)
-           - L3: Secondary Report (News summaries, Analysis)
-           - L2: Social Chatter (Tweets, Forum posts)
-           - L1: Speculation (Rumors, Predictions, 'Might', 'Could')
-        3. Assess its Reliability (0.0 - 1.0).
-
-        Return JSON only:
-        {{
-            "extract": "One sentence summary of the core event",
-            "level": <int 1-5>,
-            "reliability_score": <float 0.0-1.0>,
-            "kind": "fact|inference|hazard|data"
-        }}
+    def process_items(self, raw_item_ids, analyses: dict = None):
         """
+        Extract evidence for many raw items at once. With an LLM configured, items
+        are packed into batched prompts and run through the rate-limited engine;
+        any item the LLM fails on falls back to keywords. One bulk write at the end.
 
-        try:
-            response = model.generate_content(prompt)
-            # Simple JSON cleanup (Gemini sometimes wraps in ```json ... ```)
-            text = response.text.replace("```json", "").replace("```", "").strip()
-            data = json.loads(text)
-
-            # Construct Evidence
-            evidence = Evidence(
-                raw_item_id=item.item_id,
-                cluster_id=None,
-                level=data.get('level', 3),
-                extract=data.get('extract', "AI Extraction Failed"),
-                pointer={
-                    "url": item.canonical_url or item.url,
-                    "match_text": "Generative Analysis",
-                    "source_hash": item.content_hash,
-                    "model": "gemini-1.5-flash"
-                },
-                reliability_score=data.get('reliability_score', 0.5),
-                evidence_kind=data.get('kind', 'inference')
-            )
-            
-            self.db.add(evidence)
-            self.db.commit()
-            return [evidence]
-
-        except Exception as e:
-            print(f"❌ AI Error: {e}")
-            return self._analyze_with_keywords(item)
-
-    def _analyze_with_keywords(self, item):
-        """Legacy keyword-based extraction."""
-        print("⚠️  Fallback: Using Keyword Analysis")
-        extracted_evidence = []
-        sentences = re.split(r'(?<=[.!?])\s+', item.content)
-        
-        is_official_source = item.source.source_type == 'official'
-        
-        for idx, sent in enumerate(sentences):
-            if len(sent) < 20: continue 
-
-            level = 3
-            kind = 'fact'
-            lower_sent = sent.lower()
-
-            # L1: Inference
-            if any(w in lower_sent for w in ['predicts', 'might', 'speculates', 'rumor']):
-                level = 1
-                kind = 'inference'
-            # L2: Social
-            elif 'twitter' in item.url or 'weibo' in item.url:
-                level = 2
-            # L5: Official
-            elif is_official_source or 'official statement' in lower_sent or 'report' in lower_sent:
-                level = 5
-            # L4: Strong Secondary
-            elif 'according to' in lower_sent:
-                level = 4
-                kind = 'quote'
-
-            pointer = {
+        analyses is an optional {item_id: LLM result or error} memo shared by retries
+        of the same items (see ExtractionQueue._extract): items already in it are not
+        sent to the LLM again, even though a rollback discarded their cache rows.
+        """
+        if not raw_item_ids:
+            return []
+        items = (
+            self.db.query(RawItem)
+            .options(selectinload(RawItem.source))  # keyword fallback reads source_type per item
+            .filter(RawItem.item_id.in_(list(raw_item_ids)))
+            .filter(RawItem.duplicate_of_item_id == None)  # near-duplicates share the original's evidence
+            .all()
+        )
+        if not items:
+            return []
+
+        engine = get_extraction_engine()
+        if not engine:
+            print("⚠️  Fallback: Using Keyword Analysis")
+            return self._persist([ev for item in items for ev in self._keyword_evidence(item)])
+
+        # Cached analyses (same content_hash, prompt version and model) skip the API entirely
+        cache = AnalysisCache(self.db, model=engine.model_name)
+        cached = {}
+        for content_hash, data in cache.get_many([item.content_hash for item in items]).items():
+            valid = validate_llm_result(data)
+            if valid is not None:
+                cached[content_hash] = valid
+        uncached = [item for item in items if item.content_hash not in cached]
+        analyses = {} if analyses is None else analyses
+        to_analyze = [item for item in uncached if item.item_id not in analyses]
+
+        if to_analyze:
+            print(f"🧠 AI-ANALYSIS: Processing {len(to_analyze)} items with {engine.model_name} ({len(cached)} cached)...")
+            fresh = engine.analyze([
+                {"item_id": item.item_id, "url": item.url, "content": item.content} for item in to_analyze
+            ])
+            for item_id, data in fresh.items():
+                if isinstance(data, dict):
+                    fresh[item_id] = validate_llm_result(data) or ValueError(f"unusable LLM result: {data!r:.200}")
+            analyses.update(fresh)
+        results = {item.item_id: analyses[item.item_id] for item in uncached if item.item_id in analyses}
+        # Only usable results are cached (again, for memo hits whose earlier write was rolled back)
+        cache.put_many({
+            item.content_hash: results[item.item_id]
+            for item in uncached if isinstance(results.get(item.item_id), dict)
+        })
+
+        evidence = []
+        short_circuited = 0
+        for item in items:
+            data = cached.get(item.content_hash, results.get(item.item_id))
+            if isinstance(data, dict):
+                evidence.append(self._evidence_from_llm(item, data, engine.model_name))
+                continue
+            if isinstance(data, CircuitOpenError):
+                short_circuited += 1
+            else:
+                print(f"❌ AI Error (item {item.item_id}): {data}")
+            evidence.extend(self._keyword_evidence(item))
+        if short_circuited:
+            print(f"⚡ LLM circuit open: {short_circuited} items routed straight to keyword analysis")
+        return self._persist(evidence)
+
+    def _evidence_from_llm(self, item, data, model_name):
+        """Construct Evidence from one validated LLM result (see validate_llm_result)."""
+        return Evidence(
+            raw_item_id=item.item_id,
+            cluster_id=None,
+            level=data['level'],
+            extract=data['extract'],
+            pointer={
                 "url": item.canonical_url or item.url,
-                "match_text": sent[:50] + "...",
+                "match_text": "Generative Analysis",
                 "source_hash": item.content_hash,
-                "captured_at": item.fetched_at.isoformat() if item.fetched_at else None
-            }
-
-            evidence = Evidence(
-                raw_item_id=item.item_id,
-                cluster_id=None,
-                level=level,
-                extract=sent,
-                pointer=pointer,
-                reliability_score=0.9 if level >=4 else 0.6,
-                evidence_kind=kind
+                "model": model_name
+            },
+            reliability_score=data['reliability_score'],
+            evidence_kind=data['kind']
+        )
+
+    def _keyword_evidence(self, item):
+        """Keyword rules -> unsaved Evidence objects."""
+        return [
+            Evidence(**row)
+            for row in keyword_evidence_rows(
+                item.item_id, item.content, item.url, item.canonical_url, item.content_hash,
+                item.fetched_at, item.source.source_type if item.source else None
             )
-            extracted_evidence.append(evidence)
-            self.db.add(evidence)
-        
+        ]
+
+    def _persist(self, evidence_list):
+        """Write evidence in one multi-row INSERT and attach the generated ids."""
+        if evidence_list:
+            ids = BulkWriter(self.db).insert_evidence([evidence_row(ev) for ev in evidence_list])
+            for ev, evidence_id in zip(evidence_list, ids):
+                ev.evidence_id = evidence_id
         self.db.commit()
-        return extracted_evidence
+        return evidence_list
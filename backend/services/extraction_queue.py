@@ -0,0 +1,197 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models import ExtractionQueueItem
+from .evidence_extractor import EvidenceExtractor
+import os
+import socket
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_QUEUE_BATCH_SIZE = int(os.getenv("EXTRACT_QUEUE_BATCH_SIZE", "50"))
+EXTRACT_QUEUE_MAX_ATTEMPTS = int(os.getenv("EXTRACT_QUEUE_MAX_ATTEMPTS", "5"))
+# Retry n waits BACKOFF_SECONDS * 2^(n-1), capped at BACKOFF_MAX_SECONDS
+EXTRACT_QUEUE_BACKOFF_SECONDS = int(os.getenv("EXTRACT_QUEUE_BACKOFF_SECONDS", "30"))
+EXTRACT_QUEUE_BACKOFF_MAX_SECONDS = int(os.getenv("EXTRACT_QUEUE_BACKOFF_MAX_SECONDS", "3600"))
+# A claim older than this is assumed to belong to a crashed worker and is handed out again
+EXTRACT_QUEUE_LEASE_SECONDS = int(os.getenv("EXTRACT_QUEUE_LEASE_SECONDS", "900"))
+EXTRACT_QUEUE_IDLE_SECONDS = int(os.getenv("EXTRACT_QUEUE_IDLE_SECONDS", "10"))
+
+CLAIM_SQL = text("""
+    with claimable as (
+      select item_id
+      from extraction_queue
+      where (status = 'pending' and available_at <= now())
+         or (status = 'processing' and claimed_at < now() - make_interval(secs => :lease))
+      order by available_at
+      limit :batch
+      for update skip locked
+    )
+    update extraction_queue q
+    set status = 'processing', claimed_at = now(), claimed_by = :worker, attempts = q.attempts + 1
+    from claimable
+    where q.item_id = claimable.item_id
+    returning q.item_id
+""")
+
+FAIL_SQL = text("""
+    update extraction_queue
+    set status = case when attempts >= :max_attempts then 'dead' else 'pending' end,
+        available_at = now() + make_interval(secs => least(:backoff * power(2, greatest(attempts - 1, 0)), :backoff_max)),
+        finished_at = case when attempts >= :max_attempts then now() else null end,
+        last_error = :error,
+        claimed_by = null
+    where item_id = any(:ids) and status = 'processing' and claimed_by = :worker
+""")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ExtractionQueue:
+    """
+    Durable extraction work queue (table extraction_queue). Claims are taken
+    with FOR UPDATE SKIP LOCKED and committed straight away, so any number of
+    workers can drain it in parallel without handing out the same item twice.
+    """
+
+    def __init__(self, db: Session, worker_id: str = None):
+        self.db = db
+        self.worker_id = worker_id or default_worker_id()
+
+    def enqueue(self, item_ids):
+        """Queue raw items for extraction (already-queued ids are left alone). Does not commit."""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return
+        self.db.execute(
+            pg_insert(ExtractionQueueItem)
+            .values([{"item_id": item_id} for item_id in item_ids])
+            .on_conflict_do_nothing(index_elements=[ExtractionQueueItem.item_id])
+        )
+
+    def claim(self, batch_size: int = None):
+        """Claim up to batch_size due items for this worker. Commits the claim."""
+        # Items whose workers kept dying mid-batch are dead-lettered instead of reclaimed forever
+        self.db.execute(text("""
+            update extraction_queue
+            set status = 'dead', finished_at = now(), last_error = 'lease expired after final attempt'
+            where status = 'processing' and attempts >= :max_attempts
+              and claimed_at < now() - make_interval(secs => :lease)
+        """), {"max_attempts": EXTRACT_QUEUE_MAX_ATTEMPTS, "lease": EXTRACT_QUEUE_LEASE_SECONDS})
+        ids = self.db.execute(CLAIM_SQL, {
+            "batch": batch_size or EXTRACT_QUEUE_BATCH_SIZE,
+            "worker": self.worker_id,
+            "lease": EXTRACT_QUEUE_LEASE_SECONDS,
+        }).scalars().all()
+        self.db.commit()
+        return ids
+
+    def complete(self, item_ids):
+        """
+        Mark items this worker still holds as done and return their ids; claims that
+        expired and went to another worker are left alone. Does not commit (commit
+        together with the evidence).
+        """
+        if not item_ids:
+            return []
+        return self.db.execute(text("""
+            update extraction_queue
+            set status = 'done', finished_at = now(), last_error = null
+            where item_id = any(:ids) and status = 'processing' and claimed_by = :worker
+            returning item_id
+        """), {"ids": list(item_ids), "worker": self.worker_id}).scalars().all()
+
+    def fail(self, item_ids, error: str):
+        """Return claimed items for a retry with backoff, or dead-letter them. Commits."""
+        if not item_ids:
+            return
+        self.db.execute(FAIL_SQL, {
+            "ids": list(item_ids),
+            "worker": self.worker_id,
+            "error": (error or "")[:2000],
+            "max_attempts": EXTRACT_QUEUE_MAX_ATTEMPTS,
+            "backoff": EXTRACT_QUEUE_BACKOFF_SECONDS,
+            "backoff_max": EXTRACT_QUEUE_BACKOFF_MAX_SECONDS,
+        })
+        self.db.commit()
+
+    def requeue_dead(self, item_ids=None):
+        """Put dead-lettered items (all, or the given ids) back in the queue. Commits."""
+        self.db.execute(text("""
+            update extraction_queue
+            set status = 'pending', attempts = 0, available_at = now(), finished_at = null
+            where status = 'dead' and (cast(:ids as int[]) is null or item_id = any(:ids))
+        """), {"ids": list(item_ids) if item_ids is not None else None})
+        self.db.commit()
+
+    def depth(self) -> dict:
+        """Row counts per status."""
+        rows = self.db.execute(text("select status, count(*) from extraction_queue group by status")).all()
+        return dict(rows)
+
+    def process_batch(self, batch_size: int = None):
+        """
+        Claim one batch and extract it. Returns (claimed, new_evidence); claimed is
+        0 when the queue has nothing due.
+        """
+        ids = self.claim(batch_size)
+        if not ids:
+            return 0, 0
+        return len(ids), self._extract(ids, {})
+
+    def _extract(self, ids, analyses):
+        """
+        Extract claimed items and settle them in one transaction. A failing batch is
+        split in half and retried, so only the items that fail on their own are
+        charged the attempt. analyses keeps the LLM results across the retries, so
+        a split only redoes the database work. Returns the new evidence count.
+        """
+        try:
+            # Queue transition commits together with the evidence; the row locks it takes
+            # keep a worker that reclaims an expired lease from extracting the same items
+            owned = self.complete(ids)
+            evidence = EvidenceExtractor(self.db).process_items(owned, analyses)
+            self.db.commit()
+            return len(evidence)
+        except Exception as e:
+            self.db.rollback()
+            if len(ids) == 1:
+                logger.error(f"Extraction failed for queued item {ids[0]}: {e}")
+                self.fail(ids, str(e))
+                return 0
+            logger.warning(f"Extraction failed for {len(ids)} queued items, splitting the batch: {e}")
+        mid = len(ids) // 2
+        return self._extract(ids[:mid], analyses) + self._extract(ids[mid:], analyses)
+
+    def drain(self, batch_size: int = None, max_batches: int = None):
+        """Process batches until the queue has nothing due (or max_batches). Returns new evidence count."""
+        total, batches = 0, 0
+        while max_batches is None or batches < max_batches:
+            claimed, new_evidence = self.process_batch(batch_size)
+            if not claimed:
+                break
+            total += new_evidence
+            batches += 1
+        return total
+
+    def run_forever(self, batch_size: int = None):
+        """Standalone worker loop; run as many of these as the LLM quota allows."""
+        while True:
+            claimed, _ = self.process_batch(batch_size)
+            if not claimed:
+                time.sleep(EXTRACT_QUEUE_IDLE_SECONDS)
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        ExtractionQueue(db).run_forever()
+    finally:
+        db.close()
@@ -0,0 +1,263 @@
+import http.client
+import gzip
+import os
+import ssl
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tunables (env overridable, same convention as DATABASE_URL / GEMINI_API_KEY)
+MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "16"))
+PER_HOST_LIMIT = int(os.getenv("INGEST_PER_HOST_LIMIT", "2"))
+FETCH_TIMEOUT = float(os.getenv("INGEST_FETCH_TIMEOUT", "15"))
+# Bodies larger than this are not buffered; the caller streams them instead
+MAX_BODY_BYTES = int(os.getenv("INGEST_MAX_BODY_BYTES", str(2 * 1024 * 1024)))
+MAX_REDIRECTS = 5
+USER_AGENT = "ai-civil-ingestor/1.0 (+https://github.com/Jamessheung/ai-civil)"
+
+# Connection errors that mean a pooled keep-alive socket went stale under us
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, BrokenPipeError, ConnectionResetError)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    body: Optional[bytes] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    too_large: bool = False  # body exceeded max_body_bytes and was not downloaded
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+
+class _HostPool:
+    """Keep-alive connections for one scheme://host:port, capped by a semaphore."""
+
+    def __init__(self, scheme: str, netloc: str, limit: int, timeout: float):
+        self.scheme = scheme
+        self.netloc = netloc
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(limit)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.netloc, timeout=self.timeout, context=ssl.create_default_context())
+        return http.client.HTTPConnection(self.netloc, timeout=self.timeout)
+
+    def acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        """Block until a slot frees up. Returns (conn, reused)."""
+        self._slots.acquire()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def release(self, conn, reusable: bool):
+        if reusable:
+            with self._lock:
+                self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+
+
+class _ResponseStream:
+    """File-like response body that closes its dedicated connection on close()."""
+
+    def __init__(self, reader, conn):
+        self._reader = reader
+        self._conn = conn
+
+    def read(self, size: int = -1) -> bytes:
+        return self._reader.read(size)
+
+    def close(self):
+        self._reader.close()
+        self._conn.close()
+
+
+class FeedFetcher:
+    """
+    Thread-pool HTTP fetcher for feed bodies.
+    - Global concurrency: size of the worker pool.
+    - Per-host concurrency: semaphore per host, with pooled keep-alive connections.
+    - Timeouts: socket timeout per operation plus a wall-clock deadline per request.
+    """
+
+    def __init__(self, max_concurrency: int = None, per_host_limit: int = None, timeout: float = None,
+                 max_body_bytes: int = None):
+        self.max_concurrency = max_concurrency or MAX_CONCURRENCY
+        self.per_host_limit = per_host_limit or PER_HOST_LIMIT
+        self.timeout = timeout or FETCH_TIMEOUT
+        self.max_body_bytes = max_body_bytes or MAX_BODY_BYTES
+        self._pools: Dict[Tuple[str, str], _HostPool] = {}
+        self._pools_lock = threading.Lock()
+
+    def _pool_for(self, scheme: str, netloc: str) -> _HostPool:
+        key = (scheme, netloc)
+        with self._pools_lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _HostPool(scheme, netloc, self.per_host_limit, self.timeout)
+                self._pools[key] = pool
+            return pool
+
+    def _request_once(self, method: str, url: str, headers: Dict[str, str], deadline: float):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        pool = self._pool_for(parts.scheme, parts.netloc)
+        conn, reused = pool.acquire()
+        reusable = False
+        try:
+            try:
+                conn.request(method, path, headers=headers)
+                resp = conn.getresponse()
+            except _STALE_ERRORS:
+                if not reused:
+                    raise
+                # Server dropped the idle keep-alive socket; retry once on a fresh one
+                conn.close()
+                conn = pool._connect()
+                conn.request(method, path, headers=headers)
+                resp = conn.getresponse()
+
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if method == "HEAD":
+                resp.read()
+                reusable = not resp.will_close
+                return resp.status, resp_headers, b"", False
+
+            # Oversized bodies: stop reading and drop the connection (rest of the body is unread)
+            declared = resp_headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > self.max_body_bytes:
+                return resp.status, resp_headers, None, True
+
+            chunks, size = [], 0
+            while True:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Deadline exceeded after {self.timeout}s")
+                chunk = resp.read(64 * 1024)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > self.max_body_bytes:
+                    return resp.status, resp_headers, None, True
+                chunks.append(chunk)
+            reusable = not resp.will_close
+            return resp.status, resp_headers, b"".join(chunks), False
+        finally:
+            pool.release(conn, reusable)
+
+    def request(self, url: str, headers: Dict[str, str] = None, method: str = "GET") -> FetchResult:
+        """Fetch a single URL, following redirects. Never raises; errors land in FetchResult.error."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+        if headers:
+            req_headers.update(headers)
+
+        current = url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                status, resp_headers, body, too_large = self._request_once(method, current, req_headers, deadline)
+                if status in (301, 302, 303, 307, 308) and resp_headers.get("location"):
+                    current = urljoin(current, resp_headers["location"])
+                    continue
+                if too_large:
+                    return FetchResult(url=current, status=status, headers=resp_headers, too_large=True,
+                                       elapsed=time.monotonic() - started)
+
+                encoding = resp_headers.get("content-encoding", "")
+                if "gzip" in encoding:
+                    body = gzip.decompress(body)
+                elif "deflate" in encoding:
+                    body = zlib.decompress(body)
+
+                return FetchResult(url=current, status=status, body=body, headers=resp_headers,
+                                   elapsed=time.monotonic() - started)
+            return FetchResult(url=current, error="Too many redirects", elapsed=time.monotonic() - started)
+        except Exception as e:
+            return FetchResult(url=current, error=f"{type(e).__name__}: {e}", elapsed=time.monotonic() - started)
+
+    def open_stream(self, url: str, headers: Dict[str, str] = None):
+        """
+        Open a GET on a dedicated connection and return (status, headers, stream)
+        without buffering the body. gzip bodies are decompressed on the fly.
+        The caller must close() the stream.
+        """
+        req_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip"}
+        if headers:
+            req_headers.update(headers)
+
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(current)
+            conn = (http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection)(
+                parts.netloc, timeout=self.timeout
+            )
+            path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+            conn.request("GET", path, headers=req_headers)
+            resp = conn.getresponse()
+            resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.status in (301, 302, 303, 307, 308) and resp_headers.get("location"):
+                conn.close()
+                current = urljoin(current, resp_headers["location"])
+                continue
+            reader = gzip.GzipFile(fileobj=resp) if "gzip" in resp_headers.get("content-encoding", "") else resp
+            return resp.status, resp_headers, _ResponseStream(reader, conn)
+        raise RuntimeError(f"Too many redirects for {url}")
+
+    def iter_fetch(self, requests: Iterable[Tuple[object, str, Optional[Dict[str, str]]]],
+                   method: str = "GET") -> Iterator[Tuple[object, FetchResult]]:
+        """
+        Fetch many (key, url, headers) requests concurrently.
+        Yields (key, result) in completion order so callers can parse fast feeds
+        while slow ones are still downloading.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="feed-fetch") as pool:
+            futures = {pool.submit(self.request, url, headers, method): key for key, url, headers in requests}
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
+
+    def close(self):
+        with self._pools_lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools = {}
+
+
+# Shared fetcher so pooled connections survive across heartbeat ticks
+_default_fetcher: Optional[FeedFetcher] = None
+_default_lock = threading.Lock()
+
+
+def get_feed_fetcher() -> FeedFetcher:
+    global _default_fetcher
+    with _default_lock:
+        if _default_fetcher is None:
+            _default_fetcher = FeedFetcher()
+        return _default_fetcher
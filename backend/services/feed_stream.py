@@ -0,0 +1,81 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import mktime_tz, parsedate_tz
+import time
+from typing import IO, Iterator
+
+# Incremental RSS/Atom reader for feeds too large to hand to feedparser whole.
+# Entries are yielded one at a time and their elements freed immediately, so
+# memory stays flat regardless of document size.
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+RSS1_NS = "{http://purl.org/rss/1.0/}"
+_ENTRY_TAGS = ("item", ATOM_NS + "entry", RSS1_NS + "item")
+
+
+class StreamEntry(dict):
+    """Minimal stand-in for feedparser's entry dict (supports entry.title / entry.get)."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _parse_date(value: str):
+    """RFC 822 (RSS) or ISO 8601 (Atom) -> UTC time.struct_time, like feedparser's *_parsed."""
+    if not value:
+        return None
+    value = value.strip()
+    parsed = parsedate_tz(value)
+    if parsed:
+        return time.gmtime(mktime_tz(parsed))
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).utctimetuple()
+    except ValueError:
+        return None
+
+
+def _to_entry(elem) -> StreamEntry:
+    entry = StreamEntry(title="", description="", link="")
+    for child in elem:
+        name = _local(child.tag)
+        text = (child.text or "").strip()
+        if name == "title":
+            entry["title"] = text
+        elif name in ("description", "summary") or (name == "content" and not entry["description"]):
+            entry["description"] = text
+        elif name == "link":
+            # Atom carries the URL in href; prefer rel="alternate" (or no rel)
+            href = child.get("href")
+            if href is None:
+                entry["link"] = text
+            elif child.get("rel", "alternate") == "alternate" or not entry["link"]:
+                entry["link"] = href
+        elif name == "pubDate" or name == "published":
+            entry["published_parsed"] = _parse_date(text)
+        elif name == "updated":
+            entry["updated_parsed"] = _parse_date(text)
+    return entry
+
+
+def iter_feed_entries(stream: IO[bytes]) -> Iterator[StreamEntry]:
+    """Yield entries from an RSS 2.0 or Atom byte stream as they are parsed."""
+    parents = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+
+        parents.pop()
+        if elem.tag in _ENTRY_TAGS:
+            yield _to_entry(elem)
+            # Drop the finished entry from its parent so the tree never grows
+            elem.clear()
+            if parents:
+                parents[-1].remove(elem)
@@ -1,53 +1,67 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from ..database import SessionLocal
 from .ingestor import IngestorService
-from .evidence_extractor import EvidenceExtractor
+from .extraction_queue import ExtractionQueue
+from .llm_engine import get_extraction_engine
 from .clusterer import ClustererService
 from .scorer import ScorerService
-from ..models import EventCluster, ClusterActivityLog, Evidence
+from .lifecycle import LifecycleSweeper
+from .dirty_tracker import DirtyClusterTracker
+from .poll_scheduler import PollScheduler, POLL_HOT_MIN_SECONDS
+from ..models import ClusterActivityLog, ClusterEvidenceStats
 import logging
 import json
+import os
+import time
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Upper bound between ticks; sources are polled on their own adaptive schedule underneath it
+HEARTBEAT_SECONDS = int(os.getenv("HEARTBEAT_SECONDS", "600"))
+# Queue batches extracted per tick. Always bounded, so a backlog cannot hold off clustering and
+# scoring; standalone queue workers (python -m backend.services.extraction_queue) drain the rest
+EXTRACT_BATCHES_PER_TICK = max(1, int(os.getenv("EXTRACT_BATCHES_PER_TICK", "4")))
+
 class HeartbeatService:
     def run_tick(self):
-        """Execute one 10m tick (Ingest -> Extract -> Cluster -> Score)."""
+        """Execute one tick (Ingest due sources -> Extract -> Cluster -> Score)."""
         db = SessionLocal()
         try:
             logger.info("Starting Internal Tick...")
             
-            # 1. Ingest
+            # 1. Ingest (only sources that are due on the adaptive poll schedule)
             ingestor = IngestorService(db)
-            new_items = ingestor.ingest_all()
+            new_items = ingestor.ingest_due()
             
             # 2. Extract
-            # For simplicity in MVP, we process ALL raw items that don't have evidence yet
-            extractor = EvidenceExtractor(db)
-            # Find raw items without evidence (naive check, or check raw_item.evidence relation)
-            # Here we just iterate recent items or implement a queue. 
-            # For MVP, let's process last 50 items to ensure we catch new ones
-            # In production, use a queue.
-            from ..models import RawItem
-            recent_items = db.query(RawItem).order_by(RawItem.fetched_at.desc()).limit(50).all()
-            
-            new_evidence_count = 0
-            for item in recent_items:
-                if not item.evidence: # If no evidence linked
-                    evs = extractor.process_item(item.item_id)
-                    new_evidence_count += len(evs)
+            # A bounded slice of the durable extraction queue (ingest enqueues every new
+            # original item); standalone queue workers may be draining it in parallel
+            new_evidence_count = ExtractionQueue(db).drain(max_batches=EXTRACT_BATCHES_PER_TICK)
+            engine = get_extraction_engine()
+            if engine:
+                llm = engine.breaker.take_interval()
+                logger.info(
+                    f"LLM this tick: {llm['calls']} calls, {llm['errors']} errors, {llm['slow']} slow, "
+                    f"{llm['rejected']} short-circuited, mean {llm['latency']['mean_seconds']}s, breaker {llm['state']}"
+                )
             
             # 3. Cluster
             clusterer = ClustererService(db)
             clusterer.cluster_evidence()
+
+            # Lifecycle: promote fast-growing clusters, retire quiet ones, so the
+            # Emerging/Active set read by clustering and scoring stays bounded
+            LifecycleSweeper(db).sweep()
             
             # 4. Score
-            scorer = ScorerService(db)
-            active_clusters = db.query(EventCluster).filter(EventCluster.cluster_state.in_(['Emerging', 'Active'])).all()
-            for cluster in active_clusters:
-                scorer.calculate_cluster_score(cluster.cluster_id)
-                self.log_tick(db, cluster.cluster_id)
+            # Only clusters that gained evidence since the last tick (tracked by triggers)
+            # are rescored and logged; the claim, logs and scores commit together
+            dirty = DirtyClusterTracker(db).claim()
+            if dirty:
+                self.log_tick(db, dirty)
+                ScorerService(db).score_clusters(list(dirty))
 
             logger.info(f"Tick Complete. New Items: {new_items}, New Evidence: {new_evidence_count}")
         
@@ -57,31 +71,49 @@ class HeartbeatService:
         finally:
             db.close()
 
-    def log_tick(self, db: Session, cluster_id: int):
-        """Generate structured log for a cluster."""
-        # Calculate stats for this tick (simplified, assume accumulated checks or diffs)
-        # For strict correctness, we'd need to know what changed *this tick*.
-        # Here we log the *current state* snapshot as 'internal_tick' which is acceptable for MVP log stream
-        
-        evidence_list = db.query(Evidence).filter(Evidence.cluster_id == cluster_id).all()
-        l5 = sum(1 for e in evidence_list if e.level == 5)
-        l4 = sum(1 for e in evidence_list if e.level == 4)
-        l3 = sum(1 for e in evidence_list if e.level == 3)
-        l2 = sum(1 for e in evidence_list if e.level == 2)
-        l1 = sum(1 for e in evidence_list if e.level == 1)
+    def next_tick_delay(self) -> float:
+        """Sleep until the next source is due, between the hot poll floor and HEARTBEAT_SECONDS."""
+        db = SessionLocal()
+        try:
+            due_in = PollScheduler(db).seconds_until_next_poll()
+        except Exception as e:
+            logger.error(f"Scheduler lookup failed: {e}")
+            due_in = None
+        finally:
+            db.close()
+        if due_in is None:
+            return HEARTBEAT_SECONDS
+        return max(POLL_HOT_MIN_SECONDS, min(HEARTBEAT_SECONDS, due_in))
+
+    def run_forever(self):
+        """Tick loop driven by the per-source poll schedule instead of a fixed interval."""
+        while True:
+            self.run_tick()
+            time.sleep(self.next_tick_delay())
 
-        log_data = {
-            "method_version": "governance_1.0",
-            "added_evidence_by_level": {
-                "L5": l5, "L4": l4, "L3": l3, "L2": l2, "L1": l1
-            },
-            # "score_deltas": ... (omit for brevity in MVP)
+    def log_tick(self, db: Session, deltas: dict):
+        """
+        internal_tick logs with what each cluster gained since its last tick
+        ({cluster_id: by_level}) plus its current totals, read from the
+        cluster_evidence_stats counters in one query. No commit.
+        """
+        totals = {
+            row.cluster_id: {"L5": row.l5_count, "L4": row.l4_count, "L3": row.l3_count, "L2": row.l2_count, "L1": row.l1_count}
+            for row in db.query(ClusterEvidenceStats).filter(ClusterEvidenceStats.cluster_id.in_(list(deltas))).all()
         }
+        db.execute(insert(ClusterActivityLog), [
+            {
+                "cluster_id": cluster_id,
+                "log_type": 'internal_tick',
+                "log_data": {
+                    "method_version": "governance_1.0",
+                    "added_evidence_by_level": added,
+                    "evidence_by_level": totals.get(cluster_id, {"L5": 0, "L4": 0, "L3": 0, "L2": 0, "L1": 0}),
+                },
+            }
+            for cluster_id, added in deltas.items()
+        ])
 
-        log = ClusterActivityLog(
-            cluster_id=cluster_id,
-            log_type='internal_tick',
-            log_data=log_data
-        )
-        db.add(log)
-        db.commit()
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    HeartbeatService().run_forever()
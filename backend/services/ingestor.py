@@ -1,16 +1,35 @@
 from sqlalchemy.orm import Session
-from ..models import Source, RawItem
+from ..models import Source, RawItem, SourceFetchState
+from .feed_fetcher import get_feed_fetcher
+from .dedup import get_content_hash_filter
+from .bulk_writer import BulkWriter
+from .poll_scheduler import PollScheduler
+from .feed_stream import iter_feed_entries
+from .near_dup import NearDupIndex, get_near_dup_index, simhash, to_signed64
+from .url_resolver import UrlResolver, URL_RESOLVE_REDIRECTS
+from .extraction_queue import ExtractionQueue
 import feedparser
 import hashlib
 import json
+import os
 from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Set INGEST_CONCURRENT=0 to fall back to fetching one feed at a time (ingest_all and ingest_due)
+INGEST_CONCURRENT = os.getenv("INGEST_CONCURRENT", "1") != "0"
+
+# Streaming mode: entries are buffered and deduped in batches of this size, and the
+# stream stops once this many already-known entries have been seen (newest-first feeds)
+STREAM_BATCH_SIZE = int(os.getenv("INGEST_STREAM_BATCH_SIZE", "200"))
+STREAM_STOP_AFTER_KNOWN = int(os.getenv("INGEST_STREAM_STOP_AFTER_KNOWN", "5"))
+
 class IngestorService:
     def __init__(self, db: Session):
         self.db = db
+        # Links not yet in the URL cache, resolved in one batch per run: {stripped_url: [item_id]}
+        self._unresolved = {}
 
     def register_source(self, name: str, source_type: str, url: str) -> Source:
         """Register a new source if not exists."""
@@ -22,28 +41,161 @@ class IngestorService:
             self.db.refresh(source)
         return source
 
-    def ingest_feed(self, source_id: int):
-        """Fetch and process RSS feed for a source."""
+    def ingest_feed(self, source_id: int, body: bytes = None):
+        """Fetch and process RSS feed for a source. If `body` is given, parse it instead of fetching."""
         source = self.db.query(Source).filter(Source.source_id == source_id).first()
         if not source or not source.url:
             return 0
 
-        feed = feedparser.parse(source.url)
-        new_count = 0
+        if body is not None:
+            new_items = self._ingest_parsed(source, feedparser.parse(body))
+        else:
+            state = self._load_fetch_states([source.source_id])[source.source_id]
+            url, headers = source.url, self._conditional_headers(state)
+            # Persist a new state row up front so a failed ingest cannot discard it
+            self.db.commit()
+            result = get_feed_fetcher().request(url, headers)
+            new_items = self._ingest_result(source, state, result)
+        self.resolve_pending()
+        return new_items
+
+    def _load_fetch_states(self, source_ids):
+        """
+        Fetch state for each source in one query, creating (flushed, uncommitted)
+        rows for first-time sources. Callers read what they need before committing,
+        since the commit expires the loaded objects.
+        """
+        states = {
+            st.source_id: st
+            for st in self.db.query(SourceFetchState).filter(SourceFetchState.source_id.in_(source_ids)).all()
+        }
+        for sid in source_ids:
+            if sid not in states:
+                states[sid] = SourceFetchState(source_id=sid)
+                self.db.add(states[sid])
+        self.db.flush()
+        return states
+
+    def _conditional_headers(self, state: SourceFetchState):
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def _ingest_result(self, source: Source, state: SourceFetchState, result):
+        """
+        Record the fetch outcome and only parse when the feed actually changed.
+        304s and byte-identical bodies stop here without touching feedparser.
+        """
+        now = datetime.now(timezone.utc)
+        state.last_fetched_at = now
+        state.last_status = result.status or None
+
+        if result.status == 304:
+            self.db.commit()
+            return 0
+        if not result.ok:
+            logger.error(f"Failed to fetch source {source.name}: {result.error or f'HTTP {result.status}'}")
+            self.db.commit()
+            return 0
+        if result.too_large:
+            return self._ingest_streaming(source, state)
+
+        state.etag = result.headers.get("etag")
+        state.last_modified = result.headers.get("last-modified")
+
+        digest = hashlib.sha256(result.body).hexdigest()
+        if digest == state.body_digest:
+            self.db.commit()
+            return 0
+
+        state.body_digest = digest
+        state.last_changed_at = now
+        # Commits the state together with the new items, so a failed parse is retried next tick
+        return self._ingest_parsed(source, feedparser.parse(result.body))
+
+    def _ingest_streaming(self, source: Source, state: SourceFetchState):
+        """
+        Bounded-memory ingest for feeds above the fetcher's body limit.
+        Entries are parsed incrementally and persisted in STREAM_BATCH_SIZE batches;
+        parsing stops once STREAM_STOP_AFTER_KNOWN known entries have been reached.
+        """
+        status, headers, stream = get_feed_fetcher().open_stream(source.url, self._conditional_headers(state))
+        new_count = known_count = 0
+        try:
+            if status == 304:
+                self.db.commit()
+                return 0
+            if not 200 <= status < 300:
+                logger.error(f"Failed to stream source {source.name}: HTTP {status}")
+                self.db.commit()
+                return 0
+
+            state.etag = headers.get("etag")
+            state.last_modified = headers.get("last-modified")
+            # The body is never held whole, so there is no digest to compare against
+            state.body_digest = None
+            state.last_changed_at = state.last_fetched_at
+
+            batch = []
+            for entry in iter_feed_entries(stream):
+                batch.append(entry)
+                if len(batch) < STREAM_BATCH_SIZE:
+                    continue
+                added, known = self._ingest_entries(source, batch)
+                new_count, known_count, batch = new_count + added, known_count + known, []
+                if known_count >= STREAM_STOP_AFTER_KNOWN:
+                    break
+            else:
+                if batch:
+                    new_count += self._ingest_entries(source, batch)[0]
+        finally:
+            stream.close()
+
+        self.db.commit()
+        logger.info(f"Streamed {source.name}: {new_count} new, stopped after {known_count} known entries")
+        return new_count
 
-        for entry in feed.entries:
-            # Hash calculation for dedup
+    def _ingest_parsed(self, source: Source, feed):
+        """Persist new entries of an already parsed feed."""
+        return self._ingest_entries(source, feed.entries)[0]
+
+    def _ingest_entries(self, source: Source, entries):
+        """Dedup and persist a batch of entries. Returns (new_count, already_known_count)."""
+        # Hash calculation for dedup (all entries first, so the lookup is one query per batch)
+        # The raw link is hashed so existing content_hash values stay valid; tracker
+        # variants of a stored link are caught through canonical_url below
+        pending = {}
+        for entry in entries:
             content_str = f"{entry.title}{entry.get('description', '')}{entry.get('link', '')}"
             content_hash = hashlib.sha256(content_str.encode('utf-8')).hexdigest()
+            pending.setdefault(content_hash, entry)
+
+        # Check duplication
+        hash_filter = get_content_hash_filter()
+        new_hashes = hash_filter.filter_new(self.db, pending) if pending else set()
+        rows = []
+
+        # Canonical URLs for the new entries, from the URL cache only (no network on the
+        # per-feed path); unknown links keep their stripped form until resolve_pending
+        stripped, known, _ = UrlResolver(self.db).lookup_many(
+            [pending[h].get('link', '') for h in new_hashes]
+        ) if new_hashes else ({}, {}, set())
+        if new_hashes:
+            new_hashes -= self._tracker_variants(pending, new_hashes, stripped, known)
+        unresolved = {}
 
-            # Check duplication
-            exists = self.db.query(RawItem).filter(RawItem.content_hash == content_hash).first()
-            if exists:
+        for content_hash, entry in pending.items():
+            if content_hash not in new_hashes:
                 continue
 
-            # Naive canonical URL handling (prefer link in entry)
-            # In a real heavy scrape, we might follow redirects here
-            canonical = entry.get('link', '')
+            link = entry.get('link', '')
+            clean = stripped.get(link, link)
+            canonical = known.get(clean, clean)
+            if link and clean not in known:
+                unresolved[content_hash] = clean
 
             # Parse time
             pub_struct = entry.get('published_parsed') or entry.get('updated_parsed')
@@ -51,28 +203,193 @@ class IngestorService:
                 datetime(*pub_struct[:6]).timestamp(), tz=timezone.utc
             ) if pub_struct else datetime.now(timezone.utc)
 
-            raw_item = RawItem(
-                source_id=source.id,
-                content_hash=content_hash,
-                title=entry.title,
-                content=entry.get('description', '') or entry.get('summary', ''),
-                url=entry.get('link', ''),
-                canonical_url=canonical,
-                published_at=published_at
-            )
-            self.db.add(raw_item)
-            new_count += 1
-        
+            content = entry.get('description', '') or entry.get('summary', '')
+            fingerprint = simhash(f"{entry.title} {content}")
+            rows.append({
+                "source_id": source.source_id,
+                "content_hash": content_hash,
+                "title": entry.title,
+                "content": content,
+                "url": entry.get('link', ''),
+                "canonical_url": canonical,
+                "published_at": published_at,
+                # Too short to fingerprint: stored without one and never near-dup matched
+                "simhash": to_signed64(fingerprint) if fingerprint else None
+            })
+
+        # Fetched before the insert: a (re)warm reads raw_items, and must not pick up this batch's uncommitted rows
+        index = get_near_dup_index(self.db) if rows else None
+
+        # Multi-row INSERT ... ON CONFLICT (content_hash) DO NOTHING
+        writer = BulkWriter(self.db)
+        inserted = writer.insert_raw_items(rows) if rows else {}
+
+        # Link syndicated copies to the first item seen, so they are never extracted
+        duplicates, originals = self._find_near_duplicates(index, rows, inserted)
+        if duplicates:
+            writer.mark_duplicates(duplicates)
+        # Originals go on the extraction queue in the same transaction as the insert
+        ExtractionQueue(self.db).enqueue(
+            item_id for item_id in inserted.values() if item_id not in duplicates
+        )
         self.db.commit()
-        return new_count
+        # Conflicting rows were written by another worker, so every new hash is in the table now
+        for content_hash in new_hashes:
+            hash_filter.add(content_hash)
+        for content_hash, clean in unresolved.items():
+            if content_hash in inserted:
+                self._unresolved.setdefault(clean, []).append(inserted[content_hash])
+        # Only committed originals enter the process-wide index; a rolled-back feed leaves no ids behind
+        if originals:
+            for h, item_id in originals:
+                index.add(h, item_id)
+        return len(inserted), len(pending) - len(new_hashes)
+
+    def _tracker_variants(self, pending, new_hashes, stripped, known):
+        """
+        Hashes among `new_hashes` whose entry only differs from a stored item (or an
+        earlier entry of this batch) by tracking parameters: same canonical URL and title.
+        """
+        keys = {}
+        for content_hash, entry in pending.items():
+            link = entry.get('link', '')
+            if content_hash in new_hashes and link:
+                clean = stripped.get(link, link)
+                keys[content_hash] = (known.get(clean, clean), entry.title)
+        if not keys:
+            return set()
+
+        seen = {
+            tuple(row) for row in self.db.query(RawItem.canonical_url, RawItem.title)
+            .filter(RawItem.canonical_url.in_({url for url, _ in keys.values()}))
+            .all()
+        }
+        variants = set()
+        for content_hash, key in keys.items():
+            if key in seen:
+                variants.add(content_hash)
+            else:
+                seen.add(key)
+        return variants
+
+    def _find_near_duplicates(self, index: NearDupIndex, rows, inserted):
+        """
+        ({item_id: duplicate_of_item_id}, [(simhash, item_id)] of new originals) for the
+        inserted rows. Copies are matched against the process-wide index and against
+        originals earlier in this batch; the index itself is not touched until commit.
+        """
+        if not inserted:
+            return {}, []
+        batch = NearDupIndex(index.max_distance)
+        duplicates, originals = {}, []
+        for row in rows:
+            item_id = inserted.get(row["content_hash"])
+            if item_id is None or row["simhash"] is None:
+                continue
+            h = row["simhash"] & ((1 << 64) - 1)
+            original = index.find(h)
+            if original is None:
+                original = batch.find(h)
+            if original is not None:
+                duplicates[item_id] = original
+            else:
+                batch.add(h, item_id)
+                originals.append((h, item_id))
+        return duplicates, originals
 
-    def ingest_all(self):
+    def ingest_all(self, concurrent: bool = None):
         """Run ingest for all registered sources."""
-        sources = self.db.query(Source).all()
+        if concurrent is None:
+            concurrent = INGEST_CONCURRENT
+        sources = self.db.query(Source).filter(Source.url != None).all()
+        return self._ingest_sources(sources, concurrent=concurrent)
+
+    def ingest_due(self, fetcher=None, concurrent: bool = None):
+        """Ingest only the sources whose adaptive poll interval has elapsed."""
+        if concurrent is None:
+            concurrent = INGEST_CONCURRENT
+        scheduler = PollScheduler(self.db)
+        sources = scheduler.due_sources()
+        if not sources:
+            return 0
+        return self._ingest_sources(sources, fetcher, scheduler, concurrent=concurrent)
+
+    def ingest_all_concurrent(self, fetcher=None, sources=None, scheduler: PollScheduler = None):
+        """
+        Download all feeds in parallel (pooled per-host connections, per-host and
+        global concurrency caps), then parse and persist each body on this thread
+        as soon as its download completes. Requests are conditional on the
+        validators stored in source_fetch_state.
+        """
+        if sources is None:
+            sources = self.db.query(Source).filter(Source.url != None).all()
+        return self._ingest_sources(sources, fetcher, scheduler, concurrent=True)
+
+    def _ingest_sources(self, sources, fetcher=None, scheduler: PollScheduler = None, concurrent: bool = True):
+        """Conditional fetch + ingest of `sources`, downloading in parallel or one feed at a time."""
+        fetcher = fetcher or get_feed_fetcher()
+        sources = {s.source_id: s for s in sources}
+        states = self._load_fetch_states(list(sources))
+        requests = [(sid, s.url, self._conditional_headers(states[sid])) for sid, s in sources.items()]
+
+        # Each feed commits on its own; the loaded sources/states stay valid across those
+        # commits (this loop is their only writer), so skip the expire-on-commit reloads
+        # that would otherwise cost one SELECT per feed. A rollback still expires them.
+        expire_on_commit, self.db.expire_on_commit = self.db.expire_on_commit, False
+        try:
+            # Persist new state rows up front so a per-feed rollback later cannot discard them
+            self.db.commit()
+            if concurrent:
+                fetched = fetcher.iter_fetch(requests)
+            else:
+                fetched = ((sid, fetcher.request(url, headers)) for sid, url, headers in requests)
+            total_new = self._ingest_fetched(fetched, sources, states, scheduler)
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+        # Every feed is persisted; now one batched redirect round for all of their new links
+        self.resolve_pending()
+        return total_new
+
+    def resolve_pending(self):
+        """
+        Follow redirects for the links this run could not answer from the URL
+        cache, all feeds in one concurrent batch, and update canonical_url of
+        the items whose link resolved elsewhere. Failures only cost the
+        redirect; the items keep their stripped URL.
+        """
+        pending, self._unresolved = self._unresolved, {}
+        if not pending or not URL_RESOLVE_REDIRECTS:
+            return
+        try:
+            canonicals = UrlResolver(self.db).resolve_remote(list(pending))
+            updates = {
+                item_id: canonicals[clean]
+                for clean, item_ids in pending.items()
+                if canonicals.get(clean, clean) != clean
+                for item_id in item_ids
+            }
+            if updates:
+                BulkWriter(self.db).set_canonical_urls(updates)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"URL resolution failed for {len(pending)} links: {e}")
+
+    def _ingest_fetched(self, fetched, sources, states, scheduler: PollScheduler = None):
+        """Persist (source_id, fetch result) pairs as they arrive, one commit per feed."""
         total_new = 0
-        for s in sources:
+        for sid, result in fetched:
+            source = sources[sid]
+            new_items, failed = 0, False
             try:
-                total_new += self.ingest_feed(s.source_id)
+                new_items = self._ingest_result(source, states[sid], result)
+                failed = not result.ok and result.status != 304
             except Exception as e:
-                logger.error(f"Failed to ingest source {s.name}: {e}")
+                self.db.rollback()
+                failed = True
+                logger.error(f"Failed to ingest source {source.name}: {e}")
+            total_new += new_items
+            if scheduler:
+                scheduler.reschedule(source, states[sid], new_items, failed=failed)
+                self.db.commit()
         return total_new
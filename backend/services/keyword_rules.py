@@ -0,0 +1,124 @@
+import json
+import os
+import re
+import threading
+from bisect import bisect_right
+from itertools import accumulate
+
+# Optional JSON file overriding DEFAULT_RULES (same shape)
+KEYWORD_RULES_PATH = os.getenv("KEYWORD_RULES_PATH")
+
+# Rules are checked in order; the first one that fires decides level/kind.
+# A rule fires on a sentence when any phrase occurs in it (case-insensitive
+# substring), or for every sentence of an item whose source_type / URL matches.
+DEFAULT_RULES = {
+    "min_sentence_chars": 20,
+    "default": {"level": 3, "kind": "fact"},
+    "rules": [
+        {"name": "inference", "level": 1, "kind": "inference",
+         "phrases": ["predicts", "might", "speculates", "rumor"]},
+        {"name": "social", "level": 2, "kind": "fact",
+         "url_contains": ["twitter", "weibo"]},
+        {"name": "official", "level": 5, "kind": "fact",
+         "source_types": ["official"], "phrases": ["official statement", "report"]},
+        {"name": "secondary", "level": 4, "kind": "quote",
+         "phrases": ["according to"]},
+    ],
+}
+
+# Same boundaries as re.split(r'(?<=[.!?])\s+'), but the capture form avoids the
+# per-character lookbehind and keeps separator lengths for offset bookkeeping
+SENTENCE_BREAK = re.compile(r'([.!?])(\s+)')
+
+
+def load_rules(path: str = None) -> dict:
+    """Rule table from a JSON file, or DEFAULT_RULES when no path is given."""
+    if not path:
+        return DEFAULT_RULES
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class KeywordClassifier:
+    """
+    Compiled keyword rules. Phrases are flattened into one priority-ordered
+    table; each item's text is lowercased once and scanned per phrase at C
+    speed, and only actual hits are mapped back to sentences by offset.
+    Item-level rules (source type, URL) are evaluated once per item.
+    """
+
+    def __init__(self, rules: dict = None):
+        rules = rules or DEFAULT_RULES
+        self.min_sentence_chars = rules.get("min_sentence_chars", 20)
+        self.default = (rules["default"]["level"], rules["default"]["kind"])
+        self.rules = rules["rules"]
+        self.outcomes = [(r["level"], r.get("kind", "fact")) for r in self.rules]
+
+        self.phrases = []  # (phrase, rank), strongest rule first
+        for rank, rule in enumerate(self.rules):
+            for phrase in rule.get("phrases", []):
+                phrase = phrase.lower()
+                if SENTENCE_BREAK.search(phrase):
+                    raise ValueError(f"Keyword phrase spans a sentence break: {phrase!r}")
+                self.phrases.append((phrase, rank))
+
+    def item_rank(self, url: str, source_type: str):
+        """Rank of the first rule that applies to every sentence of this item, or None."""
+        url = url or ""
+        for rank, rule in enumerate(self.rules):
+            if source_type in rule.get("source_types", ()):
+                return rank
+            if any(marker in url for marker in rule.get("url_contains", ())):
+                return rank
+        return None
+
+    def classify(self, text: str, url: str = "", source_type: str = None):
+        """[(sentence, level, kind)] for every sentence long enough to count as evidence."""
+        if not text:
+            return []
+        parts = SENTENCE_BREAK.split(text)  # sentence, punct, space, sentence, ...
+        sentences = [s + p for s, p in zip(parts[0::3], parts[1::3])]
+        sentences.append(parts[-1])
+
+        item_rank = self.item_rank(url, source_type)
+        base = self.outcomes[item_rank] if item_rank is not None else self.default
+        lower = text.lower()
+        # Only phrases that can beat the item-level rule and occur somewhere in the item
+        hits = [(p, r) for p, r in self.phrases if (item_rank is None or r < item_rank) and p in lower]
+
+        best = {}
+        if hits and len(lower) == len(text):
+            starts = list(accumulate(map(len, parts), initial=0))[0::3]
+            for phrase, rank in hits:
+                pos = lower.find(phrase)
+                while pos != -1:
+                    idx = bisect_right(starts, pos) - 1
+                    if rank < best.get(idx, rank + 1):
+                        best[idx] = rank
+                    pos = lower.find(phrase, pos + 1)
+        elif hits:
+            # Lowercasing changed the length (rare Unicode), so offsets don't line up
+            for idx, sent in enumerate(sentences):
+                lower_sent = sent.lower()
+                rank = next((r for p, r in hits if p in lower_sent), None)
+                if rank is not None:
+                    best[idx] = rank
+
+        return [
+            (sent, *(self.outcomes[best[idx]] if idx in best else base))
+            for idx, sent in enumerate(sentences)
+            if len(sent) >= self.min_sentence_chars
+        ]
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_keyword_classifier() -> KeywordClassifier:
+    """Process-wide classifier built from KEYWORD_RULES_PATH (or the defaults)."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = KeywordClassifier(load_rules(KEYWORD_RULES_PATH))
+        return _classifier
@@ -0,0 +1,158 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Evidence arrival window used to measure a cluster's rate
+LIFECYCLE_RATE_WINDOW_HOURS = float(os.getenv("LIFECYCLE_RATE_WINDOW_HOURS", "6"))
+# Evidence within the window that promotes an Emerging cluster to Active
+LIFECYCLE_ACTIVE_MIN_EVIDENCE = int(os.getenv("LIFECYCLE_ACTIVE_MIN_EVIDENCE", "3"))
+# Quiet time after which an Active cluster is Stabilizing
+LIFECYCLE_STABILIZE_QUIET_HOURS = float(os.getenv("LIFECYCLE_STABILIZE_QUIET_HOURS", "24"))
+# Quiet time after which an Emerging cluster that never took off is Stabilizing
+LIFECYCLE_EMERGING_EXPIRE_HOURS = float(os.getenv("LIFECYCLE_EMERGING_EXPIRE_HOURS", "48"))
+# Clusters moved per statement (each batch commits)
+LIFECYCLE_BATCH_SIZE = int(os.getenv("LIFECYCLE_BATCH_SIZE", "500"))
+
+METHOD_VERSION = "governance_1.0"
+
+# Emerging clusters whose evidence rate crossed the threshold. Clusters untouched
+# for the whole window cannot qualify, so only the recently updated ones are read.
+PROMOTE_SQL = text("""
+    with candidates as (
+      select c.cluster_id,
+             count(*) as recent,
+             count(*) filter (where e.level = 5) as l5,
+             count(*) filter (where e.level = 4) as l4,
+             count(*) filter (where e.level = 3) as l3,
+             count(*) filter (where e.level = 2) as l2,
+             count(*) filter (where e.level = 1) as l1
+      from event_clusters c
+      join evidence e
+        on e.cluster_id = c.cluster_id
+       and e.extracted_at >= now() - :window_hours * interval '1 hour'
+      where c.cluster_state = 'Emerging'
+        and c.last_updated_at >= now() - :window_hours * interval '1 hour'
+      group by c.cluster_id
+      having count(*) >= :min_evidence
+      order by c.cluster_id
+      limit :batch
+    ),
+    moved as (
+      update event_clusters c
+      set cluster_state = 'Active'
+      from candidates
+      where c.cluster_id = candidates.cluster_id
+        and c.cluster_state = 'Emerging'
+      returning c.cluster_id, candidates.recent, candidates.l5, candidates.l4,
+                candidates.l3, candidates.l2, candidates.l1
+    )
+    insert into cluster_activity_log (cluster_id, log_type, log_data)
+    select cluster_id, 'state_change', jsonb_build_object(
+      'method_version', cast(:method_version as text),
+      'from_state', 'Emerging',
+      'to_state', 'Active',
+      'reason', 'evidence_rate',
+      'window_hours', cast(:window_hours as float),
+      'added_evidence_by_level', jsonb_build_object('L5', l5, 'L4', l4, 'L3', l3, 'L2', l2, 'L1', l1)
+    )
+    from moved
+    returning cluster_id
+""")
+
+# Clusters in :from_state with nothing new for :quiet_hours, oldest first (walks
+# idx_clusters_state_updated). Nothing arrived in the quiet window, hence the zero counts.
+QUIET_SQL = text("""
+    with candidates as (
+      select c.cluster_id
+      from event_clusters c
+      where c.cluster_state = :from_state
+        and c.last_updated_at < now() - :quiet_hours * interval '1 hour'
+      order by c.last_updated_at
+      limit :batch
+      for update skip locked
+    ),
+    moved as (
+      update event_clusters c
+      set cluster_state = 'Stabilizing'
+      from candidates
+      where c.cluster_id = candidates.cluster_id
+      returning c.cluster_id
+    )
+    insert into cluster_activity_log (cluster_id, log_type, log_data)
+    select cluster_id, 'state_change', jsonb_build_object(
+      'method_version', cast(:method_version as text),
+      'from_state', cast(:from_state as text),
+      'to_state', 'Stabilizing',
+      'reason', 'quiet',
+      'quiet_hours', cast(:quiet_hours as float),
+      'added_evidence_by_level', jsonb_build_object('L5', 0, 'L4', 0, 'L3', 0, 'L2', 0, 'L1', 0)
+    )
+    from moved
+    returning cluster_id
+""")
+
+
+class LifecycleSweeper:
+    """
+    Drives cluster_state from evidence arrival rate and age:
+
+      Emerging -> Active       >= LIFECYCLE_ACTIVE_MIN_EVIDENCE evidence in the rate window
+      Active -> Stabilizing    no update for LIFECYCLE_STABILIZE_QUIET_HOURS
+      Emerging -> Stabilizing  no update for LIFECYCLE_EMERGING_EXPIRE_HOURS (never took off)
+
+    Clustering and scoring only read Emerging/Active clusters, so this keeps
+    their working set to what is currently moving. Each transition is one
+    set-based UPDATE ... RETURNING feeding the state_change log INSERT, run
+    in batches of LIFECYCLE_BATCH_SIZE with a commit per batch.
+    """
+
+    def __init__(self, db: Session, batch_size: int = None):
+        self.db = db
+        self.batch_size = batch_size or LIFECYCLE_BATCH_SIZE
+
+    def _drain(self, stmt, params) -> int:
+        moved = 0
+        while True:
+            ids = self.db.execute(stmt, {**params, "batch": self.batch_size, "method_version": METHOD_VERSION}).scalars().all()
+            self.db.commit()
+            moved += len(ids)
+            if len(ids) < self.batch_size:
+                return moved
+
+    def sweep(self) -> dict:
+        """Apply every due transition. Returns {transition: clusters moved}."""
+        try:
+            stats = {
+                "emerging_to_active": self._drain(PROMOTE_SQL, {
+                    "window_hours": LIFECYCLE_RATE_WINDOW_HOURS,
+                    "min_evidence": LIFECYCLE_ACTIVE_MIN_EVIDENCE,
+                }),
+                "active_to_stabilizing": self._drain(QUIET_SQL, {
+                    "from_state": "Active",
+                    "quiet_hours": LIFECYCLE_STABILIZE_QUIET_HOURS,
+                }),
+                "emerging_to_stabilizing": self._drain(QUIET_SQL, {
+                    "from_state": "Emerging",
+                    "quiet_hours": LIFECYCLE_EMERGING_EXPIRE_HOURS,
+                }),
+            }
+        except Exception:
+            self.db.rollback()
+            raise
+        if any(stats.values()):
+            logger.info(f"Lifecycle sweep: {stats}")
+        return stats
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        print(f"🔄 Lifecycle sweep: {LifecycleSweeper(db).sweep()}")
+    finally:
+        db.close()
@@ -0,0 +1,231 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import time
+import urllib.request
+import logging
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Model / prompt identity (the prompt version changes whenever EXTRACTION_PROMPT does)
+MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+PROMPT_VERSION = "evidence_v2_batch"
+
+# Throughput knobs
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "5"))                # raw items packed per prompt
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))      # in-flight requests
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "250000"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+# Point at a local stub (scripts/stub_llm_server.py) instead of Gemini
+LLM_ENDPOINT = os.getenv("LLM_ENDPOINT")
+# Model name sent to LLM_ENDPOINT; defaults to MODEL_NAME
+LLM_ENDPOINT_MODEL = os.getenv("LLM_ENDPOINT_MODEL")
+
+CONTENT_CHARS = 2000
+
+EXTRACTION_PROMPT = """
+Analyze the following news items for an "AI Civilization Observer" system.
+
+For EACH item:
+1. Identify the single most critical claim or event.
+2. Classify its 'Civilization Impact Level' (L1-L5):
+   - L5: Official Fact (Gov reports, Financial statements, Court rulings)
+   - L4: Strong Evidence (Direct quotes, Data tables, Verifiable photos)
+   - L3: Secondary Report (News summaries, Analysis)
+   - L2: Social Chatter (Tweets, Forum posts)
+   - L1: Speculation (Rumors, Predictions, 'Might', 'Could')
+3. Assess its Reliability (0.0 - 1.0).
+
+Return a JSON array only, one object per item, in any order:
+[
+    {{
+        "item_id": <ITEM_ID of the item>,
+        "extract": "One sentence summary of the core event",
+        "level": <int 1-5>,
+        "reliability_score": <float 0.0-1.0>,
+        "kind": "fact|inference|quote|data"
+    }}
+]
+
+{items}
+"""
+
+ITEM_BLOCK = """---
+ITEM_ID: {item_id}
+SOURCE URL: {url}
+CONTENT:
+{content}... (truncated)
+"""
+
+
+def build_prompt(items) -> str:
+    """items: dicts with item_id / url / content."""
+    blocks = "".join(
+        ITEM_BLOCK.format(item_id=it["item_id"], url=it["url"], content=(it["content"] or "")[:CONTENT_CHARS])
+        for it in items
+    )
+    return EXTRACTION_PROMPT.format(items=blocks)
+
+
+def parse_response(text: str) -> dict:
+    """{item_id: result dict} from a (possibly ```json fenced) model reply."""
+    text = text.replace("```json", "").replace("```", "").strip()
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = [data]
+    return {int(d["item_id"]): d for d in data if isinstance(d, dict) and "item_id" in d}
+
+
+def estimate_tokens(prompt: str, n_items: int) -> int:
+    # ~4 chars per token in, ~120 tokens of JSON out per item
+    return len(prompt) // 4 + 120 * n_items
+
+
+class GeminiTransport:
+    """One configured GenerativeModel, reused for every request."""
+
+    def __init__(self, api_key: str, model_name: str = MODEL_NAME):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+
+    def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(prompt, request_options={"timeout": LLM_TIMEOUT})
+        return response.text
+
+
+class HttpTransport:
+    """
+    Plain JSON-over-HTTP model endpoint: POST {"model", "prompt"} -> {"text"}.
+    model_name (the analysis cache key) carries the endpoint, so results from a
+    stub or self-hosted model never answer for the Gemini model of the same name.
+    """
+
+    def __init__(self, endpoint: str, model: str = None):
+        self.endpoint = endpoint
+        self.model = model or LLM_ENDPOINT_MODEL or MODEL_NAME
+        self.model_name = f"{self.model}@{endpoint}"[:100]
+
+    def generate(self, prompt: str) -> str:
+        req = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps({"model": self.model, "prompt": prompt}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(req, timeout=LLM_TIMEOUT) as resp:
+            return json.loads(resp.read())["text"]
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at `per_minute`; bursts up to 10s worth by default."""
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or max(1.0, per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            # No await between the check and the take, so this is atomic on the event loop
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class ExtractionEngine:
+    """
+    Batched LLM extraction. Raw items are packed LLM_BATCH_SIZE per prompt and
+    sent through an asyncio pool capped at LLM_MAX_CONCURRENCY, metered by
+    request and token buckets. The transport (and its model client) is shared.
+    Calls go through a circuit breaker that also records latency telemetry.
+    """
+
+    def __init__(self, transport, batch_size: int = None, max_concurrency: int = None,
+                 requests_per_minute: int = None, tokens_per_minute: int = None,
+                 breaker: CircuitBreaker = None):
+        self.transport = transport
+        self.breaker = breaker or CircuitBreaker("llm")
+        self.batch_size = batch_size or LLM_BATCH_SIZE
+        self.max_concurrency = max_concurrency or LLM_MAX_CONCURRENCY
+        self.request_bucket = TokenBucket(requests_per_minute or LLM_REQUESTS_PER_MINUTE)
+        self.token_bucket = TokenBucket(tokens_per_minute or LLM_TOKENS_PER_MINUTE)
+        self.model_name = getattr(transport, "model_name", MODEL_NAME)
+
+    async def _run_batch(self, batch, semaphore):
+        prompt = build_prompt(batch)
+        ids = [it["item_id"] for it in batch]
+        async with semaphore:
+            for attempt in range(LLM_MAX_RETRIES + 1):
+                # While the breaker is open, items go straight to the fallback without waiting on the API
+                if not self.breaker.allow():
+                    return {i: CircuitOpenError(f"circuit '{self.breaker.name}' is open") for i in ids}
+                await self.request_bucket.acquire()
+                await self.token_bucket.acquire(estimate_tokens(prompt, len(batch)))
+                started = time.monotonic()
+                try:
+                    text = await asyncio.to_thread(self.transport.generate, prompt)
+                    parsed = parse_response(text)
+                    self.breaker.record(time.monotonic() - started, ok=True)
+                    # Items the model skipped are reported as failures so callers can fall back
+                    return {i: parsed.get(i, KeyError(f"item {i} missing from response")) for i in ids}
+                except Exception as e:
+                    self.breaker.record(time.monotonic() - started, ok=False)
+                    if attempt == LLM_MAX_RETRIES:
+                        return {i: e for i in ids}
+                    await asyncio.sleep(2 ** attempt)
+
+    async def analyze_async(self, items):
+        """{item_id: result dict | Exception} for every item."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        results = {}
+        for partial in await asyncio.gather(*(self._run_batch(b, semaphore) for b in batches)):
+            results.update(partial)
+        return results
+
+    def analyze(self, items):
+        """
+        Blocking form of analyze_async. asyncio.run cannot nest, so when the calling
+        thread already runs an event loop (e.g. an async route), the batch gets its
+        own loop on a helper thread; the caller's loop is blocked until it finishes.
+        """
+        if not items:
+            return {}
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.analyze_async(items))
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-analyze") as pool:
+            return pool.submit(asyncio.run, self.analyze_async(items)).result()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_extraction_engine():
+    """Process-wide engine, or None when neither LLM_ENDPOINT nor GEMINI_API_KEY is configured."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if LLM_ENDPOINT:
+                _engine = ExtractionEngine(HttpTransport(LLM_ENDPOINT))
+            elif os.getenv("GEMINI_API_KEY"):
+                _engine = ExtractionEngine(GeminiTransport(os.getenv("GEMINI_API_KEY")))
+        return _engine
@@ -0,0 +1,129 @@
+from sqlalchemy.orm import Session
+from ..models import RawItem
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+import hashlib
+import os
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Items whose 64-bit SimHashes differ in at most this many bits are near-duplicates
+NEAR_DUP_MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "3"))
+# Only recent items are kept in the in-memory index (syndication happens within days)
+NEAR_DUP_WINDOW_DAYS = int(os.getenv("NEAR_DUP_WINDOW_DAYS", "14"))
+# Texts with fewer word tokens get no SimHash: their fingerprints are too coarse
+# to tell items apart (and every empty text would hash to 0 and collide)
+NEAR_DUP_MIN_TOKENS = int(os.getenv("NEAR_DUP_MIN_TOKENS", "5"))
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_TOKEN_RE = re.compile(r"\w+")
+_MASK64 = (1 << 64) - 1
+
+
+# Per-bit counters are packed into one big int, _LANE bits per hash bit: _SPREAD[b]
+# has a 1 in the lane of every set bit of byte b, so adding spread hashes counts
+# set bits for all 64 positions at once instead of looping over them per token
+_LANE = 32
+_SPREAD = [sum(1 << (bit * _LANE) for bit in range(8) if b >> bit & 1) for b in range(256)]
+
+
+def simhash(text: str, min_tokens: int = NEAR_DUP_MIN_TOKENS) -> int:
+    """
+    64-bit SimHash over word tokens (unsigned). Feed items are short, so unigrams beat shingles here.
+    Returns 0 (no fingerprint) for texts with fewer than min_tokens tokens.
+    """
+    tokens = _TOKEN_RE.findall(_TAG_RE.sub(" ", text or "").lower())
+    if not tokens or len(tokens) < min_tokens:
+        return 0
+
+    packed = 0
+    for feature, n in Counter(tokens).items():
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+        packed += n * sum(_SPREAD[b] << (i * 8 * _LANE) for i, b in enumerate(digest))
+    # A bit is set when more tokens have it set than not
+    lane_mask = (1 << _LANE) - 1
+    return sum(1 << bit for bit in range(64) if 2 * ((packed >> (bit * _LANE)) & lane_mask) > len(tokens))
+
+
+def to_signed64(value: int) -> int:
+    """Unsigned 64-bit -> Postgres BIGINT."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def from_signed64(value: int) -> int:
+    return value & _MASK64
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class NearDupIndex:
+    """
+    Banded SimHash index. The 64 bits are split into max_distance + 1 bands, so by
+    pigeonhole any hash within max_distance shares at least one band exactly with
+    its match; only those band buckets are scanned.
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        self.band_bits = 64 // self.num_bands
+        self._bands = [defaultdict(list) for _ in range(self.num_bands)]
+        self.size = 0
+        self.warmed_at = None
+
+    def _band_keys(self, h: int):
+        band_mask = (1 << self.band_bits) - 1
+        # Last band absorbs the leftover bits
+        keys = [(h >> (i * self.band_bits)) & band_mask for i in range(self.num_bands - 1)]
+        keys.append(h >> ((self.num_bands - 1) * self.band_bits))
+        return keys
+
+    def add(self, h: int, item_id: int):
+        for band, key in zip(self._bands, self._band_keys(h)):
+            band[key].append((h, item_id))
+        self.size += 1
+
+    def find(self, h: int):
+        """item_id of the closest indexed item within max_distance, or None."""
+        best, best_dist = None, self.max_distance + 1
+        for band, key in zip(self._bands, self._band_keys(h)):
+            for other, item_id in band.get(key, ()):
+                dist = hamming(h, other)
+                if dist < best_dist:
+                    best, best_dist = item_id, dist
+        return best
+
+    def warm(self, db: Session):
+        """Load canonical (non-duplicate) items from the recent window."""
+        since = datetime.now(timezone.utc) - timedelta(days=NEAR_DUP_WINDOW_DAYS)
+        rows = (
+            db.query(RawItem.item_id, RawItem.simhash)
+            .filter(
+                RawItem.simhash != None, RawItem.simhash != 0,
+                RawItem.duplicate_of_item_id == None, RawItem.fetched_at >= since,
+            )
+            .yield_per(10000)
+        )
+        for item_id, value in rows:
+            self.add(from_signed64(value), item_id)
+        self.warmed_at = time.monotonic()
+        logger.info(f"Near-duplicate index warmed with {self.size} items")
+
+
+# Process-wide index, warmed on first use and rebuilt daily so items age out of the window
+_near_dup_index = None
+_REBUILD_SECONDS = 24 * 3600
+
+
+def get_near_dup_index(db: Session) -> NearDupIndex:
+    global _near_dup_index
+    if _near_dup_index is None or time.monotonic() - _near_dup_index.warmed_at > _REBUILD_SECONDS:
+        index = NearDupIndex()
+        index.warm(db)
+        _near_dup_index = index
+    return _near_dup_index
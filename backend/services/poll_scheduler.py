@@ -0,0 +1,107 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, text
+from ..models import Source, SourceFetchState
+from datetime import datetime, timedelta, timezone
+import os
+import random
+
+# Polling bounds (seconds)
+POLL_HOT_MIN_SECONDS = int(os.getenv("POLL_HOT_MIN_SECONDS", "60"))      # official / breaking sources
+POLL_MIN_SECONDS = int(os.getenv("POLL_MIN_SECONDS", "300"))             # everyone else
+POLL_MAX_SECONDS = int(os.getenv("POLL_MAX_SECONDS", str(6 * 3600)))
+POLL_DEFAULT_SECONDS = int(os.getenv("POLL_DEFAULT_SECONDS", "600"))     # new sources start at the old cadence
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.1"))                     # +/- fraction of the interval
+
+# A source publishing more often than this is treated as breaking (hot floor applies)
+BREAKING_GAP_SECONDS = 15 * 60
+# How much history the update-rate estimate looks at
+OBSERVATION_WINDOW_DAYS = 7
+
+HOT_SOURCE_TYPES = ('official',)
+
+
+class PollScheduler:
+    """
+    Per-source adaptive polling.
+    Each source's interval moves towards half its observed publishing gap
+    (from raw_items.published_at), shrinks when a fetch finds new items and
+    backs off when it finds nothing or fails. next_poll_at is jittered so
+    sources don't synchronise.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._observed_gaps = {}
+
+    def due_sources(self, now: datetime = None):
+        """Sources whose next_poll_at has passed (or that were never polled)."""
+        now = now or datetime.now(timezone.utc)
+        sources = (
+            self.db.query(Source)
+            .outerjoin(SourceFetchState, SourceFetchState.source_id == Source.source_id)
+            .filter(Source.url != None)
+            .filter(or_(SourceFetchState.next_poll_at == None, SourceFetchState.next_poll_at <= now))
+            .all()
+        )
+        self._observed_gaps = self.observed_gaps([s.source_id for s in sources])
+        return sources
+
+    def observed_gaps(self, source_ids):
+        """Median gap (seconds) between consecutive published_at per source, one query for all."""
+        if not source_ids:
+            return {}
+        rows = self.db.execute(text("""
+            select source_id, percentile_cont(0.5) within group (order by gap) as median_gap
+            from (
+              select source_id,
+                     extract(epoch from published_at - lag(published_at) over (
+                       partition by source_id order by published_at)) as gap
+              from raw_items
+              where source_id = any(:ids)
+                and published_at > now() - make_interval(days => :days)
+            ) t
+            where gap > 0
+            group by source_id
+        """), {"ids": list(source_ids), "days": OBSERVATION_WINDOW_DAYS}).all()
+        return {sid: float(gap) for sid, gap in rows}
+
+    def min_interval(self, source: Source) -> int:
+        gap = self._observed_gaps.get(source.source_id)
+        if source.source_type in HOT_SOURCE_TYPES or (gap is not None and gap < BREAKING_GAP_SECONDS):
+            return POLL_HOT_MIN_SECONDS
+        return POLL_MIN_SECONDS
+
+    def reschedule(self, source: Source, state: SourceFetchState, new_items: int, failed: bool = False,
+                   now: datetime = None):
+        """Update poll_interval_seconds / next_poll_at on `state` from this fetch's outcome."""
+        now = now or datetime.now(timezone.utc)
+        interval = float(state.poll_interval_seconds or POLL_DEFAULT_SECONDS)
+
+        if failed:
+            interval *= 2.0
+        elif new_items > 0:
+            interval *= 0.5
+        else:
+            interval *= 1.5
+
+        # Pull towards polling twice per observed publishing gap
+        gap = self._observed_gaps.get(source.source_id)
+        if gap is not None and not failed:
+            interval = 0.5 * interval + 0.5 * (gap / 2.0)
+
+        interval = max(self.min_interval(source), min(POLL_MAX_SECONDS, interval))
+        state.poll_interval_seconds = int(interval)
+        state.next_poll_at = now + timedelta(seconds=interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER))
+        return state.next_poll_at
+
+    def seconds_until_next_poll(self, now: datetime = None):
+        """Seconds until the earliest scheduled poll, or None if nothing is scheduled."""
+        now = now or datetime.now(timezone.utc)
+        if self.db.query(Source).outerjoin(SourceFetchState).filter(
+            Source.url != None, SourceFetchState.next_poll_at == None
+        ).first():
+            return 0.0
+        next_at = self.db.query(SourceFetchState.next_poll_at).order_by(SourceFetchState.next_poll_at.asc()).first()
+        if not next_at or next_at[0] is None:
+            return None
+        return max(0.0, (next_at[0] - now).total_seconds())
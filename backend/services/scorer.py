@@ -1,26 +1,63 @@
 from sqlalchemy.orm import Session
-from ..models import EventCluster, Evidence, ClusterScore, ClusterActivityLog
-from sqlalchemy import func
+from ..models import EventCluster, ClusterEvidenceStats, ClusterScore, ClusterActivityLog
+from sqlalchemy import func, text
+
+# Same metrics as calculate_cluster_score, for every target cluster in one statement,
+# read from the trigger-maintained cluster_evidence_stats counters:
+# consistency = (L5 + L4) / total, risk = L1 / total, mechanism_uncertainty = 1 - consistency
+BULK_SCORE_SQL = """
+    insert into cluster_scores (cluster_id, consistency, mechanism_uncertainty, risk, contradiction_ratio, method_version)
+    select s.cluster_id, s.consistency, 1.0 - s.consistency, s.risk, 0.0, :method_version
+    from (
+      select st.cluster_id,
+             cast(st.l5_count + st.l4_count as float) / st.total_count as consistency,
+             cast(st.l1_count as float) / st.total_count as risk
+      from cluster_evidence_stats st
+      where st.total_count > 0
+        and {target}
+    ) s
+    returning cluster_id
+"""
 
 class ScorerService:
     def __init__(self, db: Session):
         self.db = db
 
+    def score_clusters(self, cluster_ids=None, states=('Emerging', 'Active')) -> list:
+        """
+        Bulk scoring: the evidence counters feed a single INSERT ... SELECT
+        into cluster_scores, for cluster_ids if given, else
+        every cluster in `states`. Clusters without evidence get no row, as in
+        calculate_cluster_score. Returns the scored cluster ids; commits.
+        """
+        if cluster_ids is not None:
+            if not cluster_ids:
+                return []
+            target = "st.cluster_id = any(:ids)"
+            params = {"ids": list(cluster_ids)}
+        else:
+            target = "st.cluster_id in (select cluster_id from event_clusters where cluster_state = any(:states))"
+            params = {"states": list(states)}
+        params["method_version"] = 'governance_1.0'
+        scored = self.db.execute(text(BULK_SCORE_SQL.format(target=target)), params).scalars().all()
+        self.db.commit()
+        return scored
+
     def calculate_cluster_score(self, cluster_id: int):
         """Calculate and save scores for a cluster."""
         cluster = self.db.query(EventCluster).filter(EventCluster.cluster_id == cluster_id).first()
         if not cluster: return
 
-        evidence_list = self.db.query(Evidence).filter(Evidence.cluster_id == cluster_id).all()
-        if not evidence_list: return
+        stats = self.db.get(ClusterEvidenceStats, cluster_id)
+        if not stats or not stats.total_count: return
 
         # Metrics
-        total_ev = len(evidence_list)
-        l5_count = sum(1 for e in evidence_list if e.level == 5)
-        l1_count = sum(1 for e in evidence_list if e.level == 1)
+        total_ev = stats.total_count
+        l5_count = stats.l5_count
+        l1_count = stats.l1_count
         
         # Consistency: Ratio of high quality evidence
-        consistency = (l5_count + sum(1 for e in evidence_list if e.level == 4)) / total_ev if total_ev > 0 else 0
+        consistency = (l5_count + stats.l4_count) / total_ev if total_ev > 0 else 0
 
         # Risk: Ratio of speculative evidence (L1)
         risk = l1_count / total_ev if total_ev > 0 else 0
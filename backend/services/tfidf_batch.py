@@ -0,0 +1,126 @@
+import math
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# NumPy / SciPy back the tfidf engine; the clusterer refuses to start with CLUSTER_ENGINE=tfidf without them
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = None
+    sparse = None
+
+# Cosine similarity needed to join a cluster (or to join a new group in the same batch)
+TFIDF_SIMILARITY_THRESHOLD = float(os.getenv("TFIDF_SIMILARITY_THRESHOLD", "0.4"))
+# Rows per sparse product chunk, bounding the intermediate similarity matrix
+TFIDF_CHUNK_ROWS = int(os.getenv("TFIDF_CHUNK_ROWS", "1024"))
+# Tokens in more than this share of documents carry no signal and densify the products
+TFIDF_MAX_DF = float(os.getenv("TFIDF_MAX_DF", "0.5"))
+
+
+def available() -> bool:
+    return sparse is not None
+
+
+def tfidf_matrix(texts, vocabulary=None, idf=None):
+    """
+    L2-normalised TF-IDF rows (sublinear tf) for whitespace/lowercase tokens, the
+    same tokens the Jaccard engines use. Pass vocabulary/idf to project new texts
+    into an existing space. Returns (csr_matrix, vocabulary, idf).
+    """
+    build = vocabulary is None
+    if build:
+        vocabulary = {}
+    indptr, indices, data = [0], [], []
+    for text in texts:
+        counts = {}
+        for token in (text or "").lower().split():
+            col = vocabulary.get(token)
+            if col is None:
+                if not build:
+                    continue
+                col = vocabulary[token] = len(vocabulary)
+            counts[col] = counts.get(col, 0) + 1
+        indices.extend(counts)
+        data.extend(1.0 + math.log(c) for c in counts.values())
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, len(vocabulary)),
+    )
+    if idf is None:
+        df = np.bincount(matrix.indices, minlength=len(vocabulary))
+        idf = np.log((1.0 + matrix.shape[0]) / (1.0 + df)) + 1.0
+        if matrix.shape[0] >= 10:
+            idf[df > TFIDF_MAX_DF * matrix.shape[0]] = 0.0
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.csr_matrix(sparse.diags(1.0 / norms) @ matrix), vocabulary, idf
+
+
+def _product_above(left, right_t, threshold):
+    """left @ right_t computed in row chunks, keeping only entries above threshold."""
+    parts = []
+    for start in range(0, left.shape[0], TFIDF_CHUNK_ROWS):
+        part = (left[start:start + TFIDF_CHUNK_ROWS] @ right_t).tocsr()
+        part.data[part.data <= threshold] = 0.0
+        part.eliminate_zeros()
+        parts.append(part)
+    if not parts:
+        return sparse.csr_matrix((0, right_t.shape[1]))
+    return sparse.vstack(parts).tocsr()
+
+
+def _best_per_row(similarity, threshold):
+    """(column, score) per row of a sparse similarity matrix; column -1 where nothing beats threshold."""
+    best = np.full(similarity.shape[0], -1, dtype=np.int64)
+    scores = np.zeros(similarity.shape[0])
+    if similarity.nnz:
+        cols = np.asarray(similarity.argmax(axis=1)).ravel()
+        vals = np.asarray(similarity.max(axis=1).todense()).ravel()
+        hit = vals > threshold
+        best[hit] = cols[hit]
+        scores[hit] = vals[hit]
+    return best, scores
+
+
+def assign_batch(evidence_texts, cluster_texts, threshold: float = None):
+    """
+    Batch assignment of evidence to clusters by TF-IDF cosine similarity.
+
+    Returns (assigned, groups):
+      assigned: array with a cluster_texts index per evidence row, -1 if unmatched
+      groups:   lists of unmatched evidence indices that should form one new
+                cluster each (first index is the group's leader)
+    """
+    threshold = TFIDF_SIMILARITY_THRESHOLD if threshold is None else threshold
+    n_evidence = len(evidence_texts)
+    # One shared space, so idf reflects both the batch and the clusters it is matched against
+    matrix, _, _ = tfidf_matrix(list(evidence_texts) + list(cluster_texts))
+    evidence, clusters = matrix[:n_evidence], matrix[n_evidence:]
+
+    assigned = np.full(n_evidence, -1, dtype=np.int64)
+    if clusters.shape[0]:
+        assigned, _ = _best_per_row(_product_above(evidence, clusters.T.tocsr(), threshold), threshold)
+
+    # Unmatched rows are grouped with each other (leader clustering in batch order),
+    # so a burst about one new event becomes one cluster rather than one per row
+    unmatched = np.flatnonzero(assigned < 0)
+    groups = []
+    if unmatched.size:
+        pending = evidence[unmatched]
+        similarity = _product_above(pending, pending.T.tocsr(), threshold)
+        grouped = np.zeros(unmatched.size, dtype=bool)
+        for i in range(unmatched.size):
+            if grouped[i]:
+                continue
+            row = similarity.indices[similarity.indptr[i]:similarity.indptr[i + 1]]
+            members = row[(row > i) & ~grouped[row]]
+            grouped[i] = True
+            grouped[members] = True
+            groups.append([int(unmatched[i])] + sorted(int(unmatched[m]) for m in members))
+    return assigned, groups
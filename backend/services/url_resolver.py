@@ -0,0 +1,189 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..models import UrlResolution
+from .feed_fetcher import get_feed_fetcher
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+URL_CACHE_MAX_ENTRIES = int(os.getenv("URL_CACHE_MAX_ENTRIES", "50000"))
+URL_CACHE_TTL_SECONDS = int(os.getenv("URL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Set URL_RESOLVE_REDIRECTS=0 to only strip tracking parameters (no network)
+URL_RESOLVE_REDIRECTS = os.getenv("URL_RESOLVE_REDIRECTS", "1") != "0"
+
+# Plain "ref" is deliberately absent: many sites use it as a real query parameter
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref_src", "ref_url", "cmpid", "_ga", "_hsenc", "_hsmi", "spm", "smid", "ocid",
+}
+# Servers that refuse HEAD with these statuses are asked again with GET
+HEAD_UNSUPPORTED_STATUSES = (405, 501)
+TRACKING_PREFIXES = ("utm_",)
+
+
+def strip_tracking_params(url: str) -> str:
+    """
+    Drop the fragment and known tracking query parameters.
+    URLs with nothing to strip are returned unchanged, so their content hashes stay stable.
+    """
+    if not url:
+        return url
+    parts = urlsplit(url.strip())
+    if parts.scheme not in ("http", "https"):
+        return url
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    query = [
+        (k, v) for k, v in params
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    if len(query) == len(params) and not parts.fragment:
+        return url
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+class LRUTTLCache:
+    """Bounded LRU mapping with per-entry expiry."""
+
+    def __init__(self, max_entries: int = URL_CACHE_MAX_ENTRIES, ttl_seconds: int = URL_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, ttl_seconds: float = None):
+        expires = time.monotonic() + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Process-wide cache shared across ticks
+_resolution_cache = LRUTTLCache()
+
+
+class UrlResolver:
+    """
+    Canonical URL resolution: strip trackers, then follow redirects with
+    concurrent HEAD requests (GET where HEAD is refused). Results are cached in
+    memory (LRU + TTL) and persisted to url_resolutions so restarts stay warm.
+    The ingestor only does the lookup part per feed and resolves the misses of
+    all feeds in one batch afterwards.
+    """
+
+    def __init__(self, db: Session, fetcher=None, cache: LRUTTLCache = None):
+        self.db = db
+        self.fetcher = fetcher or get_feed_fetcher()
+        self.cache = cache if cache is not None else _resolution_cache
+
+    def resolve_many(self, urls):
+        """Return {url: canonical_url} for every input url, following redirects for cache misses."""
+        stripped, resolved, misses = self.lookup_many(urls)
+        if misses and URL_RESOLVE_REDIRECTS:
+            resolved.update(self.resolve_remote(misses))
+        return {url: resolved.get(clean, clean) for url, clean in stripped.items()}
+
+    def lookup_many(self, urls):
+        """
+        Network-free part of resolution: strip trackers, then consult the
+        in-memory cache and url_resolutions. Returns
+        ({url: stripped}, {stripped: canonical} for known ones, set of unknown stripped urls).
+        """
+        stripped = {url: strip_tracking_params(url) for url in urls if url}
+        resolved = {}
+        misses = set()
+        for clean in set(stripped.values()):
+            hit = self.cache.get(clean)
+            if hit is not None:
+                resolved[clean] = hit
+            else:
+                misses.add(clean)
+
+        if misses:
+            resolved.update(self._load_persisted(misses))
+            misses -= resolved.keys()
+        return stripped, resolved, misses
+
+    def resolve_remote(self, urls):
+        """
+        Follow redirects for (already stripped) urls with concurrent HEAD requests,
+        retrying with GET where HEAD is refused. Persists and caches the results
+        (does not commit) and returns {url: canonical_url}.
+        """
+        fresh, retry_get = {}, []
+        for clean, result in self.fetcher.iter_fetch(((u, u, None) for u in urls), method="HEAD"):
+            if result.error is None and result.status in HEAD_UNSUPPORTED_STATUSES:
+                retry_get.append(clean)
+            else:
+                self._record(fresh, clean, result)
+        if retry_get:
+            for clean, result in self.fetcher.iter_fetch(((u, u, None) for u in retry_get), method="GET"):
+                self._record(fresh, clean, result)
+
+        self._persist({clean: canonical for clean, canonical in fresh.items() if canonical is not None})
+        resolved = {}
+        for clean, canonical in fresh.items():
+            if canonical is not None:
+                self.cache.put(clean, canonical)
+            resolved[clean] = canonical or clean
+        return resolved
+
+    def _record(self, fresh, clean, result):
+        # Only a 2xx final response (after redirects) is a resolution; 404/410/429/5xx are not
+        if result.error is None and 200 <= result.status < 300:
+            fresh[clean] = strip_tracking_params(result.url)
+        else:
+            self._unreachable(fresh, clean)
+
+    def _unreachable(self, fresh, clean):
+        # Unreachable right now: use the stripped URL, retry after a short while
+        fresh[clean] = None
+        self.cache.put(clean, clean, ttl_seconds=3600)
+
+    def _load_persisted(self, urls):
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.cache.ttl_seconds)
+        rows = (
+            self.db.query(UrlResolution.url, UrlResolution.canonical_url)
+            .filter(UrlResolution.url.in_(list(urls)), UrlResolution.resolved_at >= since)
+            .all()
+        )
+        for url, canonical in rows:
+            self.cache.put(url, canonical)
+        return dict(rows)
+
+    def _persist(self, resolutions):
+        if not resolutions:
+            return
+        stmt = pg_insert(UrlResolution).values([
+            {"url": url, "canonical_url": canonical, "resolved_at": datetime.now(timezone.utc)}
+            for url, canonical in resolutions.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UrlResolution.url],
+            set_={"canonical_url": stmt.excluded.canonical_url, "resolved_at": stmt.excluded.resolved_at},
+        )
+        self.db.execute(stmt)
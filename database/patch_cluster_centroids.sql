@@ -0,0 +1,14 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Cluster term-frequency centroids
+-- =========================
+
+-- Compact per-cluster representation used by the centroid cluster engine:
+-- summed term counts of the cluster's evidence (top N terms), loaded into
+-- memory on startup and written back as clusters absorb evidence.
+CREATE TABLE IF NOT EXISTS cluster_centroids (
+  cluster_id INT PRIMARY KEY REFERENCES event_clusters(cluster_id) ON DELETE CASCADE,
+  term_counts JSONB NOT NULL,
+  evidence_count INT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
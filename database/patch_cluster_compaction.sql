@@ -0,0 +1,17 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Cluster merge/compaction job state
+-- =========================
+
+-- Progress of the offline compaction job: every cluster up to last_cluster_id
+-- has been compared against the older clusters of its domain, so each run
+-- only probes clusters created since.
+CREATE TABLE IF NOT EXISTS cluster_compaction_state (
+  job VARCHAR(50) PRIMARY KEY,
+  last_cluster_id INT NOT NULL DEFAULT 0,
+  merged_total INT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Absorbed clusters are looked up by the cluster that superseded them
+CREATE INDEX IF NOT EXISTS idx_clusters_supersedes ON event_clusters(supersedes_cluster_id);
@@ -0,0 +1,154 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Materialized per-cluster evidence counters
+-- =========================
+
+-- Evidence level counts per cluster, kept current by statement-level triggers
+-- on evidence, so the scorer, the heartbeat logs and the cluster API read one
+-- row per cluster instead of counting evidence rows.
+CREATE TABLE IF NOT EXISTS cluster_evidence_stats (
+  cluster_id INT PRIMARY KEY REFERENCES event_clusters(cluster_id) ON DELETE CASCADE,
+  l5_count INT NOT NULL DEFAULT 0,
+  l4_count INT NOT NULL DEFAULT 0,
+  l3_count INT NOT NULL DEFAULT 0,
+  l2_count INT NOT NULL DEFAULT 0,
+  l1_count INT NOT NULL DEFAULT 0,
+  total_count INT NOT NULL DEFAULT 0,
+  last_evidence_at TIMESTAMPTZ
+);
+
+-- Each function folds a statement's transition rows into signed per-cluster
+-- deltas (+1 for a row entering a cluster, -1 for a row leaving it) and applies
+-- them in one upsert, in cluster_id order so concurrent writers lock alike.
+-- last_evidence_at only moves forward (deletes do not rewind it).
+CREATE OR REPLACE FUNCTION cluster_evidence_stats_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO cluster_evidence_stats AS s
+    (cluster_id, l5_count, l4_count, l3_count, l2_count, l1_count, total_count, last_evidence_at)
+  SELECT cluster_id,
+         count(*) FILTER (WHERE level = 5),
+         count(*) FILTER (WHERE level = 4),
+         count(*) FILTER (WHERE level = 3),
+         count(*) FILTER (WHERE level = 2),
+         count(*) FILTER (WHERE level = 1),
+         count(*),
+         max(extracted_at)
+  FROM new_rows
+  WHERE cluster_id IS NOT NULL
+  GROUP BY cluster_id
+  ORDER BY cluster_id
+  ON CONFLICT (cluster_id) DO UPDATE SET
+    l5_count = s.l5_count + EXCLUDED.l5_count,
+    l4_count = s.l4_count + EXCLUDED.l4_count,
+    l3_count = s.l3_count + EXCLUDED.l3_count,
+    l2_count = s.l2_count + EXCLUDED.l2_count,
+    l1_count = s.l1_count + EXCLUDED.l1_count,
+    total_count = s.total_count + EXCLUDED.total_count,
+    last_evidence_at = GREATEST(s.last_evidence_at, EXCLUDED.last_evidence_at);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cluster_evidence_stats_on_update() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO cluster_evidence_stats AS s
+    (cluster_id, l5_count, l4_count, l3_count, l2_count, l1_count, total_count, last_evidence_at)
+  SELECT d.cluster_id,
+         coalesce(sum(d.sign) FILTER (WHERE d.level = 5), 0),
+         coalesce(sum(d.sign) FILTER (WHERE d.level = 4), 0),
+         coalesce(sum(d.sign) FILTER (WHERE d.level = 3), 0),
+         coalesce(sum(d.sign) FILTER (WHERE d.level = 2), 0),
+         coalesce(sum(d.sign) FILTER (WHERE d.level = 1), 0),
+         sum(d.sign),
+         max(d.extracted_at) FILTER (WHERE d.sign > 0)
+  FROM (
+    -- Only rows whose cluster or level changed (signature updates etc. are no-ops)
+    SELECT n.cluster_id, n.level, n.extracted_at, 1 AS sign
+    FROM new_rows n JOIN old_rows o ON o.evidence_id = n.evidence_id
+    WHERE n.cluster_id IS DISTINCT FROM o.cluster_id OR n.level <> o.level
+    UNION ALL
+    SELECT o.cluster_id, o.level, o.extracted_at, -1 AS sign
+    FROM new_rows n JOIN old_rows o ON o.evidence_id = n.evidence_id
+    WHERE n.cluster_id IS DISTINCT FROM o.cluster_id OR n.level <> o.level
+  ) d
+  WHERE d.cluster_id IS NOT NULL
+  GROUP BY d.cluster_id
+  ORDER BY d.cluster_id
+  ON CONFLICT (cluster_id) DO UPDATE SET
+    l5_count = s.l5_count + EXCLUDED.l5_count,
+    l4_count = s.l4_count + EXCLUDED.l4_count,
+    l3_count = s.l3_count + EXCLUDED.l3_count,
+    l2_count = s.l2_count + EXCLUDED.l2_count,
+    l1_count = s.l1_count + EXCLUDED.l1_count,
+    total_count = s.total_count + EXCLUDED.total_count,
+    last_evidence_at = GREATEST(s.last_evidence_at, EXCLUDED.last_evidence_at);
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION cluster_evidence_stats_on_delete() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE cluster_evidence_stats s SET
+    l5_count = s.l5_count - d.l5,
+    l4_count = s.l4_count - d.l4,
+    l3_count = s.l3_count - d.l3,
+    l2_count = s.l2_count - d.l2,
+    l1_count = s.l1_count - d.l1,
+    total_count = s.total_count - d.total
+  FROM (
+    SELECT cluster_id,
+           count(*) FILTER (WHERE level = 5) AS l5,
+           count(*) FILTER (WHERE level = 4) AS l4,
+           count(*) FILTER (WHERE level = 3) AS l3,
+           count(*) FILTER (WHERE level = 2) AS l2,
+           count(*) FILTER (WHERE level = 1) AS l1,
+           count(*) AS total
+    FROM old_rows
+    WHERE cluster_id IS NOT NULL
+    GROUP BY cluster_id
+  ) d
+  WHERE s.cluster_id = d.cluster_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_evidence_stats_insert ON evidence;
+CREATE TRIGGER trg_evidence_stats_insert
+AFTER INSERT ON evidence
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cluster_evidence_stats_on_insert();
+
+DROP TRIGGER IF EXISTS trg_evidence_stats_update ON evidence;
+CREATE TRIGGER trg_evidence_stats_update
+AFTER UPDATE ON evidence
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cluster_evidence_stats_on_update();
+
+DROP TRIGGER IF EXISTS trg_evidence_stats_delete ON evidence;
+CREATE TRIGGER trg_evidence_stats_delete
+AFTER DELETE ON evidence
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION cluster_evidence_stats_on_delete();
+
+-- Backfill from the current evidence (re-running rebuilds the counters)
+INSERT INTO cluster_evidence_stats
+  (cluster_id, l5_count, l4_count, l3_count, l2_count, l1_count, total_count, last_evidence_at)
+SELECT cluster_id,
+       count(*) FILTER (WHERE level = 5),
+       count(*) FILTER (WHERE level = 4),
+       count(*) FILTER (WHERE level = 3),
+       count(*) FILTER (WHERE level = 2),
+       count(*) FILTER (WHERE level = 1),
+       count(*),
+       max(extracted_at)
+FROM evidence
+WHERE cluster_id IS NOT NULL
+GROUP BY cluster_id
+ON CONFLICT (cluster_id) DO UPDATE SET
+  l5_count = EXCLUDED.l5_count,
+  l4_count = EXCLUDED.l4_count,
+  l3_count = EXCLUDED.l3_count,
+  l2_count = EXCLUDED.l2_count,
+  l1_count = EXCLUDED.l1_count,
+  total_count = EXCLUDED.total_count,
+  last_evidence_at = EXCLUDED.last_evidence_at;
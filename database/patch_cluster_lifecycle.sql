@@ -0,0 +1,9 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Cluster lifecycle sweep indexes
+-- =========================
+
+-- The lifecycle sweeper walks each state by age (oldest last_updated_at first)
+-- and counts recent evidence per cluster; both stay index-only range scans.
+CREATE INDEX IF NOT EXISTS idx_clusters_state_updated ON event_clusters(cluster_state, last_updated_at);
+CREATE INDEX IF NOT EXISTS idx_evidence_cluster_extracted ON evidence(cluster_id, extracted_at DESC);
@@ -0,0 +1,85 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Dirty-cluster tracking
+-- =========================
+
+-- Clusters that gained evidence since the heartbeat last scored/logged them,
+-- with the per-level count of what was added. Evidence reaches a cluster
+-- either on insert or when clustering/compaction assigns it later, so both
+-- are tracked. The heartbeat claims (deletes) rows each tick.
+CREATE TABLE IF NOT EXISTS dirty_clusters (
+  cluster_id INT PRIMARY KEY REFERENCES event_clusters(cluster_id) ON DELETE CASCADE,
+  added_l5 INT NOT NULL DEFAULT 0,
+  added_l4 INT NOT NULL DEFAULT 0,
+  added_l3 INT NOT NULL DEFAULT 0,
+  added_l2 INT NOT NULL DEFAULT 0,
+  added_l1 INT NOT NULL DEFAULT 0,
+  first_dirtied_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Statement-level: a bulk assignment of N rows is one upsert, not N.
+CREATE OR REPLACE FUNCTION mark_clusters_dirty_on_insert() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO dirty_clusters AS d (cluster_id, added_l5, added_l4, added_l3, added_l2, added_l1)
+  SELECT cluster_id,
+         count(*) FILTER (WHERE level = 5),
+         count(*) FILTER (WHERE level = 4),
+         count(*) FILTER (WHERE level = 3),
+         count(*) FILTER (WHERE level = 2),
+         count(*) FILTER (WHERE level = 1)
+  FROM new_rows
+  WHERE cluster_id IS NOT NULL
+  GROUP BY cluster_id
+  ON CONFLICT (cluster_id) DO UPDATE SET
+    added_l5 = d.added_l5 + EXCLUDED.added_l5,
+    added_l4 = d.added_l4 + EXCLUDED.added_l4,
+    added_l3 = d.added_l3 + EXCLUDED.added_l3,
+    added_l2 = d.added_l2 + EXCLUDED.added_l2,
+    added_l1 = d.added_l1 + EXCLUDED.added_l1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION mark_clusters_dirty_on_assign() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO dirty_clusters AS d (cluster_id, added_l5, added_l4, added_l3, added_l2, added_l1)
+  SELECT n.cluster_id,
+         count(*) FILTER (WHERE n.level = 5),
+         count(*) FILTER (WHERE n.level = 4),
+         count(*) FILTER (WHERE n.level = 3),
+         count(*) FILTER (WHERE n.level = 2),
+         count(*) FILTER (WHERE n.level = 1)
+  FROM new_rows n
+  JOIN old_rows o ON o.evidence_id = n.evidence_id
+  WHERE n.cluster_id IS NOT NULL
+    AND n.cluster_id IS DISTINCT FROM o.cluster_id
+  GROUP BY n.cluster_id
+  ON CONFLICT (cluster_id) DO UPDATE SET
+    added_l5 = d.added_l5 + EXCLUDED.added_l5,
+    added_l4 = d.added_l4 + EXCLUDED.added_l4,
+    added_l3 = d.added_l3 + EXCLUDED.added_l3,
+    added_l2 = d.added_l2 + EXCLUDED.added_l2,
+    added_l1 = d.added_l1 + EXCLUDED.added_l1;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_evidence_dirty_insert ON evidence;
+CREATE TRIGGER trg_evidence_dirty_insert
+AFTER INSERT ON evidence
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION mark_clusters_dirty_on_insert();
+
+-- Transition tables cannot be combined with an UPDATE OF column list; the
+-- function filters to rows whose cluster_id actually changed.
+DROP TRIGGER IF EXISTS trg_evidence_dirty_assign ON evidence;
+CREATE TRIGGER trg_evidence_dirty_assign
+AFTER UPDATE ON evidence
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION mark_clusters_dirty_on_assign();
+
+-- Backfill: score/log every active cluster once on the first tick after the patch
+INSERT INTO dirty_clusters (cluster_id)
+SELECT cluster_id FROM event_clusters
+WHERE cluster_state IN ('Emerging', 'Active')
+ON CONFLICT (cluster_id) DO NOTHING;
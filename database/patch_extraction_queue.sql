@@ -0,0 +1,32 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Durable extraction work queue
+-- =========================
+
+-- One row per raw item awaiting (or done with) evidence extraction.
+-- Workers claim pending rows with FOR UPDATE SKIP LOCKED; failures are retried
+-- with exponential backoff via available_at and dead-lettered after max attempts.
+CREATE TABLE IF NOT EXISTS extraction_queue (
+  item_id INT PRIMARY KEY REFERENCES raw_items(item_id) ON DELETE CASCADE,
+  status VARCHAR(20) NOT NULL DEFAULT 'pending',
+  attempts INT NOT NULL DEFAULT 0,
+  available_at TIMESTAMPTZ DEFAULT NOW(),
+  claimed_at TIMESTAMPTZ,
+  claimed_by VARCHAR(100),
+  last_error TEXT,
+  enqueued_at TIMESTAMPTZ DEFAULT NOW(),
+  finished_at TIMESTAMPTZ,
+  CONSTRAINT chk_extraction_queue_status CHECK (status IN ('pending', 'processing', 'done', 'dead'))
+);
+
+-- Claim scan: only live rows, oldest available first
+CREATE INDEX IF NOT EXISTS idx_extraction_queue_claim ON extraction_queue(available_at)
+  WHERE status IN ('pending', 'processing');
+
+-- Backfill: every original raw item that has no evidence yet
+INSERT INTO extraction_queue (item_id)
+SELECT r.item_id
+FROM raw_items r
+WHERE r.duplicate_of_item_id IS NULL
+  AND NOT EXISTS (SELECT 1 FROM evidence e WHERE e.raw_item_id = r.item_id)
+ON CONFLICT (item_id) DO NOTHING;
@@ -0,0 +1,19 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Persistent LLM analysis cache
+-- =========================
+
+-- One parsed model result per (content, prompt template version, model)
+CREATE TABLE IF NOT EXISTS llm_analysis_cache (
+  content_hash VARCHAR(64) NOT NULL,
+  prompt_version VARCHAR(50) NOT NULL,
+  model VARCHAR(100) NOT NULL,
+  result JSONB NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  last_hit_at TIMESTAMPTZ DEFAULT NOW(),
+  hit_count INT DEFAULT 0,
+  PRIMARY KEY (content_hash, prompt_version, model)
+);
+
+-- Eviction scans by recency
+CREATE INDEX IF NOT EXISTS idx_llm_analysis_cache_last_hit ON llm_analysis_cache(last_hit_at);
@@ -0,0 +1,10 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: MinHash signatures for the MinHash-LSH cluster engine
+-- =========================
+
+-- One 32-bit min-hash per permutation (LSH_NUM_PERM values); NULL until the
+-- minhash engine first sees the row. Signatures of a different length are
+-- recomputed, so changing LSH_NUM_PERM needs no migration.
+ALTER TABLE event_clusters ADD COLUMN IF NOT EXISTS minhash_signature BIGINT[];
+ALTER TABLE evidence ADD COLUMN IF NOT EXISTS minhash_signature BIGINT[];
@@ -0,0 +1,12 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Near-duplicate raw items (SimHash)
+-- =========================
+
+-- 64-bit SimHash of title + content, stored as signed BIGINT
+ALTER TABLE raw_items ADD COLUMN IF NOT EXISTS simhash BIGINT;
+-- Set when the item is a syndicated copy of an earlier item; such items are not extracted
+ALTER TABLE raw_items ADD COLUMN IF NOT EXISTS duplicate_of_item_id INT REFERENCES raw_items(item_id);
+
+CREATE INDEX IF NOT EXISTS idx_raw_items_duplicate_of ON raw_items(duplicate_of_item_id)
+  WHERE duplicate_of_item_id IS NOT NULL;
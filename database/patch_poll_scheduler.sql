@@ -0,0 +1,13 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Adaptive per-source polling
+-- Requires patch_source_fetch_state.sql
+-- =========================
+
+ALTER TABLE source_fetch_state ADD COLUMN IF NOT EXISTS poll_interval_seconds INT;
+ALTER TABLE source_fetch_state ADD COLUMN IF NOT EXISTS next_poll_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_source_fetch_state_next_poll ON source_fetch_state(next_poll_at);
+
+-- Update-rate estimation scans recent published_at per source
+CREATE INDEX IF NOT EXISTS idx_raw_items_source_published ON raw_items(source_id, published_at DESC);
@@ -0,0 +1,16 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Per-source fetch state (Conditional GET)
+-- =========================
+
+-- One row per source: validators for If-None-Match / If-Modified-Since
+-- and the digest of the last body we parsed.
+CREATE TABLE IF NOT EXISTS source_fetch_state (
+  source_id INT PRIMARY KEY REFERENCES sources(source_id) ON DELETE CASCADE,
+  etag TEXT,
+  last_modified TEXT,
+  body_digest VARCHAR(64),
+  last_status INT,
+  last_fetched_at TIMESTAMPTZ,
+  last_changed_at TIMESTAMPTZ
+);
@@ -0,0 +1,16 @@
+-- =========================
+-- AI Civilization News DB
+-- Patch: Persisted canonical URL resolutions
+-- =========================
+
+-- Tracker-stripped URL -> final URL after redirects (LRU/TTL cache backing store)
+CREATE TABLE IF NOT EXISTS url_resolutions (
+  url TEXT PRIMARY KEY,
+  canonical_url TEXT NOT NULL,
+  resolved_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_url_resolutions_resolved ON url_resolutions(resolved_at);
+
+-- Tracker variants of a stored link are deduped by canonical URL at ingest
+CREATE INDEX IF NOT EXISTS idx_raw_items_canonical_url ON raw_items(canonical_url);
@@ -0,0 +1,83 @@
+import os
+import sys
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.cluster_index import TokenIndex, MinHashLSHIndex, tokenize
+
+# Recall / throughput of the MinHash-LSH cluster engine against exact Jaccard.
+# Usage: python scripts/bench_cluster_engines.py [n_clusters] [n_queries]
+
+THRESHOLD = 0.3
+VOCAB = [f"term{i}" for i in range(20000)]
+COMMON = ["the", "a", "of", "in", "to", "and", "on", "for", "said", "after"]
+
+
+def synthetic(n_clusters, n_queries, seed=11):
+    """Cluster titles, plus queries that are either edited copies of a title or unrelated text."""
+    rng = random.Random(seed)
+
+    def sentence(n):
+        return [rng.choice(COMMON) if rng.random() < 0.3 else rng.choice(VOCAB) for _ in range(n)]
+
+    titles = [" ".join(sentence(rng.randint(8, 16))) for _ in range(n_clusters)]
+    queries = []
+    for _ in range(n_queries):
+        if rng.random() < 0.6:
+            words = rng.choice(titles).split()
+            # Replace/append a few words so true matches spread over Jaccard 0.2 - 0.9
+            for _ in range(rng.randint(0, len(words) // 2)):
+                words[rng.randrange(len(words))] = rng.choice(VOCAB)
+            words += sentence(rng.randint(0, 6))
+            queries.append(" ".join(words))
+        else:
+            queries.append(" ".join(sentence(rng.randint(8, 16))))
+    return titles, queries
+
+
+def exact_jaccard(a, b):
+    sa, sb = tokenize(a), tokenize(b)
+    union = len(sa | sb)
+    return len(sa & sb) / union if union else 0.0
+
+
+def run(index, titles, queries):
+    t0 = time.perf_counter()
+    for cluster_id, title in enumerate(titles):
+        index.add(cluster_id, index.signature(title))
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    matches = [index.best_match(index.signature(q), THRESHOLD)[0] for q in queries]
+    return matches, build, time.perf_counter() - t0
+
+
+def main(n_clusters=20000, n_queries=2000):
+    titles, queries = synthetic(n_clusters, n_queries)
+    print(f"🧪 {n_clusters} clusters, {n_queries} queries, threshold {THRESHOLD}")
+
+    # Linear scan (the original engine) on a sample, for scale
+    sample = queries[:50]
+    t0 = time.perf_counter()
+    for q in sample:
+        max((exact_jaccard(q, t) for t in titles), default=0)
+    linear_qps = len(sample) / (time.perf_counter() - t0)
+    print(f"   Linear exact scan         : {linear_qps:10.1f} queries/s")
+
+    exact, build, elapsed = run(TokenIndex(), titles, queries)
+    print(f"   Inverted index (exact)    : {n_queries / elapsed:10.1f} queries/s (build {build:.1f}s)")
+    truth = [i for i, m in enumerate(exact) if m is not None]
+
+    for num_perm, bands in ((96, 32), (120, 40), (128, 64)):
+        lsh, build, elapsed = run(MinHashLSHIndex(num_perm=num_perm, bands=bands), titles, queries)
+        found = sum(1 for i in truth if lsh[i] is not None and exact_jaccard(queries[i], titles[lsh[i]]) > THRESHOLD)
+        same = sum(1 for i in truth if lsh[i] == exact[i])
+        spurious = sum(1 for i, m in enumerate(lsh) if m is not None and exact[i] is None)
+        print(f"   MinHash-LSH {num_perm:3d}p/{bands:2d}b     : {n_queries / elapsed:10.1f} queries/s "
+              f"(build {build:.1f}s) recall {found / len(truth):.3f}, "
+              f"same cluster {same / len(truth):.3f}, spurious {spurious}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,85 @@
+import os
+import sys
+import random
+import re
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.keyword_rules import KeywordClassifier
+
+# Sentences/sec of the compiled keyword classifier vs the original per-sentence scans.
+# Usage: python scripts/bench_keyword_classifier.py [n_items]
+
+# Newswire-like prose: 8-30 word sentences, roughly one in five carrying a rule keyword
+WORDS = ("the ministry said on tuesday that new measures would take effect next month while analysts "
+         "in several provinces noted rising costs for households and small firms across the region amid "
+         "ongoing talks with trade partners over tariffs and supply chains").split()
+KEYWORDS = ("might", "predicts", "rumor", "official statement", "report", "according to", "speculates")
+URLS = ("https://news.example.com/a/{i}", "https://twitter.com/user/status/{i}",
+        "https://gov.example.org/press/{i}", "https://weibo.com/{i}")
+
+
+def legacy_classify(content, url, source_type):
+    """The rules as EvidenceExtractor applied them before the compiled classifier."""
+    out = []
+    is_official_source = source_type == 'official'
+    for sent in re.split(r'(?<=[.!?])\s+', content):
+        if len(sent) < 20: continue
+        level = 3
+        kind = 'fact'
+        lower_sent = sent.lower()
+        if any(w in lower_sent for w in ['predicts', 'might', 'speculates', 'rumor']):
+            level = 1
+            kind = 'inference'
+        elif 'twitter' in url or 'weibo' in url:
+            level = 2
+        elif is_official_source or 'official statement' in lower_sent or 'report' in lower_sent:
+            level = 5
+        elif 'according to' in lower_sent:
+            level = 4
+            kind = 'quote'
+        out.append((sent, level, kind))
+    return out
+
+
+def synthetic_corpus(n_items, sentences_per_item=30, keyword_rate=0.2, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(n_items):
+        sentences = []
+        for _ in range(sentences_per_item):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(8, 30))]
+            if rng.random() < keyword_rate:
+                words.insert(rng.randrange(len(words)), rng.choice(KEYWORDS))
+            sentences.append(" ".join(words).capitalize() + rng.choice(".!?"))
+        corpus.append((" ".join(sentences), rng.choice(URLS).format(i=i),
+                       rng.choice(("news", "news", "official", "social"))))
+    return corpus
+
+
+def run(classify, corpus):
+    t0 = time.perf_counter()
+    n = sum(len(classify(content, url, source_type)) for content, url, source_type in corpus)
+    return n, time.perf_counter() - t0
+
+
+def main(n_items=5000):
+    corpus = synthetic_corpus(n_items)
+    compiled = KeywordClassifier()
+
+    mismatches = sum(
+        1 for content, url, source_type in corpus
+        if legacy_classify(content, url, source_type) != compiled.classify(content, url, source_type)
+    )
+    n_legacy, t_legacy = run(legacy_classify, corpus)
+    n_compiled, t_compiled = run(compiled.classify, corpus)
+
+    print(f"📚 {n_items} items, {n_legacy} evidence sentences ({mismatches} items classified differently)")
+    print(f"   Legacy per-sentence scans : {n_legacy / t_legacy:10.0f} sentences/s")
+    print(f"   Compiled rule table       : {n_compiled / t_compiled:10.0f} sentences/s "
+          f"({t_legacy / t_compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from backend.services.cluster_index import MinHashLSHIndex
+from backend.services.clusterer import DOMAINS, LSH_BANDS, LSH_NUM_PERM, ShardPool
+
+# Per-run cost of domain-sharded clustering: a fresh pool per run (processes
+# started, every active cluster shipped and indexed again) against the
+# persistent ShardPool, which only ships new evidence and index deltas.
+# Usage: python scripts/bench_shard_workers.py [n_clusters] [n_runs] [evidence_per_run] [engine] [workers]
+
+VOCAB = [f"term{i}" for i in range(20000)]
+
+
+def synthetic(n_clusters, n_runs, per_run, seed=7):
+    rng = random.Random(seed)
+    titles = {cluster_id: " ".join(rng.choice(VOCAB) for _ in range(rng.randint(8, 14))) for cluster_id in range(1, n_clusters + 1)}
+    domains = {cluster_id: rng.choice(DOMAINS) for cluster_id in titles}
+    runs = []
+    evidence_id = 0
+    for _ in range(n_runs):
+        batch = {}
+        for _ in range(per_run):
+            evidence_id += 1
+            if rng.random() < 0.7:
+                # Edited copy of an existing title, so most evidence joins a cluster
+                cluster_id = rng.randint(1, n_clusters)
+                words = titles[cluster_id].split()
+                words[rng.randrange(len(words))] = rng.choice(VOCAB)
+                batch.setdefault(domains[cluster_id], []).append((evidence_id, " ".join(words)))
+            else:
+                batch.setdefault(rng.choice(DOMAINS), []).append((evidence_id, " ".join(rng.choice(VOCAB) for _ in range(10))))
+        runs.append(batch)
+    return titles, domains, runs
+
+
+def simulate(titles, domains, runs, engine, workers, persistent, stored):
+    titles, domains = dict(titles), dict(domains)
+    next_id = max(titles) + 1
+    pool = ShardPool(engine, workers) if persistent else None
+    timings = []
+    for batch in runs:
+        started = time.perf_counter()
+        run_pool = pool or ShardPool(engine, workers)
+        active = {}
+        for cluster_id, domain in domains.items():
+            active.setdefault(domain, {})[cluster_id] = None
+        results = run_pool.match(active, batch, lambda ids: {cluster_id: (titles[cluster_id], stored.get(cluster_id), 0) for cluster_id in ids})
+        for domain, (assignments, new_clusters, _, _, _) in results.items():
+            rows = dict(batch[domain])
+            real_ids = {}
+            for k, (leader_id, signature) in enumerate(new_clusters):
+                real_ids[-(k + 1)] = next_id
+                if signature is not None:
+                    stored[next_id] = signature
+                titles[next_id], domains[next_id] = rows[leader_id][:100] + "...", domain
+                next_id += 1
+            run_pool.created(domain, real_ids, {cluster_id: None for cluster_id in real_ids.values()})
+        if pool is None:
+            run_pool.close()
+        timings.append(time.perf_counter() - started)
+    if pool is not None:
+        pool.close()
+    return timings
+
+
+def main(n_clusters=30000, n_runs=10, per_run=500, engine="minhash", workers=6):
+    titles, domains, runs = synthetic(n_clusters, n_runs, per_run)
+    print(f"🧪 {n_clusters} active clusters, {n_runs} runs x {per_run} evidence, engine {engine}, {workers} workers")
+    stored = {}
+    if engine == "minhash":
+        # As in event_clusters.minhash_signature, so neither side re-signs existing titles
+        index = MinHashLSHIndex(num_perm=LSH_NUM_PERM, bands=LSH_BANDS)
+        stored = {cluster_id: list(index.signature(title)) for cluster_id, title in titles.items()}
+    fresh = simulate(titles, domains, runs, engine, workers, persistent=False, stored=dict(stored))
+    kept = simulate(titles, domains, runs, engine, workers, persistent=True, stored=dict(stored))
+    # The first persistent run builds the indexes, exactly like every fresh run does
+    steady_fresh, steady_kept = sum(fresh[1:]) / (n_runs - 1), sum(kept[1:]) / (n_runs - 1)
+    print(f"   Fresh pool per run   : first {fresh[0]:6.2f}s, then {steady_fresh:6.3f}s/run")
+    print(f"   Persistent ShardPool : first {kept[0]:6.2f}s, then {steady_kept:6.3f}s/run")
+    print(f"   Steady-state speedup : {steady_fresh / steady_kept:6.1f}x")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(a) for a in args[:3]), *args[3:4], *(int(a) for a in args[4:5]))
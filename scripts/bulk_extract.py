@@ -0,0 +1,30 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.database import SessionLocal
+from backend.services.bulk_extractor import BulkExtractor
+
+# Clear the extraction backlog with the keyword rules on a process pool.
+# Usage: python scripts/bulk_extract.py [--workers N] [--shard-size N] [--limit N]
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk keyword extraction for raw items without evidence")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=None, help="raw items per worker task")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many raw items")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        extractor = BulkExtractor(db, workers=args.workers, shard_size=args.shard_size)
+        print(f"⛏  Bulk extraction with {extractor.workers} workers...")
+        stats = extractor.run(limit=args.limit)
+        rate = stats["items"] / stats["seconds"] if stats["seconds"] else 0
+        print(f"   ✅ {stats['items']} items -> {stats['evidence']} evidence in {stats['seconds']}s ({rate:.0f} items/s)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
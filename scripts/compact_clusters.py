@@ -0,0 +1,31 @@
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from backend.database import SessionLocal
+from backend.services.compactor import ClusterCompactor
+
+# Merge near-duplicate clusters (incremental; resumes where the last run stopped).
+# Usage: python scripts/compact_clusters.py [--budget SECONDS] [--threshold J] [--engine naive|minhash]
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge near-duplicate event clusters within a time budget")
+    parser.add_argument("--budget", type=float, default=None, help="wall-clock seconds for this run")
+    parser.add_argument("--threshold", type=float, default=None, help="title similarity needed to merge")
+    parser.add_argument("--engine", default=None, help="similarity index: naive or minhash")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        compactor = ClusterCompactor(db, budget_seconds=args.budget, threshold=args.threshold, engine=args.engine)
+        print(f"🧹 Compacting clusters (budget {compactor.budget_seconds}s, threshold {compactor.threshold})...")
+        stats = compactor.run()
+        more = "" if stats["complete"] else " — budget spent, run again to continue"
+        print(f"   ✅ Probed {stats['probed']}, merged {stats['merged']} clusters, "
+              f"moved {stats['evidence_moved']} evidence in {stats['seconds']}s{more}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import sys
+import hashlib
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Local stand-in for RSS hosts: /fast/<name>.xml answers immediately,
+# /slow/<name>.xml sleeps ?delay=<seconds> (default 2) before answering.
+# /large/<name>.xml?n=<entries> serves a big feed (default 5000 entries).
+# Every feed carries an ETag and answers 304 to a matching If-None-Match.
+
+def build_feed(name, n_entries=20):
+    items = "".join(
+        f"<item><title>{name} story {i}</title>"
+        f"<link>http://example.test/{name}/{i}</link>"
+        f"<description>Report {i} from {name}. According to officials the figures were confirmed.</description>"
+        f"<pubDate>Mon, 05 Jan 2026 10:{i % 60:02d}:00 GMT</pubDate></item>"
+        for i in range(n_entries)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{name}</title><link>http://example.test/{name}</link>{items}</channel></rss>"
+    ).encode("utf-8")
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so the fetcher's pooling is exercised
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = parts.path.strip("/").split("/")
+        if len(segments) != 2 or segments[0] not in ("fast", "slow", "large"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        query = parse_qs(parts.query)
+        if segments[0] == "slow":
+            time.sleep(float(query.get("delay", ["2"])[0]))
+
+        n_entries = int(query.get("n", ["5000"])[0]) if segments[0] == "large" else 20
+        body = build_feed(segments[1].replace(".xml", ""), n_entries)
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client gave up on an oversized body
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=0):
+    """Start the stand-in on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FeedHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def demo():
+    from backend.services.feed_fetcher import FeedFetcher
+
+    server, base = start_server()
+    urls = [f"{base}/slow/slow{i}.xml?delay=1" for i in range(4)] + [f"{base}/fast/fast{i}.xml" for i in range(20)]
+
+    print(f"🛰  Mock feed server on {base} ({len(urls)} feeds, 4 slow @1s)")
+
+    fetcher = FeedFetcher(max_concurrency=1, per_host_limit=1, timeout=5)
+    t0 = time.monotonic()
+    for _, res in fetcher.iter_fetch((u, u, None) for u in urls):
+        assert res.ok, res.error
+    print(f"   Sequential : {time.monotonic() - t0:.2f}s")
+
+    fetcher = FeedFetcher(max_concurrency=16, per_host_limit=8, timeout=5)
+    t0 = time.monotonic()
+    order = []
+    for key, res in fetcher.iter_fetch((u, u, None) for u in urls):
+        assert res.ok, res.error
+        order.append(key)
+    print(f"   Concurrent : {time.monotonic() - t0:.2f}s (first slow feed finished at position {min(i for i, k in enumerate(order) if '/slow/' in k) + 1})")
+
+    timeout_fetcher = FeedFetcher(timeout=0.5)
+    res = timeout_fetcher.request(f"{base}/slow/late.xml?delay=2")
+    print(f"   Timeout    : {'ok' if res.error else 'NOT TRIGGERED'} ({res.error})")
+
+    first = fetcher.request(f"{base}/fast/cond.xml")
+    again = fetcher.request(f"{base}/fast/cond.xml", {"If-None-Match": first.headers["etag"]})
+    print(f"   Conditional: {first.status} -> {again.status} ({len(again.body)} bytes on revalidation)")
+
+    from backend.services.feed_stream import iter_feed_entries
+    small = FeedFetcher(max_body_bytes=64 * 1024)
+    big = small.request(f"{base}/large/big.xml?n=20000")
+    status, _, stream = small.open_stream(f"{base}/large/big.xml?n=20000")
+    n = sum(1 for _ in iter_feed_entries(stream))
+    stream.close()
+    print(f"   Streaming  : too_large={big.too_large}, streamed {n} entries (HTTP {status})")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    demo()
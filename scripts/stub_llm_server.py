@@ -0,0 +1,107 @@
+import os
+import sys
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Offline stand-in for the extraction LLM.
+# POST /generate {"model", "prompt"} -> {"text": "<JSON array, one result per ITEM_ID>"}
+# Run the backend against it with LLM_ENDPOINT=http://127.0.0.1:<port>/generate
+
+BENCH_BREAKER = None
+
+ITEM_ID_RE = re.compile(r"ITEM_ID:\s*(\d+)")
+
+class StubConfig:
+    latency = 0.2        # seconds per request
+    error_rate = 0.0     # fraction of requests answered with HTTP 500
+    drop_rate = 0.0      # fraction of items silently left out of a reply
+    requests = 0
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        StubConfig.requests += 1
+        time.sleep(StubConfig.latency)
+
+        if random.random() < StubConfig.error_rate:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        results = [
+            {
+                "item_id": int(item_id),
+                "extract": f"Stub summary for item {item_id}",
+                "level": random.randint(1, 5),
+                "reliability_score": round(random.uniform(0.3, 0.95), 2),
+                "kind": "fact",
+            }
+            for item_id in ITEM_ID_RE.findall(body["prompt"])
+            if random.random() >= StubConfig.drop_rate
+        ]
+        payload = json.dumps({"text": "```json\n" + json.dumps(results) + "\n```"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_server(port=0):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+def bench(endpoint, n_items, **engine_kwargs):
+    from backend.services.llm_engine import ExtractionEngine, HttpTransport
+    from backend.services.circuit_breaker import CircuitBreaker
+
+    global BENCH_BREAKER
+    BENCH_BREAKER = CircuitBreaker("stub")
+
+    items = [{"item_id": i, "url": f"http://example.test/{i}", "content": "Officials confirmed the report. " * 20}
+             for i in range(n_items)]
+    engine = ExtractionEngine(HttpTransport(endpoint), breaker=BENCH_BREAKER, **engine_kwargs)
+    StubConfig.requests = 0
+    t0 = time.monotonic()
+    results = engine.analyze(items)
+    elapsed = time.monotonic() - t0
+    ok = sum(1 for r in results.values() if isinstance(r, dict))
+    return elapsed, ok, StubConfig.requests
+
+def demo():
+    server, endpoint = start_server()
+    print(f"🤖 Stub LLM on {endpoint} (latency {StubConfig.latency}s/request)")
+
+    n = 40
+    elapsed, ok, reqs = bench(endpoint, n, batch_size=1, max_concurrency=1, requests_per_minute=10000)
+    print(f"   Serial, 1 item/prompt   : {n / elapsed:6.1f} items/s ({reqs} requests, {ok}/{n} ok)")
+    elapsed, ok, reqs = bench(endpoint, n, batch_size=5, max_concurrency=4, requests_per_minute=10000)
+    print(f"   Batched x5, 4 in flight : {n / elapsed:6.1f} items/s ({reqs} requests, {ok}/{n} ok)")
+    elapsed, ok, reqs = bench(endpoint, n, batch_size=5, max_concurrency=4, requests_per_minute=30)
+    print(f"   Same, capped at 30 rpm  : {n / elapsed:6.1f} items/s ({reqs} requests, {ok}/{n} ok)")
+
+    StubConfig.error_rate, StubConfig.drop_rate = 0.3, 0.1
+    elapsed, ok, reqs = bench(endpoint, n, batch_size=5, max_concurrency=4, requests_per_minute=10000)
+    print(f"   30% 5xx + 10% dropped   : {ok}/{n} ok after retries ({reqs} requests, rest fall back to keywords)")
+
+    # Full outage: the breaker opens after a few failures and the rest skip the API
+    StubConfig.error_rate, StubConfig.drop_rate = 1.0, 0.0
+    elapsed, ok, reqs = bench(endpoint, 200, batch_size=5, max_concurrency=4, requests_per_minute=10000)
+    print(f"   Outage, 200 items       : {elapsed:5.1f}s, {reqs} requests before the breaker opened")
+    print(f"   Breaker telemetry       : {BENCH_BREAKER.snapshot()}")
+
+    server.shutdown()
+
+if __name__ == "__main__":
+    demo()
@@ -15,15 +15,23 @@ class MockSession:
     def query(self, model):
         return self
         
-    def filter(self, condition):
+    def filter(self, *conditions):
         return self
         
     def first(self):
         return self.mock_item
 
+    def all(self):
+        return [self.mock_item] if self.mock_item else []
+
     def add(self, obj):
         print(f"   [MockDB] Added object: {obj}")
 
+    def execute(self, stmt, params=None):
+        print(f"   [MockDB] Bulk insert of {len(params or [])} rows")
+        ids = list(range(1, len(params or []) + 1))
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: ids))
+
     def commit(self):
         print("   [MockDB] Commit called")
 
@@ -0,0 +1,114 @@
+"""
+Tests run against a real Postgres, since the triggers and bulk SQL under test
+only exist there. Point TEST_DATABASE_URL at a server the tests may create
+databases on, e.g.
+
+    TEST_DATABASE_URL=postgresql+psycopg://postgres@localhost:5432/postgres python -m pytest -q tests
+
+A scratch database is created with the schema and every patch applied, and
+dropped afterwards. Without TEST_DATABASE_URL the database tests are skipped.
+"""
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+# Applied in this order, as on a deployed database
+SCHEMA_FILES = [
+    "schema.sql",
+    "patch_v1_1_1.sql",
+    "patch_add_summary.sql",
+    "migration_v2_claims.sql",
+    "patch_source_fetch_state.sql",
+    "patch_poll_scheduler.sql",
+    "patch_near_duplicates.sql",
+    "patch_url_resolutions.sql",
+    "patch_llm_analysis_cache.sql",
+    "patch_extraction_queue.sql",
+    "patch_minhash_signatures.sql",
+    "patch_cluster_centroids.sql",
+    "patch_cluster_lifecycle.sql",
+    "patch_cluster_compaction.sql",
+    "patch_dirty_clusters.sql",
+    "patch_cluster_evidence_stats.sql",
+]
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+TEST_DATABASE_NAME = f"ai_civ_test_{os.getpid()}"
+
+# backend.database builds its engine from DATABASE_URL at import time (without connecting)
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = (
+        make_url(TEST_DATABASE_URL).set(database=TEST_DATABASE_NAME).render_as_string(hide_password=False)
+    )
+else:
+    os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://localhost/unused")
+
+
+@pytest.fixture(scope="session")
+def database():
+    """Create the scratch database with the full schema; drop it at the end of the run."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    admin = create_engine(TEST_DATABASE_URL, isolation_level="AUTOCOMMIT")
+    try:
+        with admin.connect() as conn:
+            conn.execute(text(f'drop database if exists "{TEST_DATABASE_NAME}"'))
+            conn.execute(text(f'create database "{TEST_DATABASE_NAME}"'))
+    except Exception as e:
+        admin.dispose()
+        pytest.skip(f"cannot create a test database via TEST_DATABASE_URL: {e}")
+
+    from backend.database import engine
+
+    with engine.begin() as conn:
+        for name in SCHEMA_FILES:
+            with open(os.path.join(ROOT, "database", name)) as f:
+                conn.exec_driver_sql(f.read())
+    yield engine
+
+    engine.dispose()
+    with admin.connect() as conn:
+        conn.execute(text(f'drop database if exists "{TEST_DATABASE_NAME}"'))
+    admin.dispose()
+
+
+@pytest.fixture
+def db(database):
+    """A session on the scratch database; every table is emptied after the test."""
+    from backend.database import SessionLocal
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    session.close()
+    with database.begin() as conn:
+        tables = conn.execute(text(
+            "select tablename from pg_tables where schemaname = 'public'"
+        )).scalars().all()
+        conn.execute(text(f"truncate {', '.join(tables)} restart identity cascade"))
+
+
+@pytest.fixture
+def make_cluster(db):
+    """make_cluster(state='Emerging', *levels) -> cluster_id, with one committed evidence row per level."""
+    from backend.models import EventCluster, Evidence
+
+    def make(state="Emerging", *levels):
+        cluster = EventCluster(title="test cluster", cluster_state=state)
+        db.add(cluster)
+        db.flush()
+        db.add_all([
+            Evidence(cluster_id=cluster.cluster_id, level=level, extract=f"L{level} evidence",
+                     pointer={"url": "https://example.org/item"})
+            for level in levels
+        ])
+        db.commit()
+        return cluster.cluster_id
+
+    return make
@@ -0,0 +1,147 @@
+import pytest
+
+from backend.services import circuit_breaker
+from backend.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyHistogram
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", fake)
+    return fake
+
+
+def breaker(**kwargs):
+    params = dict(failures=3, failure_ratio=0.5, window=10, min_calls=6, slow_seconds=5, cooldown_seconds=60)
+    params.update(kwargs)
+    return CircuitBreaker("test", **params)
+
+
+def test_opens_after_consecutive_failures(clock):
+    cb = breaker()
+    cb.record(1, ok=False)
+    cb.record(1, ok=False)
+    cb.record(1, ok=True)
+    cb.record(1, ok=False)
+    cb.record(1, ok=False)
+    assert cb.state == CLOSED
+
+    cb.record(1, ok=False)
+    assert cb.state == OPEN
+    assert not cb.allow()
+    assert cb.snapshot()["rejected"] == 1
+    assert cb.snapshot()["opened"] == 1
+
+
+def test_opens_on_failure_ratio(clock):
+    cb = breaker(failures=10)
+    for ok in (True, False, True, False, True):
+        cb.record(1, ok=ok)
+    # 2 of 5 failed and fewer than min_calls seen
+    assert cb.state == CLOSED
+
+    cb.record(1, ok=False)
+    # 3 of 6 failed, never more than one in a row
+    assert cb.state == OPEN
+
+
+def test_ratio_needs_min_calls(clock):
+    cb = breaker(failures=10, min_calls=8)
+    for ok in (False, True, False, True, False, False):
+        cb.record(1, ok=ok)
+    assert cb.state == CLOSED
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    cb = breaker(failures=1)
+    cb.record(1, ok=False)
+    assert cb.state == OPEN
+
+    clock.now += 59
+    assert not cb.allow()
+
+    clock.now += 1
+    assert cb.state == HALF_OPEN
+    assert cb.allow()
+    assert not cb.allow()
+    assert not cb.allow()
+
+    cb.record(1, ok=True)
+    assert cb.state == CLOSED
+    assert cb.allow() and cb.allow()
+
+
+def test_failed_probe_reopens_for_another_cooldown(clock):
+    cb = breaker(failures=1)
+    cb.record(1, ok=False)
+    clock.now += 60
+    assert cb.allow()
+
+    cb.record(1, ok=False)
+    assert cb.state == OPEN
+    assert cb.snapshot()["opened"] == 2
+
+    clock.now += 30
+    assert not cb.allow()
+    clock.now += 30
+    assert cb.allow()
+
+
+def test_slow_successes_count_as_failures(clock):
+    cb = breaker()
+    cb.record(5, ok=True)
+    cb.record(6, ok=True)
+    cb.record(7, ok=True)
+    assert cb.state == CLOSED
+
+    cb.record(8, ok=True)
+    assert cb.state == OPEN
+    snap = cb.snapshot()
+    assert (snap["calls"], snap["errors"], snap["slow"]) == (4, 0, 3)
+
+
+def test_slow_probe_reopens(clock):
+    cb = breaker(failures=1)
+    cb.record(1, ok=False)
+    clock.now += 60
+    assert cb.allow()
+    cb.record(30, ok=True)
+    assert cb.state == OPEN
+
+
+def test_latency_histogram_buckets():
+    hist = LatencyHistogram(buckets=(1, 5))
+    for seconds in (0.5, 1, 1.5, 5, 9):
+        hist.observe(seconds)
+
+    assert hist.snapshot() == {
+        "buckets": {"le_1": 2, "le_5": 2, "le_inf": 1},
+        "count": 5,
+        "sum_seconds": 17.0,
+        "mean_seconds": 3.4,
+    }
+    assert LatencyHistogram().snapshot()["mean_seconds"] is None
+
+
+def test_take_interval_resets_only_the_interval(clock):
+    cb = breaker()
+    cb.record(0.2, ok=True)
+    cb.record(3, ok=False)
+
+    interval = cb.take_interval()
+    assert (interval["calls"], interval["errors"]) == (2, 1)
+    assert interval["latency"]["count"] == 2
+    assert interval["state"] == CLOSED
+
+    cb.record(0.2, ok=True)
+    assert cb.take_interval()["calls"] == 1
+    assert cb.snapshot()["calls"] == 3
+    assert cb.snapshot()["latency"]["buckets"]["le_0.25"] == 2
@@ -0,0 +1,143 @@
+import random
+
+import pytest
+
+from backend.services.cluster_index import MinHashLSHIndex, TokenIndex, make_cluster_index, tokenize
+
+THRESHOLD = 0.3
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def pair_with_jaccard(rng, j, shared=12):
+    """Two titles sharing `shared` tokens, with enough unique tokens each for Jaccard ~j."""
+    unique = round(shared * (1 - j) / (2 * j))
+    base = [f"s{rng.getrandbits(40)}" for _ in range(shared)]
+    a = base + [f"a{rng.getrandbits(40)}" for _ in range(unique)]
+    b = base + [f"b{rng.getrandbits(40)}" for _ in range(unique)]
+    return " ".join(a), " ".join(b)
+
+
+def test_token_index_exact_jaccard():
+    index = TokenIndex()
+    titles = {1: "chip makers merge", 2: "chip makers report record sales", 3: "weather in the north"}
+    for cluster_id, title in titles.items():
+        index.add(cluster_id, index.signature(title))
+
+    query = index.signature("Chip makers merge after review")
+    cluster_id, score = index.best_match(query, THRESHOLD)
+    assert cluster_id == 1
+    assert score == jaccard(query, tokenize(titles[1])) == 3 / 5
+
+    assert index.best_match(query, 0.6) == (None, 0.6)
+    assert index.best_match(index.signature("nothing in common"), THRESHOLD) == (None, THRESHOLD)
+
+
+def test_token_index_ties_go_to_the_earliest_cluster():
+    index = TokenIndex()
+    index.add(30, tokenize("alpha beta gamma"))
+    index.add(10, tokenize("alpha beta delta"))
+    index.add(20, tokenize("alpha beta epsilon"))
+
+    query = tokenize("alpha beta zeta")
+    assert index.best_match(query, THRESHOLD) == (30, 0.5)
+
+    index.remove(30)
+    assert index.best_match(query, THRESHOLD) == (10, 0.5)
+
+    # A re-added cluster ranks after everything already indexed
+    index.add(30, tokenize("alpha beta gamma"))
+    assert index.best_match(query, THRESHOLD) == (10, 0.5)
+
+
+def test_token_index_remove():
+    index = TokenIndex()
+    index.add(1, tokenize("alpha beta"))
+    index.add(2, tokenize("beta gamma"))
+    index.remove(1)
+    index.remove(99)
+
+    assert len(index) == 1
+    assert set(index.postings) == {"beta", "gamma"}
+    assert index.best_match(tokenize("alpha beta"), THRESHOLD) == (2, 1 / 3)
+
+    index.remove(2)
+    assert len(index) == 0 and not index.postings
+
+
+def test_minhash_estimates_jaccard():
+    index = MinHashLSHIndex()
+    rng = random.Random(2)
+    a, b = pair_with_jaccard(rng, 0.5)
+    index.add(1, index.signature(a))
+    cluster_id, score = index.best_match(index.signature(b), THRESHOLD)
+    assert cluster_id == 1
+    assert score == pytest.approx(0.5, abs=0.15)
+
+
+def test_minhash_recall_at_threshold():
+    # With 40 bands of 3 rows a pair at Jaccard s becomes a candidate with probability 1 - (1 - s^3)^40
+    rng = random.Random(5)
+    index = MinHashLSHIndex()
+    queries = {}
+    for j in (0.3, 0.4, 0.5, 0.7):
+        for _ in range(150):
+            a, b = pair_with_jaccard(rng, j)
+            cluster_id = len(index) + 1
+            index.add(cluster_id, index.signature(a))
+            queries.setdefault(j, []).append((cluster_id, index.signature(b)))
+
+    def candidate_rate(j):
+        return sum(cid in index.candidates(sig) for cid, sig in queries[j]) / len(queries[j])
+
+    def match_rate(j):
+        return sum(index.best_match(sig, THRESHOLD)[0] == cid for cid, sig in queries[j]) / len(queries[j])
+
+    for j in queries:
+        expected = 1 - (1 - j ** 3) ** 40
+        assert candidate_rate(j) == pytest.approx(expected, abs=0.1)
+    assert match_rate(0.4) >= 0.85
+    assert match_rate(0.5) >= 0.95
+    assert match_rate(0.7) == 1.0
+
+
+def test_minhash_keeps_unrelated_titles_apart():
+    rng = random.Random(9)
+    index = MinHashLSHIndex()
+    for cluster_id in range(1, 101):
+        index.add(cluster_id, index.signature(pair_with_jaccard(rng, 0.5)[0]))
+    hits = sum(
+        index.best_match(index.signature(pair_with_jaccard(rng, 0.5)[1]), THRESHOLD)[0] is not None
+        for _ in range(100)
+    )
+    assert hits == 0
+
+
+def test_minhash_remove():
+    index = MinHashLSHIndex()
+    signature = index.signature("chip makers merge after review")
+    index.add(1, signature)
+    index.add(2, signature)
+    assert index.best_match(signature, THRESHOLD) == (1, 1.0)
+
+    index.remove(1)
+    index.remove(99)
+    assert len(index) == 1
+    assert index.candidates(signature) == {2}
+    assert index.best_match(signature, THRESHOLD) == (2, 1.0)
+
+    index.remove(2)
+    assert len(index) == 0
+    assert not any(index.buckets)
+    assert index.best_match(signature, THRESHOLD) == (None, THRESHOLD)
+
+
+def test_make_cluster_index():
+    assert isinstance(make_cluster_index("naive"), TokenIndex)
+    assert make_cluster_index("minhash", num_perm=60, bands=20).rows == 3
+    with pytest.raises(ValueError):
+        make_cluster_index("minhash", num_perm=100, bands=40)
+    with pytest.raises(ValueError):
+        make_cluster_index("bogus")
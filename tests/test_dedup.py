@@ -0,0 +1,157 @@
+import hashlib
+
+import pytest
+
+from backend.services import dedup
+from backend.services.dedup import BloomFilter, ContentHashFilter
+
+
+class FakeQuery:
+    def __init__(self, session, hashes):
+        self.session = session
+        self.hashes = hashes
+
+    def count(self):
+        return len(self.hashes)
+
+    def yield_per(self, n):
+        return iter([(h,) for h in self.hashes])
+
+    def filter(self, criterion):
+        # RawItem.content_hash.in_([...])
+        wanted = set(criterion.right.value)
+        self.session.lookups.append(sorted(wanted))
+        return FakeQuery(self.session, [h for h in self.hashes if h in wanted])
+
+    def all(self):
+        return [(h,) for h in self.hashes]
+
+
+class FakeSession:
+    """Just enough of a Session for ContentHashFilter: committed rows plus a pending batch."""
+
+    def __init__(self, hashes=()):
+        self.committed = list(hashes)
+        self.pending = []
+        self.lookups = []
+
+    def query(self, column):
+        return FakeQuery(self, self.committed + self.pending)
+
+    def commit(self):
+        self.committed += self.pending
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+def sha(i):
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def test_bloom_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [sha(i) for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    assert bloom.count == 1000
+    false_positives = sum(sha(i) in bloom for i in range(1000, 11000))
+    assert false_positives < 300
+
+
+def test_bloom_sizing():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    assert bloom.num_bits == 9586
+    assert bloom.num_hashes == 7
+    assert len(bloom.bits) == 1199
+
+
+def test_filter_new_only_confirms_bloom_hits(monkeypatch):
+    monkeypatch.setattr(dedup, "BLOOM_MIN_CAPACITY", 100)
+    stored = [sha(i) for i in range(50)]
+    db = FakeSession(stored)
+    f = ContentHashFilter()
+
+    fresh = [sha(i) for i in range(50, 60)]
+    assert f.filter_new(db, stored[:5] + fresh) == set(fresh)
+    assert f.warmed and f.bloom.count == 50
+    # Only bloom hits (the 5 stored ones plus any false positive) reach the DB
+    assert set(stored[:5]) <= set(db.lookups[-1])
+    assert len(db.lookups) == 1
+
+    db.lookups.clear()
+    assert f.filter_new(db, fresh) == set(fresh)
+    assert all(set(lookup) <= set(fresh) for lookup in db.lookups)
+
+
+def test_filter_rebuilds_past_capacity(monkeypatch):
+    monkeypatch.setattr(dedup, "BLOOM_MIN_CAPACITY", 10)
+    db = FakeSession([sha(i) for i in range(5)])
+    f = ContentHashFilter()
+    f.filter_new(db, [])
+    first = f.bloom
+    assert first.capacity == 10
+
+    for i in range(5, 11):
+        db.committed.append(sha(i))
+        f.add(sha(i))
+    assert f.bloom is first and not f.warmed
+
+    assert f.filter_new(db, [sha(3), sha(10), sha(99)]) == {sha(99)}
+    assert f.bloom is not first
+    assert f.bloom.capacity == 22 and f.bloom.count == 11
+
+
+def test_rolled_back_batch_is_not_seen():
+    db = FakeSession([sha(1)])
+    f = ContentHashFilter()
+    batch = [sha(2), sha(3)]
+
+    assert f.filter_new(db, batch) == set(batch)
+    db.pending += batch
+    db.rollback()
+    # add() only happens after a commit, so nothing of the batch was recorded
+    assert not any(h in f.bloom for h in batch)
+    assert f.filter_new(db, batch) == set(batch)
+
+    # Even a hash the filter did record is confirmed against the table first
+    f.add(sha(2))
+    assert f.filter_new(db, batch) == set(batch)
+
+
+def test_ingest_rollback_leaves_hashes_new(db, monkeypatch):
+    from backend.models import RawItem, Source
+    from backend.services import ingestor
+    from backend.services.bulk_writer import BulkWriter
+
+    f = ContentHashFilter()
+    monkeypatch.setattr(ingestor, "get_content_hash_filter", lambda: f)
+    monkeypatch.setattr(ingestor, "URL_RESOLVE_REDIRECTS", False)
+    source = Source(name="feed", source_type="rss", url="https://feed.example/rss")
+    db.add(source)
+    db.commit()
+
+    body = (
+        b"<rss><channel><item><title>Chip makers merge after a long review</title>"
+        b"<link>https://news.example/1</link><description>The deal closed today.</description>"
+        b"</item></channel></rss>"
+    )
+
+    def fail_after_insert(self, rows):
+        original_insert(self, rows)
+        raise RuntimeError("connection lost")
+
+    original_insert = BulkWriter.insert_raw_items
+    monkeypatch.setattr(BulkWriter, "insert_raw_items", fail_after_insert)
+    with pytest.raises(RuntimeError):
+        ingestor.IngestorService(db).ingest_feed(source.source_id, body=body)
+    db.rollback()
+
+    assert db.query(RawItem).count() == 0
+    assert f.bloom.count == 0
+    monkeypatch.setattr(BulkWriter, "insert_raw_items", original_insert)
+    assert ingestor.IngestorService(db).ingest_feed(source.source_id, body=body) == 1
+    assert db.query(RawItem).count() == 1
@@ -0,0 +1,184 @@
+from sqlalchemy import delete, insert, text
+
+from backend.models import ClusterEvidenceStats, EventCluster, Evidence
+from backend.services.bulk_writer import BulkWriter
+from backend.services.dirty_tracker import DirtyClusterTracker
+from backend.services.scorer import ScorerService
+
+POINTER = {"url": "https://example.org/item"}
+
+
+def new_cluster(db):
+    cluster = EventCluster(title="test cluster")
+    db.add(cluster)
+    db.flush()
+    return cluster.cluster_id
+
+
+def add_evidence(db, rows):
+    """Insert (cluster_id, level) rows in one statement; returns their evidence ids."""
+    return db.execute(
+        insert(Evidence).returning(Evidence.evidence_id),
+        [{"cluster_id": cluster_id, "level": level, "extract": f"L{level}", "pointer": POINTER}
+         for cluster_id, level in rows],
+    ).scalars().all()
+
+
+def stats(db):
+    """{cluster_id: (l5, l4, l3, l2, l1, total)} as kept by the triggers."""
+    return {
+        s.cluster_id: (s.l5_count, s.l4_count, s.l3_count, s.l2_count, s.l1_count, s.total_count)
+        for s in db.query(ClusterEvidenceStats).all()
+    }
+
+
+def recount(db):
+    """The same counters computed from the evidence rows."""
+    rows = db.execute(text("""
+        select cluster_id,
+               count(*) filter (where level = 5), count(*) filter (where level = 4),
+               count(*) filter (where level = 3), count(*) filter (where level = 2),
+               count(*) filter (where level = 1), count(*)
+        from evidence where cluster_id is not null group by cluster_id
+    """)).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+def assert_stats(db, expected):
+    db.commit()
+    nonzero = {cluster_id: counts for cluster_id, counts in stats(db).items() if counts[-1]}
+    assert nonzero == expected
+    assert nonzero == recount(db)
+
+
+def dirty(db):
+    rows = db.execute(text(
+        "select cluster_id, added_l5, added_l4, added_l3, added_l2, added_l1 from dirty_clusters"
+    )).all()
+    return {row[0]: tuple(row[1:]) for row in rows}
+
+
+# --- cluster_evidence_stats ------------------------------------------------
+
+def test_stats_count_inserted_evidence_by_level(db):
+    a, b = new_cluster(db), new_cluster(db)
+    add_evidence(db, [(a, 5), (a, 5), (a, 1), (b, 3), (None, 4)])
+    assert_stats(db, {a: (2, 0, 0, 0, 1, 3), b: (0, 0, 1, 0, 0, 1)})
+
+    add_evidence(db, [(a, 4), (b, 2)])
+    assert_stats(db, {a: (2, 1, 0, 0, 1, 4), b: (0, 0, 1, 1, 0, 2)})
+
+
+def test_stats_follow_assignment_and_moves_between_clusters(db):
+    a, b = new_cluster(db), new_cluster(db)
+    unclustered = add_evidence(db, [(None, 5), (None, 2)])
+    in_a = add_evidence(db, [(a, 4), (a, 1)])
+    assert_stats(db, {a: (0, 1, 0, 0, 1, 2)})
+
+    # One bulk UPDATE: two rows assigned, one moved from a to b (signed -1 / +1)
+    BulkWriter(db).assign_evidence({unclustered[0]: a, unclustered[1]: b, in_a[0]: b})
+    assert_stats(db, {a: (1, 0, 0, 0, 1, 2), b: (0, 1, 0, 1, 0, 2)})
+
+    # Moving everything out leaves a at zero
+    BulkWriter(db).assign_evidence({unclustered[0]: b, in_a[1]: b})
+    assert stats(db)[a] == (0, 0, 0, 0, 0, 0)
+    assert_stats(db, {b: (1, 1, 0, 1, 1, 4)})
+
+
+def test_stats_follow_level_changes(db):
+    a = new_cluster(db)
+    ids = add_evidence(db, [(a, 3), (a, 3), (a, 1)])
+    db.execute(text("update evidence set level = 5 where evidence_id = any(:ids)"), {"ids": ids[:2]})
+    assert_stats(db, {a: (2, 0, 0, 0, 1, 3)})
+
+    # Level and cluster change in the same statement
+    b = new_cluster(db)
+    db.execute(text("update evidence set level = 2, cluster_id = :b where evidence_id = :id"), {"b": b, "id": ids[2]})
+    assert_stats(db, {a: (2, 0, 0, 0, 0, 2), b: (0, 0, 0, 1, 0, 1)})
+
+
+def test_stats_ignore_updates_that_change_neither_cluster_nor_level(db):
+    a = new_cluster(db)
+    ids = add_evidence(db, [(a, 4), (a, 2)])
+    db.commit()
+    before = db.get(ClusterEvidenceStats, a).last_evidence_at
+
+    db.execute(text("update evidence set minhash_signature = '{1,2,3}', reliability_score = 0.9 where evidence_id = any(:ids)"), {"ids": ids})
+    assert_stats(db, {a: (0, 1, 0, 1, 0, 2)})
+    assert db.get(ClusterEvidenceStats, a).last_evidence_at == before
+
+
+def test_stats_decrement_on_delete(db):
+    a, b = new_cluster(db), new_cluster(db)
+    ids = add_evidence(db, [(a, 5), (a, 1), (b, 2), (None, 3)])
+    db.commit()
+    last_evidence_at = db.get(ClusterEvidenceStats, a).last_evidence_at
+
+    db.execute(delete(Evidence).where(Evidence.evidence_id.in_([ids[1], ids[2], ids[3]])))
+    assert_stats(db, {a: (1, 0, 0, 0, 0, 1)})
+    assert stats(db)[b] == (0, 0, 0, 0, 0, 0)
+    # Deletes do not rewind last_evidence_at
+    assert db.get(ClusterEvidenceStats, a).last_evidence_at == last_evidence_at
+
+
+# --- dirty_clusters --------------------------------------------------------
+
+def test_dirty_clusters_on_insert_accumulate_until_claimed(db):
+    a, b = new_cluster(db), new_cluster(db)
+    add_evidence(db, [(a, 5), (a, 1), (b, 3), (None, 2)])
+    add_evidence(db, [(a, 5)])
+    db.commit()
+    assert dirty(db) == {a: (2, 0, 0, 0, 1), b: (0, 0, 1, 0, 0)}
+
+    claimed = DirtyClusterTracker(db).claim()
+    db.commit()
+    assert claimed == {
+        a: {"L5": 2, "L4": 0, "L3": 0, "L2": 0, "L1": 1},
+        b: {"L5": 0, "L4": 0, "L3": 1, "L2": 0, "L1": 0},
+    }
+    assert dirty(db) == {}
+
+
+def test_dirty_clusters_on_assignment_count_only_the_receiving_cluster(db):
+    a, b = new_cluster(db), new_cluster(db)
+    unclustered = add_evidence(db, [(None, 4), (None, 4)])
+    in_a = add_evidence(db, [(a, 2)])
+    DirtyClusterTracker(db).claim()
+    db.commit()
+
+    BulkWriter(db).assign_evidence({unclustered[0]: a, unclustered[1]: b, in_a[0]: b})
+    db.commit()
+    assert dirty(db) == {a: (0, 1, 0, 0, 0), b: (0, 1, 0, 1, 0)}
+
+
+def test_dirty_clusters_ignore_updates_within_a_cluster(db):
+    a = new_cluster(db)
+    ids = add_evidence(db, [(a, 3)])
+    DirtyClusterTracker(db).claim()
+    db.commit()
+
+    db.execute(text("update evidence set level = 5, reliability_score = 0.1 where evidence_id = :id"), {"id": ids[0]})
+    BulkWriter(db).assign_evidence({ids[0]: a})
+    db.commit()
+    assert dirty(db) == {}
+
+
+def test_claimed_dirty_clusters_are_scored_from_the_stats(db):
+    a, b = new_cluster(db), new_cluster(db)
+    add_evidence(db, [(a, 5), (a, 1)])
+    db.commit()
+    DirtyClusterTracker(db).claim()
+    db.commit()
+
+    # Only a gains evidence, so only a is claimed and rescored (the heartbeat's path)
+    add_evidence(db, [(a, 4), (a, 4)])
+    db.commit()
+    claimed = DirtyClusterTracker(db).claim()
+    assert list(claimed) == [a]
+    assert ScorerService(db).score_clusters(list(claimed)) == [a]
+
+    consistency, risk = db.execute(text(
+        "select consistency, risk from cluster_scores where cluster_id = :id"
+    ), {"id": a}).one()
+    assert (consistency, risk) == (0.75, 0.25)
+    assert b not in dirty(db)
@@ -0,0 +1,80 @@
+import io
+
+import feedparser
+import pytest
+
+from backend.services.feed_stream import iter_feed_entries
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>Example wire</title>
+    <link>https://wire.example/</link>
+    <description>Channel description, not an entry</description>
+    <item>
+      <title>Chip makers agree to merge</title>
+      <link>https://wire.example/news/1?utm_source=rss</link>
+      <description>The two companies announced the deal on Monday.</description>
+      <pubDate>Mon, 06 Jan 2025 08:30:00 GMT</pubDate>
+      <guid>https://wire.example/news/1</guid>
+    </item>
+    <item>
+      <title>Regulator opens review &amp; asks for comments</title>
+      <link>
+        https://wire.example/news/2
+      </link>
+      <description><![CDATA[<p>Comments are due by <b>March</b>.</p>]]></description>
+      <pubDate>Tue, 07 Jan 2025 17:05:00 +0100</pubDate>
+    </item>
+    <item>
+      <title>Caf\xc3\xa9 chain expands to 40 cities</title>
+      <link>https://wire.example/news/3</link>
+      <description>Openings &lt;b&gt;start&lt;/b&gt; next week.</description>
+    </item>
+  </channel>
+</rss>
+"""
+
+ATOM = b"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example lab blog</title>
+  <link href="https://lab.example/"/>
+  <updated>2025-01-08T12:00:00Z</updated>
+  <entry>
+    <title>New model release</title>
+    <link rel="self" href="https://lab.example/api/posts/7"/>
+    <link rel="alternate" href="https://lab.example/posts/7"/>
+    <id>tag:lab.example,2025:7</id>
+    <published>2025-01-08T10:00:00Z</published>
+    <updated>2025-01-08T12:00:00Z</updated>
+    <summary>A smaller model with a longer context window.</summary>
+  </entry>
+  <entry>
+    <title>Safety report</title>
+    <link href="https://lab.example/posts/8"/>
+    <id>tag:lab.example,2025:8</id>
+    <updated>2025-01-09T09:15:00+02:00</updated>
+    <summary>Findings from the red team exercise.</summary>
+  </entry>
+</feed>
+"""
+
+
+def fields(entry):
+    published = entry.get("published_parsed") or entry.get("updated_parsed")
+    return {
+        "title": entry.get("title"),
+        "link": entry.get("link"),
+        "description": entry.get("description"),
+        # feedparser adds weekday/yearday; the ingestor only reads the first six fields
+        "published": tuple(published)[:6] if published else None,
+    }
+
+
+@pytest.mark.parametrize("body", [RSS, ATOM], ids=["rss", "atom"])
+def test_stream_matches_feedparser(body):
+    expected = [fields(entry) for entry in feedparser.parse(body).entries]
+    streamed = [fields(entry) for entry in iter_feed_entries(io.BytesIO(body))]
+
+    assert len(expected) > 1
+    assert streamed == expected
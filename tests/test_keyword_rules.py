@@ -0,0 +1,111 @@
+import json
+import random
+import re
+
+import pytest
+
+from backend.services import keyword_rules
+from backend.services.keyword_rules import DEFAULT_RULES, KeywordClassifier, get_keyword_classifier, load_rules
+
+
+def legacy_classify(text, url, source_type):
+    """The hard-coded rules EvidenceExtractor used before keyword_rules existed."""
+    result = []
+    for sent in re.split(r'(?<=[.!?])\s+', text):
+        if len(sent) < 20:
+            continue
+        level, kind = 3, 'fact'
+        lower_sent = sent.lower()
+        if any(w in lower_sent for w in ['predicts', 'might', 'speculates', 'rumor']):
+            level, kind = 1, 'inference'
+        elif 'twitter' in url or 'weibo' in url:
+            level = 2
+        elif source_type == 'official' or 'official statement' in lower_sent or 'report' in lower_sent:
+            level = 5
+        elif 'according to' in lower_sent:
+            level, kind = 4, 'quote'
+        result.append((sent, level, kind))
+    return result
+
+
+CORPUS = [
+    ("The lab released a new model today. Analysts say it might change the market!", "https://news.example/a", "rss"),
+    ("According to the ministry, exports fell 4%. The official statement came late.", "https://gov.example/b", "official"),
+    ("A rumor spread quickly online.   Nobody has confirmed the REPORT yet? Wait and see.", "https://twitter.com/x/1", "rss"),
+    ("Weibo users repost the clip. According to them, the factory closed.", "https://weibo.com/p/2", "official"),
+    ("Short. Too short! Still quite short? This sentence is long enough to count.", "https://news.example/c", "rss"),
+    ("The CEO PREDICTS growth.\nAccording to filings, revenue\tdoubled. Reporters asked why.", "", "rss"),
+    ("İstanbul officials published a report on İzmir traffic. It speculates about causes.", "https://news.example/d", "rss"),
+    ("ǅungla mapping, according to the survey team, was slow. Nothing else to add here.", "https://news.example/e", None),
+    ("No terminal punctuation and no keywords at all in this one", "https://news.example/f", "rss"),
+    ("Ends with spaces after the stop.   ", "https://news.example/g", "rss"),
+    ("", "https://news.example/h", "rss"),
+    ("Twitter said nothing. According to staff, the report might be late!! Fine?! Okay then, moving on.",
+     "https://news.example/twitter-roundup", "official"),
+]
+
+WORDS = [
+    "the", "model", "predicts", "might", "rumor", "report", "REPORT", "official", "statement",
+    "official statement", "according", "according to", "Speculates", "İzmir", "weibo", "data", "x",
+]
+ENDINGS = [" ", ". ", "! ", "? ", ".  ", ".\n", "?! ", ", ", ".", ""]
+
+
+def random_corpus(n, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        text = "".join(rng.choice(WORDS) + rng.choice(ENDINGS) for _ in range(rng.randint(0, 40)))
+        url = rng.choice(["https://news.example/a", "https://twitter.com/s/1", "https://m.weibo.cn/2", ""])
+        corpus.append((text, url, rng.choice(["rss", "official", None])))
+    return corpus
+
+
+@pytest.mark.parametrize("text,url,source_type", CORPUS)
+def test_default_rules_match_legacy_classification(text, url, source_type):
+    assert get_keyword_classifier().classify(text, url, source_type) == legacy_classify(text, url, source_type)
+
+
+def test_default_rules_match_legacy_on_random_text():
+    classifier = KeywordClassifier()
+    for text, url, source_type in random_corpus(500):
+        assert classifier.classify(text, url, source_type) == legacy_classify(text, url, source_type), text
+
+
+def test_rules_load_from_json(tmp_path, monkeypatch):
+    rules = {
+        "min_sentence_chars": 5,
+        "default": {"level": 2, "kind": "fact"},
+        "rules": [
+            {"name": "data", "level": 4, "kind": "data", "phrases": ["Percent"]},
+            {"name": "wire", "level": 5, "url_contains": ["wire.example"]},
+        ],
+    }
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules), encoding="utf-8")
+
+    assert load_rules(str(path)) == rules
+    assert load_rules(None) is DEFAULT_RULES
+
+    monkeypatch.setattr(keyword_rules, "KEYWORD_RULES_PATH", str(path))
+    monkeypatch.setattr(keyword_rules, "_classifier", None)
+    classifier = get_keyword_classifier()
+    assert classifier is get_keyword_classifier()
+
+    text = "Up ten percent. Flat today. Tiny."
+    assert classifier.classify(text, "https://news.example/1") == [
+        ("Up ten percent.", 4, "data"),
+        ("Flat today.", 2, "fact"),
+        ("Tiny.", 2, "fact"),
+    ]
+    assert classifier.classify(text, "https://wire.example/1") == [
+        ("Up ten percent.", 4, "data"),
+        ("Flat today.", 5, "fact"),
+        ("Tiny.", 5, "fact"),
+    ]
+
+
+def test_phrase_spanning_a_sentence_break_is_rejected():
+    rules = {"default": {"level": 3, "kind": "fact"}, "rules": [{"level": 1, "phrases": ["end. start"]}]}
+    with pytest.raises(ValueError):
+        KeywordClassifier(rules)
@@ -0,0 +1,106 @@
+import hashlib
+import random
+
+import pytest
+
+from backend.services.near_dup import NearDupIndex, from_signed64, hamming, simhash, to_signed64
+
+TEXT = "Regulators approve the merger of two chip makers after a year long review of the deal"
+
+
+def reference_simhash(text):
+    """Straightforward per-bit SimHash the packed implementation must reproduce."""
+    tokens = text.lower().split()
+    weights = [0] * 64
+    for feature in tokens:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def flip(h, bits):
+    for bit in bits:
+        h ^= 1 << bit
+    return h
+
+
+def test_simhash_matches_reference():
+    rng = random.Random(3)
+    words = [f"w{i}" for i in range(200)]
+    for _ in range(200):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(5, 150)))
+        assert simhash(text) == reference_simhash(text)
+
+
+def test_simhash_ignores_markup_and_case():
+    assert simhash(f"<p>{TEXT.upper()}</p>") == simhash(TEXT)
+
+
+def test_short_and_empty_texts_get_no_fingerprint():
+    assert simhash("") == 0
+    assert simhash(None) == 0
+    assert simhash("<br/> -- !!") == 0
+    assert simhash("four words only here") == 0
+    assert simhash("four words only here", min_tokens=1) != 0
+    assert simhash("five words are just enough") != 0
+
+
+@pytest.mark.parametrize("value", [0, 1, (1 << 63) - 1, 1 << 63, (1 << 64) - 1, 0xDEADBEEFCAFEBABE])
+def test_signed_round_trip(value):
+    signed = to_signed64(value)
+    assert -(1 << 63) <= signed < (1 << 63)
+    assert from_signed64(signed) == value
+
+
+def test_find_within_and_beyond_max_distance():
+    index = NearDupIndex(max_distance=3)
+    h = simhash(TEXT)
+    index.add(h, 1)
+
+    assert index.find(h) == 1
+    assert index.find(flip(h, [0, 21, 63])) == 1
+    assert index.find(flip(h, [0, 21, 42, 63])) is None
+
+
+def test_find_returns_the_closest_match():
+    index = NearDupIndex(max_distance=3)
+    h = simhash(TEXT)
+    index.add(flip(h, [5, 40]), 1)
+    index.add(flip(h, [7]), 2)
+    index.add(flip(h, [1, 2, 3]), 3)
+    assert index.find(h) == 2
+
+
+def test_banding_finds_every_hash_within_max_distance():
+    # Pigeonhole: d differing bits cannot touch all d + 1 bands, so one band key is shared
+    rng = random.Random(11)
+    for max_distance in (1, 3, 5, 7):
+        index = NearDupIndex(max_distance=max_distance)
+        stored = [rng.getrandbits(64) for _ in range(50)]
+        for item_id, h in enumerate(stored):
+            index.add(h, item_id)
+        for item_id, h in enumerate(stored):
+            for _ in range(20):
+                query = flip(h, rng.sample(range(64), rng.randint(0, max_distance)))
+                match = index.find(query)
+                assert match is not None
+                assert hamming(query, stored[match]) <= hamming(query, h)
+
+
+def test_items_without_fingerprint_are_never_marked_duplicate():
+    from backend.services.ingestor import IngestorService
+
+    index = NearDupIndex(max_distance=3)
+    h = simhash(TEXT)
+    index.add(h, 1)
+    rows = [
+        {"content_hash": "a", "simhash": None},
+        {"content_hash": "b", "simhash": None},
+        {"content_hash": "c", "simhash": to_signed64(h)},
+        {"content_hash": "d", "simhash": to_signed64(simhash("An unrelated story about weather in the north"))},
+    ]
+    duplicates, originals = IngestorService(None)._find_near_duplicates(index, rows, {"a": 2, "b": 3, "c": 4, "d": 5})
+
+    assert duplicates == {4: 1}
+    assert [item_id for _, item_id in originals] == [5]
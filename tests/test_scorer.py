@@ -0,0 +1,56 @@
+import pytest
+
+from backend.models import ClusterScore
+from backend.services.scorer import ScorerService
+
+
+def scores(db):
+    return {
+        row.cluster_id: (row.consistency, row.mechanism_uncertainty, row.risk, row.method_version)
+        for row in db.query(ClusterScore).all()
+    }
+
+
+def test_score_clusters_by_id(db, make_cluster):
+    scored_id = make_cluster("Emerging", 5, 4, 3, 1)
+    other_id = make_cluster("Emerging", 5)
+
+    assert ScorerService(db).score_clusters([scored_id]) == [scored_id]
+
+    consistency, uncertainty, risk, method_version = scores(db)[scored_id]
+    assert consistency == pytest.approx(0.5)
+    assert uncertainty == pytest.approx(0.5)
+    assert risk == pytest.approx(0.25)
+    assert method_version == "governance_1.0"
+    assert other_id not in scores(db)
+
+
+def test_score_clusters_by_state(db, make_cluster):
+    emerging_id = make_cluster("Emerging", 5, 5)
+    active_id = make_cluster("Active", 1, 2)
+    stabilizing_id = make_cluster("Stabilizing", 4)
+    empty_id = make_cluster("Active")
+
+    scored = ScorerService(db).score_clusters()
+
+    assert sorted(scored) == sorted([emerging_id, active_id])
+    assert scores(db)[emerging_id][:3] == pytest.approx((1.0, 0.0, 0.0))
+    assert scores(db)[active_id][:3] == pytest.approx((0.0, 1.0, 0.5))
+    assert stabilizing_id not in scores(db) and empty_id not in scores(db)
+
+
+def test_score_clusters_matches_calculate_cluster_score(db, make_cluster):
+    cluster_id = make_cluster("Active", 5, 4, 4, 2, 1, 1)
+    scorer = ScorerService(db)
+
+    scorer.score_clusters([cluster_id])
+    scorer.calculate_cluster_score(cluster_id)
+
+    bulk, single = db.query(ClusterScore).order_by(ClusterScore.score_id).all()
+    assert (bulk.consistency, bulk.mechanism_uncertainty, bulk.risk, bulk.contradiction_ratio) == pytest.approx(
+        (single.consistency, single.mechanism_uncertainty, single.risk, single.contradiction_ratio)
+    )
+
+
+def test_score_clusters_empty_ids(db):
+    assert ScorerService(db).score_clusters([]) == []